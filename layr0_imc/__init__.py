@@ -12,6 +12,14 @@ from .feed import FeedAPI
 from .options import OptionsAPI
 from .telegram import TelegramAPI
 from .utilities import UtilitiesAPI
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy, CircuitBreaker
+from .bars import BarAggregator
+from .dispatch import CallbackDispatcher, Conflator
+from .shm import SharedTickReader
+from .metrics import FeedMetrics, LatencyHistogram
+from .instruments import InstrumentStore
+from .histcache import HistoryCache
 from .indicators import ta
 
 # ------------------------------------------------------------------
@@ -32,7 +40,9 @@ class api(OrderAPI, DataAPI, AccountAPI, FeedAPI, OptionsAPI, TelegramAPI, Utili
     layr0_imc API client class
     """
     def __init__(self, api_key, host="http://127.0.0.1:5000", version="v1", timeout=120.0,
-                 ws_port=8765, ws_url=None, verbose=False):
+                 ws_port=8765, ws_url=None, verbose=False, max_connections=100,
+                 max_keepalive_connections=20, keepalive_expiry=30.0, http2=False,
+                 rate_limiter=None, retry_policy=None, circuit_breaker=None):
         """
         Initialize the layr0_imc API client.
 
@@ -47,9 +57,24 @@ class api(OrderAPI, DataAPI, AccountAPI, FeedAPI, OptionsAPI, TelegramAPI, Utili
                 - 0 or False: Silent mode (errors only)
                 - 1 or True: Basic info (connection, auth, subscription status)
                 - 2: Full debug (all market data updates)
+            max_connections (int): Maximum concurrent REST connections in the pool. Defaults to 100.
+            max_keepalive_connections (int): Maximum idle REST connections kept alive. Defaults to 20.
+            keepalive_expiry (float): Seconds an idle REST connection is kept open. Defaults to 30.0.
+            http2 (bool): Use HTTP/2 for REST calls (requires ``httpx[http2]``). Defaults to False.
+            rate_limiter (RateLimiter or bool, optional): Client-side per-endpoint-group rate limiter.
+                Pass True for the default server limits. Defaults to None (disabled).
+            retry_policy (RetryPolicy or bool, optional): Retry transient REST failures with jittered
+                exponential backoff. Pass True for the default policy. Defaults to None (no retries).
+            circuit_breaker (CircuitBreaker or bool, optional): Fail fast while the server is down.
+                Pass True for the default breaker. Defaults to None (disabled).
         """
-        # Initialize BaseAPI for REST functionality
-        BaseAPI.__init__(self, api_key, host, version, timeout)
+        # Initialize BaseAPI for REST functionality (shared pooled HTTP client)
+        BaseAPI.__init__(self, api_key, host, version, timeout,
+                         max_connections=max_connections,
+                         max_keepalive_connections=max_keepalive_connections,
+                         keepalive_expiry=keepalive_expiry, http2=http2,
+                         rate_limiter=rate_limiter, retry_policy=retry_policy,
+                         circuit_breaker=circuit_breaker)
 
         # Initialize FeedAPI WebSocket attributes
         self.verbose = int(verbose) if verbose is not False else 0
@@ -67,27 +92,9 @@ class api(OrderAPI, DataAPI, AccountAPI, FeedAPI, OptionsAPI, TelegramAPI, Utili
             self.ws_host = self.ws_host.split('/')[0].split(':')[0]
             self.ws_url = f"ws://{self.ws_host}:{self.ws_port}"
 
-        self.ws = None
-        self.connected = False
-        self.authenticated = False
-        self.ws_thread = None
-
-        # Message management
-        self.message_queue = []
-        self.lock = __import__('threading').Lock()
-
-        # Data storage
-        self.ltp_data = {}
-        self.quotes_data = {}
-        self.depth_data = {}
-
-        # Callback registry
-        self.ltp_callback = None
-        self.quote_callback = None
-        self.quotes_callback = None
-        self.depth_callback = None
+        self._init_feed_state()
 
 __version__ = "1.1.4"
 
 # Export main components for easy access
-__all__ = ['api', 'Strategy', 'ta', 'nbjit', 'prange']
+__all__ = ['api', 'Strategy', 'RateLimiter', 'RetryPolicy', 'CircuitBreaker', 'BarAggregator', 'CallbackDispatcher', 'Conflator', 'SharedTickReader', 'FeedMetrics', 'LatencyHistogram', 'InstrumentStore', 'HistoryCache', 'ta', 'nbjit', 'prange']
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc asyncio clients
+"""
+
+from .api import AsyncAPI
+from .feed import AsyncFeed
+
+__all__ = ['AsyncAPI', 'AsyncFeed']
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc REST API Documentation - Asyncio Client
+    https://docs.layr0.org
+"""
+
+import asyncio
+import functools
+import inspect
+
+import httpx
+
+from .. import codec
+from ..orders import OrderAPI
+from ..data import DataAPI, INSTRUMENT_EXCHANGES
+from ..histcache import history_arrays, merge_columns
+from ..instruments import InstrumentStore
+from ..account import AccountAPI
+from ..options import OptionsAPI
+from ..telegram import TelegramAPI
+from ..utilities import UtilitiesAPI
+
+
+def _coroutine(method):
+    """
+    Expose a sync REST method as an ``async def``.
+
+    The sync methods only build the payload and hand it to ``_make_request``,
+    which is a coroutine on AsyncAPI, so the wrapper simply awaits the result.
+    Methods that validate their input may return an error dict directly.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    return wrapper
+
+
+class AsyncAPI(OrderAPI, DataAPI, AccountAPI, OptionsAPI, TelegramAPI, UtilitiesAPI):
+    """
+    Asyncio layr0_imc REST client built on ``httpx.AsyncClient``.
+
+    Every REST method of ``api`` is available as an ``async def`` with the same
+    parameters and the same return values (dicts, and DataFrames for
+    ``history`` and ``instruments``), so thousands of calls can run
+    concurrently from a single event loop.
+
+    Example:
+        async with AsyncAPI(api_key="...", host="http://127.0.0.1:5000") as client:
+            quotes = await asyncio.gather(*(
+                client.quotes(symbol=s, exchange="NSE") for s in ["RELIANCE", "TCS", "INFY"]
+            ))
+    """
+
+    def _build_client(self):
+        """Create the pooled async HTTP client shared by all REST methods."""
+        return httpx.AsyncClient(timeout=self.timeout, limits=self.limits, http2=self.http2)
+
+    async def close(self):
+        """Close the pooled HTTP client and release its connections."""
+        if self.client is not None:
+            await self.client.aclose()
+
+    def __enter__(self):
+        raise TypeError("AsyncAPI is an asynchronous client; use 'async with AsyncAPI(...)' instead of 'with'")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass  # __enter__ always raises
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _make_request(self, endpoint, payload, method="POST"):
+        """Make HTTP request with proper error handling"""
+        url = self.base_url + endpoint
+        attempts = self.retry_policy.attempts_for(endpoint, payload) if self.retry_policy else 1
+
+        for attempt in range(attempts):
+            # Rate limit first: a half-open breaker's probe must not be spent on a rejected request
+            if self.rate_limiter is not None and not await self.rate_limiter.acquire_async(endpoint):
+                return self.rate_limiter.rejection(endpoint)
+            if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+                return self.circuit_breaker.rejection(self.base_url)
+
+            retry = attempt + 1 < attempts
+            try:
+                if method == "GET":
+                    response = await self.client.get(url, params=payload, timeout=self.timeout)
+                else:
+                    response = await self.client.post(url, content=codec.dumps(payload), headers=self.headers,
+                                                      timeout=self.timeout)
+            except Exception as e:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record(error=e)
+                if retry and self.retry_policy.should_retry_exception(e):
+                    await asyncio.sleep(self.retry_policy.backoff(attempt))
+                    continue
+                return self._error_from_exception(e)
+
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record(response=response)
+            if retry and self.retry_policy.should_retry_response(response):
+                await asyncio.sleep(self.retry_policy.backoff(attempt, response))
+                continue
+            return self._handle_response(response)
+
+    # Order methods
+    placeorder = _coroutine(OrderAPI.placeorder)
+    placesmartorder = _coroutine(OrderAPI.placesmartorder)
+    basketorder = _coroutine(OrderAPI.basketorder)
+    splitorder = _coroutine(OrderAPI.splitorder)
+    orderstatus = _coroutine(OrderAPI.orderstatus)
+    openposition = _coroutine(OrderAPI.openposition)
+    modifyorder = _coroutine(OrderAPI.modifyorder)
+    cancelorder = _coroutine(OrderAPI.cancelorder)
+    closeposition = _coroutine(OrderAPI.closeposition)
+    cancelallorder = _coroutine(OrderAPI.cancelallorder)
+
+    # Data methods
+    quotes = _coroutine(DataAPI.quotes)
+    multiquotes = _coroutine(DataAPI.multiquotes)
+    depth = _coroutine(DataAPI.depth)
+    symbol = _coroutine(DataAPI.symbol)
+    intervals = _coroutine(DataAPI.intervals)
+    interval = _coroutine(DataAPI.interval)
+    expiry = _coroutine(DataAPI.expiry)
+    syntheticfuture = _coroutine(DataAPI.syntheticfuture)
+
+    # Account methods
+    funds = _coroutine(AccountAPI.funds)
+    orderbook = _coroutine(AccountAPI.orderbook)
+    tradebook = _coroutine(AccountAPI.tradebook)
+    positionbook = _coroutine(AccountAPI.positionbook)
+    holdings = _coroutine(AccountAPI.holdings)
+    analyzerstatus = _coroutine(AccountAPI.analyzerstatus)
+    analyzertoggle = _coroutine(AccountAPI.analyzertoggle)
+    margin = _coroutine(AccountAPI.margin)
+
+    # Options methods
+    optiongreeks = _coroutine(OptionsAPI.optiongreeks)
+    optionsorder = _coroutine(OptionsAPI.optionsorder)
+    optionsymbol = _coroutine(OptionsAPI.optionsymbol)
+    optionsmultiorder = _coroutine(OptionsAPI.optionsmultiorder)
+    optionchain = _coroutine(OptionsAPI.optionchain)
+
+    # Telegram and utilities methods
+    telegram = _coroutine(TelegramAPI.telegram)
+    holidays = _coroutine(UtilitiesAPI.holidays)
+    timings = _coroutine(UtilitiesAPI.timings)
+
+    async def history(self, *, symbol, exchange, interval, start_date, end_date, cache=True,
+                      chunk_days=None, max_workers=4, on_progress=None, **kwargs):
+        """
+        Get historical data for a symbol in pandas DataFrame format.
+
+        Async version of ``api.history``; see that method for parameter details.
+        Goes through the history cache when one is enabled (enable_history_cache()),
+        and long ranges are fetched as concurrent chunks on the event loop.
+
+        Returns:
+        pandas.DataFrame or dict: DataFrame with historical data if successful,
+                                error dict if failed. DataFrame has timestamp as index.
+        """
+        # Additional kwargs are passed through to every request
+        extra = {key: value for key, value in kwargs.items() if value is not None}
+
+        def fetch(start, end):
+            return self._fetch_history(symbol, exchange, interval, start, end, extra,
+                                       chunk_days, max_workers, on_progress)
+
+        history_cache = getattr(self, 'history_cache', None)
+        if history_cache is not None and cache and not extra:
+            result = await self._cached_history(history_cache, symbol, exchange, interval,
+                                                start_date, end_date, fetch)
+            if result.get('status') == 'error':
+                return result
+            return self._columns_to_dataframe(result, interval)
+
+        result = await fetch(start_date, end_date)
+        if result.get('status') == 'success' and 'columns' in result:
+            return self._columns_to_dataframe(result['columns'], interval)
+        return self._history_to_dataframe(result, interval)
+
+    async def _fetch_history(self, symbol, exchange, interval, start_date, end_date, extra=None,
+                             chunk_days=None, max_workers=4, on_progress=None):
+        """
+        Async version of DataAPI._fetch_history: up to ``max_workers`` chunks are
+        in flight at once, each converted to column arrays as it arrives.
+        """
+        async def request(start, end):
+            payload = {
+                "apikey": self.api_key,
+                "symbol": symbol,
+                "exchange": exchange,
+                "interval": interval,
+                "start_date": start,
+                "end_date": end
+            }
+            payload.update(extra or {})
+            return await self._make_request("history", payload)
+
+        chunks = self._history_chunks(interval, start_date, end_date, chunk_days)
+        if len(chunks) == 1:
+            result = await request(*chunks[0])
+            if on_progress is not None:
+                on_progress(1, 1)
+            return result
+
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def fetch_chunk(chunk):
+            async with semaphore:
+                result = await request(*chunk)
+            try:
+                if result.get('status') == 'success' and result.get('data'):
+                    return chunk, result, history_arrays(result['data'])
+            except Exception as e:
+                result = {
+                    'status': 'error',
+                    'message': f'Failed to process historical data: {str(e)}',
+                    'error_type': 'processing_error'
+                }
+            return chunk, result, None
+
+        tasks = [asyncio.ensure_future(fetch_chunk(chunk)) for chunk in chunks]
+        parts = []
+        try:
+            for completed, next_chunk in enumerate(asyncio.as_completed(tasks), 1):
+                chunk, result, arrays = await next_chunk
+                if result.get('status') != 'success' and result.get('error_type') != 'no_data':
+                    return dict(result, start_date=chunk[0], end_date=chunk[1])
+                if arrays is not None:
+                    parts.append(arrays)
+                if on_progress is not None:
+                    on_progress(completed, len(chunks))
+        finally:
+            for task in tasks:
+                task.cancel()
+        return {'status': 'success', 'columns': merge_columns(*parts)}
+
+    async def history_many(self, *, symbols, interval, start_date, end_date, exchange=None, output="frame",
+                           max_workers=8, on_progress=None, cache=True, chunk_days=None, **kwargs):
+        """
+        Get historical data for many symbols at once.
+
+        Async version of ``api.history_many``; see that method for parameter details.
+        Up to ``max_workers`` symbols are downloaded concurrently on the event loop.
+
+        Returns:
+        pandas.DataFrame, dict or error dict: The panel, as returned by ``api.history_many``.
+        """
+        if output not in ("frame", "arrays"):
+            return {
+                'status': 'error',
+                'message': "output must be 'frame' or 'arrays'",
+                'error_type': 'validation_error'
+            }
+        requests, labels = self._history_requests(symbols, exchange)
+        extra = {key: value for key, value in kwargs.items() if value is not None}
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def fetch(i, request):
+            exch, sym = request
+            async with semaphore:
+                try:
+                    return i, await self._history_columns(sym, exch, interval, start_date, end_date,
+                                                          cache, extra, chunk_days)
+                except Exception as e:
+                    return i, {
+                        'status': 'error',
+                        'message': f'Failed to process historical data: {str(e)}',
+                        'error_type': 'processing_error'
+                    }
+
+        results = [None] * len(requests)
+        tasks = [fetch(i, request) for i, request in enumerate(requests)]
+        for completed, next_result in enumerate(asyncio.as_completed(tasks), 1):
+            i, results[i] = await next_result
+            if on_progress is not None:
+                on_progress(completed, len(requests))
+        return self._history_panel(labels, results, output, interval)
+
+    async def _history_columns(self, symbol, exchange, interval, start_date, end_date, cache=True,
+                               extra=None, chunk_days=None):
+        """Async version of DataAPI._history_columns"""
+        def fetch(start, end):
+            # One request at a time per symbol; concurrency comes from the caller
+            return self._fetch_history(symbol, exchange, interval, start, end, extra, chunk_days, 1)
+
+        history_cache = getattr(self, 'history_cache', None)
+        if history_cache is not None and cache and not extra:
+            return await self._cached_history(history_cache, symbol, exchange, interval,
+                                              start_date, end_date, fetch)
+        return self._result_columns(await fetch(start_date, end_date))
+
+    @staticmethod
+    async def _cached_history(history_cache, symbol, exchange, interval, start_date, end_date, fetch):
+        """
+        Run the (blocking) HistoryCache lookup in a worker thread.
+
+        The cache calls ``fetch`` from that thread for each missing range; the
+        request itself is scheduled back onto this event loop, which stays free
+        while the cache reads and writes its files.
+        """
+        loop = asyncio.get_running_loop()
+
+        def fetch_blocking(start, end):
+            return asyncio.run_coroutine_threadsafe(fetch(start, end), loop).result()
+
+        return await loop.run_in_executor(None, functools.partial(
+            history_cache.get, symbol, exchange, interval, start_date, end_date, fetch_blocking))
+
+    async def instruments(self, *, exchange=None):
+        """
+        Download all trading symbols and instruments with optional exchange filtering.
+
+        Async version of ``api.instruments``. When no exchange is specified, all
+        exchanges are downloaded concurrently and combined.
+
+        Returns:
+        pandas.DataFrame or dict: DataFrame containing instrument data, or error dict.
+        """
+        if exchange is None:
+            results = await asyncio.gather(*(
+                self._make_request("instruments", {"apikey": self.api_key, "exchange": exch}, method="GET")
+                for exch in INSTRUMENT_EXCHANGES
+            ))
+            return self._combine_instruments(dict(zip(INSTRUMENT_EXCHANGES, results)))
+
+        params = {
+            "apikey": self.api_key,
+            "exchange": exchange
+        }
+        result = await self._make_request("instruments", params, method="GET")
+        return self._instruments_to_dataframe(result)
+
+    async def instrument_store(self, *, path=None, refresh_time="08:00", auto_refresh=True):
+        """
+        Local instrument master for in-process symbol resolution and contract enumeration.
+
+        Async version of ``api.instrument_store``. The master is downloaded here
+        when it is missing or stale (with auto_refresh); lookups on the returned
+        store never download, so await this method again (or the store's
+        refresh_async()) to pick up a new trading day.
+
+        Returns:
+        InstrumentStore: The client's store, created on first use.
+        """
+        store = getattr(self, '_instrument_store', None)
+        if store is None:
+            store = self._instrument_store = InstrumentStore(self, path=path, refresh_time=refresh_time,
+                                                             auto_refresh=False)
+        if auto_refresh:
+            await store.refresh_async(force=False)
+        return store
+
+    async def search(self, *, query, exchange=None, local=False, instrumenttype=None, limit=20, **kwargs):
+        """
+        Search for symbols across exchanges.
+
+        Async version of ``api.search``; local searches use ``await instrument_store()``.
+
+        Returns:
+        dict: JSON response containing matching symbols, or error dict.
+        """
+        if local:
+            try:
+                store = await self.instrument_store()
+                data = store.search(query, exchange=exchange or None, instrumenttype=instrumenttype, limit=limit)
+            except Exception as e:
+                return {
+                    'status': 'error',
+                    'message': f'Local symbol search failed: {str(e)}',
+                    'error_type': 'processing_error'
+                }
+            return {'status': 'success', 'data': data}
+        return await DataAPI.search(self, query=query, exchange=exchange, **kwargs)
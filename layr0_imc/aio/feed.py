@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc WebSocket API Documentation - Asyncio Feed
+    https://docs.layr0.org
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .. import codec
+from ..feed import (FeedAPI, MODE_LTP, MODE_NAMES, DEFAULT_BATCH_SIZE,
+                    normalize_market_data)
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - optional dependency
+    websockets = None
+
+
+class _AsyncSubscriptionRequest:
+    """Tracks the acknowledgements outstanding for one subscribe/unsubscribe call."""
+
+    def __init__(self):
+        self.statuses = {}  # Structure: {'EXCHANGE:SYMBOL': status}
+        self.outstanding = 0
+
+
+class AsyncFeed:
+    """
+    Asyncio-native layr0_imc market data feed.
+
+    Runs entirely on the caller's event loop: one reader task receives
+    messages, there is no background thread and no polling. Ticks are
+    exposed as async iterators and have the same shape as the data passed
+    to ``FeedAPI`` callbacks.
+
+    Requires the optional ``websockets`` package (``pip install layr0-IMC[aio]``).
+
+    Example:
+        feed = AsyncFeed(api_key="...", ws_url="ws://127.0.0.1:8765")
+        await feed.connect()
+        async for tick in feed.stream([{"exchange": "NSE", "symbol": "SBIN"}], mode="quote"):
+            print(tick["symbol"], tick["data"]["ltp"])
+    """
+
+    def __init__(self, api_key, host="http://127.0.0.1:5000", ws_port=8765, ws_url=None,
+                 verbose=False, queue_size=10000):
+        """
+        Initialize the asyncio feed.
+
+        Args:
+            api_key (str): User's API key.
+            host (str): Base URL of the layr0_imc server. Used to derive the WebSocket URL.
+            ws_port (int): WebSocket server port. Defaults to 8765.
+            ws_url (str, optional): Custom WebSocket URL. Overrides host and ws_port.
+            verbose (int): Logging verbosity level (0 silent, 1 basic, 2 debug). Defaults to False.
+            queue_size (int): Maximum ticks buffered per stream. When a consumer falls
+                behind, the oldest buffered tick is dropped. Defaults to 10000.
+        """
+        if websockets is None:
+            raise ImportError("AsyncFeed requires the 'websockets' package. "
+                              "Install it with 'pip install websockets'")
+        self.api_key = api_key
+        self.verbose = int(verbose) if verbose is not False else 0
+        self.queue_size = queue_size
+
+        if ws_url:
+            self.ws_url = ws_url
+        else:
+            ws_host = host.split("://", 1)[-1].split('/')[0].split(':')[0]
+            self.ws_url = f"ws://{ws_host}:{ws_port}"
+
+        self.ws = None
+        self.connected = False
+        self.authenticated = False
+        self._reader = None
+        self._auth_future = None
+        self._pending_acks = {}
+        self._ack_cond = None
+        self._streams = []
+        self.dropped_ticks = 0
+
+    _log = FeedAPI._log
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def connect(self, timeout: float = 5.0) -> bool:
+        """
+        Connect to the WebSocket server and authenticate.
+
+        Args:
+            timeout (float): Seconds to wait for connection and authentication. Defaults to 5.0.
+
+        Returns:
+            bool: True if connection and authentication are successful, False otherwise.
+        """
+        loop = asyncio.get_running_loop()
+        self._ack_cond = asyncio.Condition()
+        self._auth_future = loop.create_future()
+        try:
+            self.ws = await asyncio.wait_for(websockets.connect(self.ws_url), timeout)
+        except Exception as e:
+            self._log(1, "ERROR", f"Error connecting to WebSocket: {e}")
+            return False
+
+        self.connected = True
+        self._log(1, "WS", f"Connected to {self.ws_url}")
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+        self._log(1, "AUTH", f"Authenticating with API key: {self.api_key[:8]}...{self.api_key[-8:]}")
+        await self.ws.send(codec.dumps({"action": "authenticate", "api_key": self.api_key}))
+        try:
+            self.authenticated = await asyncio.wait_for(asyncio.shield(self._auth_future), timeout)
+        except asyncio.TimeoutError:
+            self._log(1, "ERROR", "Authentication timed out")
+        return self.authenticated
+
+    async def close(self) -> None:
+        """Close the connection and end all active streams."""
+        if self.ws is not None:
+            await self.ws.close()
+        if self._reader is not None:
+            try:
+                await self._reader
+            except Exception:
+                pass
+            self._reader = None
+        self.ws = None
+
+    async def _read_loop(self) -> None:
+        """Receive and dispatch messages until the connection closes."""
+        try:
+            async for raw in self.ws:
+                try:
+                    await self._process_message(codec.loads(raw))
+                except codec.DecodeError:
+                    self._log(1, "ERROR", f"Invalid JSON message: {raw[:100]}...")
+                except Exception as e:
+                    self._log(1, "ERROR", f"Error handling message: {e}")
+        except Exception as e:
+            self._log(1, "ERROR", f"WebSocket error: {e}")
+        finally:
+            self._log(1, "WS", f"Disconnected from {self.ws_url}")
+            self.connected = False
+            self.authenticated = False
+            if self._auth_future is not None and not self._auth_future.done():
+                self._auth_future.set_result(False)
+            # End every stream
+            for queue, _, _ in list(self._streams):
+                self._put(queue, None)
+
+    async def _process_message(self, message: Dict[str, Any]) -> None:
+        msg_type = message.get("type")
+
+        if msg_type == "market_data":
+            exchange = message.get("exchange")
+            symbol = message.get("symbol")
+            mode = message.get("mode")
+            if not exchange or not symbol or mode not in MODE_NAMES:
+                return
+            symbol_key = f"{exchange}:{symbol}"
+            tick = None
+            for queue, stream_mode, keys in self._streams:
+                if stream_mode != mode or (keys is not None and symbol_key not in keys):
+                    continue
+                if tick is None:
+                    tick = {
+                        'type': 'market_data',
+                        'symbol': symbol,
+                        'exchange': exchange,
+                        'mode': mode,
+                        'data': normalize_market_data(mode, message.get("data", {}))
+                    }
+                self._put(queue, tick)
+            return
+
+        if msg_type == "auth":
+            success = message.get("status") == "success"
+            if success:
+                self._log(1, "AUTH", f"Success | Broker: {message.get('broker', 'unknown')} | "
+                                     f"User: {message.get('user_id', 'unknown')}")
+            else:
+                self._log(1, "ERROR", f"Authentication failed: {message.get('message', 'Unknown error')}")
+            if self._auth_future is not None and not self._auth_future.done():
+                self._auth_future.set_result(success)
+            return
+
+        if msg_type in ("subscribe", "unsubscribe"):
+            self._log(2, "SUB", f"Full response: {message}")
+            acks = [(sub, sub.get("status", message.get("status", "unknown")))
+                    for sub in message.get("subscriptions") or []]
+            acks += [(sub, "success") for sub in message.get("successful") or [] if isinstance(sub, dict)]
+            acks += [(sub, "error") for sub in message.get("failed") or [] if isinstance(sub, dict)]
+            async with self._ack_cond:
+                for sub, status in acks:
+                    exchange, symbol, mode = sub.get("exchange"), sub.get("symbol"), sub.get("mode")
+                    key = (msg_type, exchange, symbol, mode)
+                    if key not in self._pending_acks and mode is None:
+                        key = next((k for k in self._pending_acks if k[:3] == (msg_type, exchange, symbol)), key)
+                    request = self._pending_acks.pop(key, None)
+                    if request is not None:
+                        request.statuses[f"{exchange}:{symbol}"] = status
+                        request.outstanding -= 1
+                self._ack_cond.notify_all()
+
+    def _put(self, queue: asyncio.Queue, item) -> None:
+        """Enqueue without blocking the reader; drop the oldest tick when full."""
+        if queue.full():
+            try:
+                queue.get_nowait()
+                self.dropped_ticks += 1
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(item)
+
+    async def _send_subscription(self, action: str, instruments: List[Dict[str, Any]], mode: int,
+                                 batch_size: int, max_in_flight: int, timeout: float) -> Dict[str, str]:
+        statuses = {}
+        keys = []
+        for instrument in instruments:
+            key = FeedAPI._instrument_key(instrument)
+            if key is None:
+                self._log(1, "ERROR", f"Invalid instrument: {instrument}")
+                statuses[f"{instrument.get('exchange')}:{instrument.get('symbol')}"] = "invalid"
+                continue
+            keys.append(key)
+
+        batch_size = max(1, int(batch_size))
+        window = batch_size * max(1, int(max_in_flight))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        request = _AsyncSubscriptionRequest()
+
+        async def wait_until(predicate):
+            try:
+                await asyncio.wait_for(self._ack_cond.wait_for(predicate),
+                                       max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            async with self._ack_cond:
+                # Flow control: wait for earlier batches to be acknowledged
+                await wait_until(lambda: request.outstanding + len(batch) <= window)
+                for exchange, symbol in batch:
+                    self._pending_acks[(action, exchange, symbol, mode)] = request
+                    request.outstanding += 1
+
+            msg = {
+                "action": action,
+                "symbols": [{"symbol": symbol, "exchange": exchange} for exchange, symbol in batch],
+                "mode": mode
+            }
+            if action == "subscribe":
+                msg["depth"] = 5  # Default depth level
+            try:
+                await self.ws.send(codec.dumps(msg))
+            except Exception as e:
+                self._log(1, "ERROR", f"Error sending {action} batch: {e}")
+                for exchange, symbol in keys[start:]:
+                    self._pending_acks.pop((action, exchange, symbol, mode), None)
+                    statuses[f"{exchange}:{symbol}"] = "send_failed"
+                break
+
+        async with self._ack_cond:
+            await wait_until(lambda: request.outstanding <= 0)
+            for exchange, symbol in keys:
+                self._pending_acks.pop((action, exchange, symbol, mode), None)
+
+        for exchange, symbol in keys:
+            symbol_key = f"{exchange}:{symbol}"
+            if symbol_key not in statuses:
+                statuses[symbol_key] = request.statuses.get(symbol_key, "pending")
+        return statuses
+
+    async def subscribe(self, instruments: List[Dict[str, Any]], mode=MODE_LTP,
+                        batch_size: int = DEFAULT_BATCH_SIZE, max_in_flight: int = 4,
+                        timeout: float = 10.0) -> Dict[str, str]:
+        """
+        Subscribe to market data for instruments in batched frames.
+
+        Args:
+            instruments: List of instrument dicts with 'exchange' and 'symbol' keys.
+            mode: 1/'ltp', 2/'quote' or 3/'depth'. Defaults to LTP.
+            batch_size (int): Instruments per frame. Defaults to 100.
+            max_in_flight (int): Batches allowed to await acknowledgement at once. Defaults to 4.
+            timeout (float): Maximum seconds to wait for acknowledgements. Defaults to 10.0.
+
+        Returns:
+            dict: Status per 'EXCHANGE:SYMBOL' key, as returned by ``FeedAPI.subscribe``.
+        """
+        mode = FeedAPI._mode_number(mode)
+        if not self.authenticated:
+            self._log(1, "ERROR", "Not authenticated with WebSocket server")
+            return {}
+        return await self._send_subscription("subscribe", instruments, mode, batch_size,
+                                             max_in_flight, timeout)
+
+    async def unsubscribe(self, instruments: List[Dict[str, Any]], mode=MODE_LTP,
+                          batch_size: int = DEFAULT_BATCH_SIZE, max_in_flight: int = 4,
+                          timeout: float = 10.0) -> Dict[str, str]:
+        """Unsubscribe instruments from a mode. Arguments match subscribe()."""
+        mode = FeedAPI._mode_number(mode)
+        if not self.authenticated:
+            return {}
+        return await self._send_subscription("unsubscribe", instruments, mode, batch_size,
+                                             max_in_flight, timeout)
+
+    async def stream(self, instruments: Optional[List[Dict[str, Any]]] = None,
+                     mode=MODE_LTP) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over ticks as they arrive.
+
+        Args:
+            instruments (list, optional): Instruments to subscribe before streaming.
+                Only ticks for these instruments are yielded. If omitted, every tick
+                of ``mode`` from existing subscriptions is yielded.
+            mode: 1/'ltp', 2/'quote' or 3/'depth'. Defaults to LTP.
+
+        Yields:
+            dict: Tick in the same format as FeedAPI callbacks. The iterator ends
+                when the connection closes, or at once if the feed is not connected.
+                Instruments subscribed here are unsubscribed when the iterator ends,
+                unless another open stream still wants them.
+        """
+        mode = FeedAPI._mode_number(mode)
+        keys = None
+        if instruments:
+            keys = {f"{exchange}:{symbol}" for exchange, symbol in
+                    filter(None, (FeedAPI._instrument_key(i) for i in instruments))}
+
+        # Register before subscribing so the first ticks are not missed
+        queue = asyncio.Queue(self.queue_size)
+        entry = (queue, mode, keys)
+        self._streams.append(entry)
+        subscribed = False
+        try:
+            # No end-of-stream marker will ever arrive on a closed or unopened socket
+            if not self.connected:
+                return
+            if instruments:
+                await self.subscribe(instruments, mode)
+                subscribed = True
+            while True:
+                tick = await queue.get()
+                if tick is None:
+                    return
+                yield tick
+        finally:
+            self._streams.remove(entry)
+            if subscribed and self.authenticated:
+                await self._release_stream_instruments(instruments, mode)
+
+    async def _release_stream_instruments(self, instruments: List[Dict[str, Any]], mode: int) -> None:
+        """Unsubscribe a finished stream's instruments that no other open stream still wants."""
+        wanted = set()
+        for _, stream_mode, keys in self._streams:
+            if stream_mode != mode:
+                continue
+            if keys is None:
+                return
+            wanted |= keys
+        release = []
+        for instrument in instruments:
+            key = FeedAPI._instrument_key(instrument)
+            if key is not None and f"{key[0]}:{key[1]}" not in wanted:
+                release.append(instrument)
+        if not release:
+            return
+        try:
+            await self.unsubscribe(release, mode)
+        except Exception as e:
+            self._log(1, "ERROR", f"Error unsubscribing stream instruments: {e}")
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Real-time Bar Aggregator
+    https://docs.layr0.org
+
+Builds OHLCV bars incrementally from WebSocket LTP/Quote ticks for any number
+of instruments, so strategies get fresh candles without polling ``history``.
+Open bars and completed bars live in NumPy arrays indexed by instrument row;
+completed bars are kept in a fixed-capacity ring per instrument and interval.
+
+Example:
+    bars = BarAggregator(intervals=("1m", "5m"), on_bar=print)
+    client.add_bar_aggregator(bars)
+    client.subscribe_quote([{"exchange": "NSE", "symbol": "SBIN"}])
+    ...
+    df = bars.bars("NSE:SBIN", "5m")      # same layout as client.history()
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600}
+
+
+def interval_seconds(interval: Union[str, int]) -> int:
+    """Parse an interval such as '1s', '1m', '5m', '1h' or a number of seconds."""
+    if isinstance(interval, (int, np.integer)):
+        seconds = int(interval)
+    else:
+        text = str(interval).strip().lower()
+        unit = INTERVAL_UNITS.get(text[-1:])
+        if unit is None or not text[:-1].isdigit():
+            raise ValueError(f"Invalid bar interval '{interval}'. Use e.g. '1s', '1m', '5m', '1h' or seconds")
+        seconds = int(text[:-1]) * unit
+    if seconds <= 0:
+        raise ValueError(f"Invalid bar interval '{interval}': must be positive")
+    return seconds
+
+
+class _IntervalBars:
+    """Open bars and completed-bar rings for one interval across all instruments."""
+
+    FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, seconds: int, capacity: int, rows: int):
+        self.span = seconds * 1000
+        self.capacity = capacity
+        # Open bar per row; start == -1 means no bar is open
+        self.start = np.full(rows, -1, dtype=np.int64)
+        self.open = np.zeros(rows, dtype=np.float64)
+        self.high = np.zeros(rows, dtype=np.float64)
+        self.low = np.zeros(rows, dtype=np.float64)
+        self.close = np.zeros(rows, dtype=np.float64)
+        self.volume = np.zeros(rows, dtype=np.int64)
+        # Completed bars: one ring of ``capacity`` bars per row
+        self.history = {
+            'timestamp': np.zeros((rows, capacity), dtype=np.int64),
+            'open': np.zeros((rows, capacity), dtype=np.float64),
+            'high': np.zeros((rows, capacity), dtype=np.float64),
+            'low': np.zeros((rows, capacity), dtype=np.float64),
+            'close': np.zeros((rows, capacity), dtype=np.float64),
+            'volume': np.zeros((rows, capacity), dtype=np.int64),
+        }
+        self.count = np.zeros(rows, dtype=np.int64)
+
+    def grow(self, rows: int) -> None:
+        old = len(self.start)
+        for name in ('start', 'open', 'high', 'low', 'close', 'volume', 'count'):
+            array = getattr(self, name)
+            grown = np.full(rows, -1, dtype=array.dtype) if name == 'start' else np.zeros(rows, dtype=array.dtype)
+            grown[:old] = array
+            setattr(self, name, grown)
+        for name, array in self.history.items():
+            grown = np.zeros((rows, self.capacity), dtype=array.dtype)
+            grown[:old] = array
+            self.history[name] = grown
+
+    def update(self, row: int, price: float, quantity: int, timestamp: int) -> bool:
+        """Apply a tick; returns True if it closed the previous bar."""
+        start = timestamp - timestamp % self.span
+        current = self.start[row]
+        if current < 0 or start > current:
+            closed = current >= 0 and self.finish(row)
+            self.start[row] = start
+            self.open[row] = self.high[row] = self.low[row] = self.close[row] = price
+            self.volume[row] = quantity
+            return closed
+        # Same bar; a late tick from an earlier bucket is folded into the open bar
+        if price > self.high[row]:
+            self.high[row] = price
+        if price < self.low[row]:
+            self.low[row] = price
+        self.close[row] = price
+        self.volume[row] += quantity
+        return False
+
+    def finish(self, row: int) -> bool:
+        """Move the open bar of ``row`` into its completed ring."""
+        slot = self.count[row] % self.capacity
+        history = self.history
+        history['timestamp'][row, slot] = self.start[row]
+        history['open'][row, slot] = self.open[row]
+        history['high'][row, slot] = self.high[row]
+        history['low'][row, slot] = self.low[row]
+        history['close'][row, slot] = self.close[row]
+        history['volume'][row, slot] = self.volume[row]
+        self.count[row] += 1
+        self.start[row] = -1
+        return True
+
+    def last(self, row: int) -> Dict[str, Any]:
+        slot = (self.count[row] - 1) % self.capacity
+        return {name: self.history[name][row, slot].item() for name in self.FIELDS}
+
+    def arrays(self, row: int, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Completed bars of ``row``, oldest first (copies)."""
+        count = int(self.count[row])
+        size = min(count, self.capacity)
+        size = size if n is None else max(0, min(int(n), size))
+        slots = np.arange(count - size, count) % self.capacity
+        return {name: self.history[name][row, slots] for name in self.FIELDS}
+
+
+class BarAggregator:
+    """
+    Incremental OHLCV bars for many instruments and intervals.
+
+    Bars are aligned to the interval on the tick timestamp and close when the
+    first tick of the next interval arrives. Call ``flush()`` periodically
+    (e.g. once a second) to close bars of instruments that stopped ticking.
+    Volume comes from the cumulative day volume of Quote ticks, or from the
+    tick quantity when no cumulative volume is available.
+    """
+
+    def __init__(self, intervals: Iterable[Union[str, int]] = ('1m',), capacity: int = 500,
+                 on_bar: Optional[Callable] = None, rows: int = 64,
+                 logger: Optional[Callable[[int, str, str], None]] = None):
+        """
+        Args:
+            intervals: Bar intervals, e.g. ('1s', '1m', '5m') or seconds such as 90.
+            capacity (int): Completed bars kept per instrument and interval. Defaults to 500.
+            on_bar (callable, optional): Called with a dict for every completed bar:
+                {'exchange', 'symbol', 'interval', 'timestamp', 'open', 'high', 'low',
+                 'close', 'volume'}; 'timestamp' is the bar start in epoch ms.
+            rows (int): Instruments preallocated up front. Defaults to 64.
+            logger (callable, optional): ``logger(level, category, message)`` used for
+                callback errors. FeedAPI.add_bar_aggregator() wires in the feed's logger.
+        """
+        self.capacity = max(1, int(capacity))
+        self.index: Dict[str, int] = {}
+        self.keys: List[tuple] = []
+        self._rows = max(1, int(rows))
+        self._intervals: Dict[str, _IntervalBars] = {}
+        for interval in intervals:
+            seconds = interval_seconds(interval)
+            label = interval if isinstance(interval, str) else f"{seconds}s"
+            self._intervals[label] = _IntervalBars(seconds, self.capacity, self._rows)
+        self._last_volume = np.full(self._rows, -1, dtype=np.int64)
+        self.callbacks: List[Callable] = [on_bar] if on_bar else []
+        self.logger = logger
+        self.lock = threading.Lock()
+
+    @property
+    def intervals(self) -> List[str]:
+        return list(self._intervals)
+
+    def on_bar(self, callback: Callable) -> Callable:
+        """Register a bar-close callback (usable as a decorator)."""
+        self.callbacks.append(callback)
+        return callback
+
+    def _row_for(self, exchange: str, symbol: str) -> int:
+        key = f"{exchange}:{symbol}"
+        row = self.index.get(key)
+        if row is None:
+            row = self.index[key] = len(self.keys)
+            self.keys.append((exchange, symbol))
+            if row >= self._rows:
+                self._rows *= 2
+                for bars in self._intervals.values():
+                    bars.grow(self._rows)
+                last_volume = np.full(self._rows, -1, dtype=np.int64)
+                last_volume[:row] = self._last_volume
+                self._last_volume = last_volume
+        return row
+
+    def _row(self, symbol: str, exchange: Optional[str]) -> Optional[int]:
+        return self.index.get(f"{exchange}:{symbol}" if exchange else symbol)
+
+    def _emit(self, closed: List[Dict[str, Any]]) -> None:
+        for bar in closed:
+            for callback in self.callbacks:
+                try:
+                    callback(bar)
+                except Exception as e:
+                    if self.logger:
+                        self.logger(1, "ERROR", f"Bar callback error: {e}")
+
+    def _closed_bar(self, row: int, label: str) -> Dict[str, Any]:
+        exchange, symbol = self.keys[row]
+        bar = self._intervals[label].last(row)
+        bar.update(exchange=exchange, symbol=symbol, interval=label)
+        return bar
+
+    def update(self, exchange: str, symbol: str, price: float, timestamp: Optional[int] = None,
+               quantity: int = 0, volume: Optional[int] = None) -> None:
+        """
+        Apply one tick.
+
+        Args:
+            exchange (str): Exchange code.
+            symbol (str): Trading symbol.
+            price (float): Last traded price.
+            timestamp (int, optional): Tick time in epoch ms. Defaults to now.
+            quantity (int): Traded quantity, used when ``volume`` is not given.
+            volume (int, optional): Cumulative day volume; bar volume is its increase.
+        """
+        if price is None:
+            return
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        closed = []
+        with self.lock:
+            row = self._row_for(exchange, symbol)
+            if volume is not None:
+                previous = self._last_volume[row]
+                quantity = volume - previous if 0 <= previous <= volume else 0
+                self._last_volume[row] = volume
+            for label, bars in self._intervals.items():
+                if bars.update(row, price, quantity, timestamp) and self.callbacks:
+                    closed.append(self._closed_bar(row, label))
+        self._emit(closed)
+
+    def on_tick(self, message: Dict[str, Any]) -> None:
+        """Feed callback: apply a market_data message as delivered to on_data_received."""
+        data = message.get('data') or {}
+        self.update(message.get('exchange'), message.get('symbol'), data.get('ltp'), data.get('timestamp'),
+                    data.get('last_trade_quantity') or 0, data.get('volume'))
+
+    def flush(self, now: Optional[int] = None) -> None:
+        """Close every open bar whose interval ended before ``now`` (epoch ms, defaults to now)."""
+        if now is None:
+            now = int(time.time() * 1000)
+        closed = []
+        with self.lock:
+            count = len(self.keys)
+            for label, bars in self._intervals.items():
+                start = bars.start[:count]
+                for row in np.nonzero((start >= 0) & (start + bars.span <= now))[0]:
+                    bars.finish(row)
+                    if self.callbacks:
+                        closed.append(self._closed_bar(row, label))
+        self._emit(closed)
+
+    def arrays(self, symbol: str, interval: str = '1m', n: Optional[int] = None,
+               exchange: Optional[str] = None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Completed bars as NumPy arrays, oldest first.
+
+        Args:
+            symbol (str): 'EXCHANGE:SYMBOL', or a bare symbol together with ``exchange``.
+            interval (str): One of the aggregator's intervals. Defaults to '1m'.
+            n (int, optional): Number of most recent bars. Defaults to all retained bars.
+            exchange (str, optional): Exchange of a bare symbol.
+
+        Returns:
+            dict: {'timestamp', 'open', 'high', 'low', 'close', 'volume'} arrays,
+                or None if the instrument has not ticked.
+        """
+        bars = self._intervals[interval]
+        with self.lock:
+            row = self._row(symbol, exchange)
+            if row is None:
+                return None
+            return bars.arrays(row, n)
+
+    def bars(self, symbol: str, interval: str = '1m', n: Optional[int] = None,
+             exchange: Optional[str] = None) -> pd.DataFrame:
+        """
+        Completed bars as a DataFrame laid out like ``history()``: open, high,
+        low, close and volume columns indexed by the bar start time (IST).
+        """
+        arrays = self.arrays(symbol, interval, n, exchange)
+        if arrays is None:
+            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
+        index = pd.to_datetime(arrays.pop('timestamp'), unit='ms').tz_localize('UTC').tz_convert('Asia/Kolkata')
+        return pd.DataFrame(arrays, index=pd.Index(index, name='timestamp'))
+
+    def current(self, symbol: str, interval: str = '1m',
+                exchange: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The bar still being built for an instrument, or None."""
+        bars = self._intervals[interval]
+        with self.lock:
+            row = self._row(symbol, exchange)
+            if row is None or bars.start[row] < 0:
+                return None
+            return {
+                'timestamp': int(bars.start[row]),
+                'open': float(bars.open[row]),
+                'high': float(bars.high[row]),
+                'low': float(bars.low[row]),
+                'close': float(bars.close[row]),
+                'volume': int(bars.volume[row]),
+            }
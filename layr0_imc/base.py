@@ -4,14 +4,24 @@ layr0_imc REST API Documentation - Base API Class
     https://docs.layr0.org
 """
 
+import time
 import httpx
+from . import codec
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy, CircuitBreaker
 
 class BaseAPI:
     """
     Base class to handle all the API calls to layr0_imc.
+
+    All REST mixins send their requests through a single long-lived
+    ``httpx.Client`` owned by this class, so TCP connections and TLS sessions
+    are reused across calls instead of being set up for every request.
     """
 
-    def __init__(self, api_key, host="http://127.0.0.1:5000", version="v1", timeout=120.0):
+    def __init__(self, api_key, host="http://127.0.0.1:5000", version="v1", timeout=120.0,
+                 max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0,
+                 http2=False, rate_limiter=None, retry_policy=None, circuit_breaker=None):
         """
         Initialize the api object with an API key and optionally a host URL and API version.
 
@@ -20,6 +30,17 @@ class BaseAPI:
         - host (str): Base URL for the API endpoints. Defaults to localhost.
         - version (str): API version. Defaults to "v1".
         - timeout (float): Request timeout in seconds. Defaults to 120.0 seconds.
+        - max_connections (int): Maximum number of concurrent connections in the pool. Defaults to 100.
+        - max_keepalive_connections (int): Maximum number of idle connections kept alive. Defaults to 20.
+        - keepalive_expiry (float): Seconds an idle connection is kept before closing. Defaults to 30.0.
+        - http2 (bool): Enable HTTP/2. Requires the optional ``h2`` package
+          (``pip install httpx[http2]``). Defaults to False.
+        - rate_limiter (RateLimiter or bool, optional): Client-side per-endpoint-group
+          rate limiter. Pass True for the default server limits. Defaults to None (disabled).
+        - retry_policy (RetryPolicy or bool, optional): Retry transient failures with jittered
+          exponential backoff. Pass True for the default policy. Defaults to None (no retries).
+        - circuit_breaker (CircuitBreaker or bool, optional): Fail fast while the server is down.
+          Pass True for the default breaker. Defaults to None (disabled).
         """
         self.api_key = api_key
         self.base_url = f"{host}/api/{version}/"
@@ -27,3 +48,125 @@ class BaseAPI:
             'Content-Type': 'application/json'
         }
         self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2
+        self.rate_limiter = RateLimiter() if rate_limiter is True else (rate_limiter or None)
+        self.retry_policy = RetryPolicy() if retry_policy is True else (retry_policy or None)
+        self.circuit_breaker = CircuitBreaker() if circuit_breaker is True else (circuit_breaker or None)
+        self.client = self._build_client()
+
+    def _build_client(self):
+        """Create the pooled HTTP client shared by all REST methods."""
+        return httpx.Client(timeout=self.timeout, limits=self.limits, http2=self.http2)
+
+    def close(self):
+        """Close the pooled HTTP client and release its connections."""
+        if self.client is not None:
+            self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _make_request(self, endpoint, payload, method="POST"):
+        """Make HTTP request with proper error handling"""
+        url = self.base_url + endpoint
+        attempts = self.retry_policy.attempts_for(endpoint, payload) if self.retry_policy else 1
+
+        for attempt in range(attempts):
+            # Rate limit first: a half-open breaker's probe must not be spent on a rejected request
+            if self.rate_limiter is not None and not self.rate_limiter.acquire(endpoint):
+                return self.rate_limiter.rejection(endpoint)
+            if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+                return self.circuit_breaker.rejection(self.base_url)
+
+            retry = attempt + 1 < attempts
+            try:
+                if method == "GET":
+                    # GET requests carry no body, so no Content-Type header
+                    response = self.client.get(url, params=payload, timeout=self.timeout)
+                else:
+                    response = self.client.post(url, content=codec.dumps(payload), headers=self.headers,
+                                                timeout=self.timeout)
+            except Exception as e:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record(error=e)
+                if retry and self.retry_policy.should_retry_exception(e):
+                    time.sleep(self.retry_policy.backoff(attempt))
+                    continue
+                return self._error_from_exception(e)
+
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record(response=response)
+            if retry and self.retry_policy.should_retry_response(response):
+                time.sleep(self.retry_policy.backoff(attempt, response))
+                continue
+            return self._handle_response(response)
+
+    @staticmethod
+    def _error_from_exception(error):
+        """Convert a transport exception into the standard error response dict"""
+        if isinstance(error, httpx.TimeoutException):
+            return {
+                'status': 'error',
+                'message': 'Request timed out. The server took too long to respond.',
+                'error_type': 'timeout_error'
+            }
+        if isinstance(error, httpx.ConnectError):
+            return {
+                'status': 'error',
+                'message': 'Failed to connect to the server. Please check if the server is running.',
+                'error_type': 'connection_error'
+            }
+        if isinstance(error, httpx.HTTPError):
+            return {
+                'status': 'error',
+                'message': f'HTTP error occurred: {str(error)}',
+                'error_type': 'http_error'
+            }
+        return {
+            'status': 'error',
+            'message': f'An unexpected error occurred: {str(error)}',
+            'error_type': 'unknown_error'
+        }
+
+    def _handle_response(self, response):
+        """Helper method to handle API responses"""
+        try:
+            if response.status_code != 200:
+                return {
+                    'status': 'error',
+                    'message': f'HTTP {response.status_code}: {response.text}',
+                    'code': response.status_code,
+                    'error_type': 'http_error'
+                }
+
+            data = codec.loads(response.content)
+            if data.get('status') == 'error':
+                return {
+                    'status': 'error',
+                    'message': data.get('message', 'Unknown error'),
+                    'code': response.status_code,
+                    'error_type': 'api_error'
+                }
+            return data
+
+        except ValueError:
+            return {
+                'status': 'error',
+                'message': 'Invalid JSON response from server',
+                'raw_response': response.text,
+                'error_type': 'json_error'
+            }
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': str(e),
+                'error_type': 'unknown_error'
+            }
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc JSON Codec
+
+Pluggable JSON encoding/decoding for REST responses and WebSocket messages.
+The fastest installed backend is used automatically:
+
+    msgspec  ->  orjson  ->  json (stdlib)
+
+Install the optional extras with ``pip install layr0-IMC[fast]``.
+
+With msgspec installed, payloads can also be decoded straight into typed
+structs (``MarketData``, ``QuoteResponse``, ``DepthResponse``,
+``OrderBookResponse``, ``OptionChainResponse``) without building an
+intermediate dict. Without msgspec these names are aliases of ``dict`` and
+``decode`` returns plain dicts, so calling code works either way.
+
+Example:
+    from layr0_imc import codec
+
+    tick = codec.decode(raw_message, codec.MarketData)
+    print(tick.data.ltp)
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+Number = Union[int, float]
+
+if msgspec is not None:
+    DecodeError = (msgspec.DecodeError, json.JSONDecodeError) + \
+        ((orjson.JSONDecodeError,) if orjson is not None else ())
+
+    # ------------------------------------------------------------------
+    # WebSocket market data
+    # ------------------------------------------------------------------
+    class DepthLevel(msgspec.Struct):
+        price: Number = 0
+        quantity: Number = 0
+        orders: Number = 0
+
+    class DepthBook(msgspec.Struct):
+        buy: List[DepthLevel] = []
+        sell: List[DepthLevel] = []
+
+    class TickData(msgspec.Struct):
+        ltp: Number = 0
+        open: Number = 0
+        high: Number = 0
+        low: Number = 0
+        close: Number = 0
+        volume: Number = 0
+        oi: Number = 0
+        last_trade_quantity: Number = 0
+        avg_trade_price: Number = 0
+        change: Number = 0
+        change_percent: Number = 0
+        timestamp: Optional[Number] = None
+        depth: Optional[DepthBook] = None
+
+    class MarketData(msgspec.Struct):
+        type: str
+        symbol: str = ""
+        exchange: str = ""
+        mode: int = 0
+        data: Optional[TickData] = None
+
+    # ------------------------------------------------------------------
+    # REST responses
+    # ------------------------------------------------------------------
+    class Quote(msgspec.Struct):
+        open: Number = 0
+        high: Number = 0
+        low: Number = 0
+        ltp: Number = 0
+        ask: Number = 0
+        bid: Number = 0
+        prev_close: Number = 0
+        volume: Number = 0
+        oi: Number = 0
+
+    class QuoteResponse(msgspec.Struct):
+        status: str
+        data: Optional[Quote] = None
+        message: Optional[str] = None
+
+    class PriceLevel(msgspec.Struct):
+        price: Number = 0
+        quantity: Number = 0
+
+    class Depth(msgspec.Struct):
+        open: Number = 0
+        high: Number = 0
+        low: Number = 0
+        ltp: Number = 0
+        ltq: Number = 0
+        prev_close: Number = 0
+        volume: Number = 0
+        oi: Number = 0
+        totalbuyqty: Number = 0
+        totalsellqty: Number = 0
+        asks: List[PriceLevel] = []
+        bids: List[PriceLevel] = []
+
+    class DepthResponse(msgspec.Struct):
+        status: str
+        data: Optional[Depth] = None
+        message: Optional[str] = None
+
+    class Order(msgspec.Struct):
+        action: str = ""
+        symbol: str = ""
+        exchange: str = ""
+        orderid: str = ""
+        product: str = ""
+        quantity: Union[Number, str] = 0
+        price: Number = 0
+        pricetype: str = ""
+        order_status: str = ""
+        trigger_price: Number = 0
+        timestamp: str = ""
+
+    class OrderBookStatistics(msgspec.Struct):
+        total_buy_orders: Number = 0
+        total_sell_orders: Number = 0
+        total_completed_orders: Number = 0
+        total_open_orders: Number = 0
+        total_rejected_orders: Number = 0
+
+    class OrderBook(msgspec.Struct):
+        orders: List[Order] = []
+        statistics: Optional[OrderBookStatistics] = None
+
+    class OrderBookResponse(msgspec.Struct):
+        status: str
+        data: Optional[OrderBook] = None
+        message: Optional[str] = None
+
+    class OptionLeg(msgspec.Struct):
+        symbol: str = ""
+        label: str = ""
+        ltp: Number = 0
+        bid: Number = 0
+        ask: Number = 0
+        open: Number = 0
+        high: Number = 0
+        low: Number = 0
+        prev_close: Number = 0
+        volume: Number = 0
+        oi: Number = 0
+        lotsize: Number = 0
+        tick_size: Number = 0
+
+    class OptionChainRow(msgspec.Struct):
+        strike: Number = 0
+        ce: Optional[OptionLeg] = None
+        pe: Optional[OptionLeg] = None
+
+    class OptionChainResponse(msgspec.Struct):
+        status: str
+        underlying: str = ""
+        underlying_ltp: Number = 0
+        expiry_date: str = ""
+        atm_strike: Number = 0
+        chain: List[OptionChainRow] = []
+        message: Optional[str] = None
+
+else:
+    DecodeError = (json.JSONDecodeError,) + ((orjson.JSONDecodeError,) if orjson is not None else ())
+
+    # Without msgspec the typed payloads are decoded as plain dicts
+    DepthLevel = DepthBook = TickData = MarketData = dict
+    Quote = QuoteResponse = PriceLevel = Depth = DepthResponse = dict
+    Order = OrderBookStatistics = OrderBook = OrderBookResponse = dict
+    OptionLeg = OptionChainRow = OptionChainResponse = dict
+
+
+# ----------------------------------------------------------------------
+# Backend selection
+# ----------------------------------------------------------------------
+BACKENDS = ('msgspec', 'orjson', 'json')
+
+backend = None
+_typed_decoders = {}
+
+
+def _json_dumps(obj: Any) -> str:
+    return json.dumps(obj)
+
+
+def set_backend(name: str = 'auto') -> str:
+    """
+    Select the JSON backend used by ``loads``/``dumps``.
+
+    Args:
+        name (str): 'auto', 'msgspec', 'orjson' or 'json'. 'auto' picks the
+            fastest installed backend.
+
+    Returns:
+        str: The backend now in use.
+    """
+    global backend, loads, dumps
+
+    if name == 'auto':
+        name = 'msgspec' if msgspec is not None else ('orjson' if orjson is not None else 'json')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}'. Choose from {BACKENDS}")
+
+    if name == 'msgspec':
+        if msgspec is None:
+            raise ImportError("msgspec is not installed. Install it with 'pip install msgspec'")
+        decoder = msgspec.json.Decoder()
+        encoder = msgspec.json.Encoder()
+        loads = decoder.decode
+        dumps = lambda obj: encoder.encode(obj).decode()  # noqa: E731
+    elif name == 'orjson':
+        if orjson is None:
+            raise ImportError("orjson is not installed. Install it with 'pip install orjson'")
+        loads = orjson.loads
+        dumps = lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()  # noqa: E731
+    else:
+        loads = json.loads
+        dumps = _json_dumps
+
+    backend = name
+    return backend
+
+
+def decode(data: Union[str, bytes], type: Any = None) -> Any:
+    """
+    Decode a JSON document, optionally straight into a typed struct.
+
+    Args:
+        data (str or bytes): Raw JSON.
+        type (optional): One of the struct types in this module (or any
+            msgspec-compatible type). Ignored when msgspec is not installed.
+
+    Returns:
+        The decoded struct, or plain Python objects when no type is given.
+    """
+    if type is None or type is dict or msgspec is None:
+        return loads(data)
+    decoder = _typed_decoders.get(type)
+    if decoder is None:
+        decoder = _typed_decoders[type] = msgspec.json.Decoder(type)
+    return decoder.decode(data)
+
+
+def convert(obj: Dict[str, Any], type: Any) -> Any:
+    """Convert an already-decoded dict (e.g. a REST response) into a typed struct."""
+    if type is dict or msgspec is None:
+        return obj
+    return msgspec.convert(obj, type)
+
+
+loads = json.loads
+dumps = _json_dumps
+set_backend('auto')
@@ -4,11 +4,34 @@ layr0_imc REST API Documentation - Data Methods
     https://docs.layr0.org
 """
 
-import httpx
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 import time
 from .base import BaseAPI
+from .bars import interval_seconds
+from .instruments import InstrumentStore
+from .histcache import HistoryCache, history_arrays, merge_columns
+
+# Exchanges downloaded by instruments() when no exchange is specified
+INSTRUMENT_EXCHANGES = ['NSE', 'BSE', 'NFO', 'BFO', 'MCX', 'CDS', 'BCD', 'NSE_INDEX', 'BSE_INDEX']
+
+# Bars requested per history() chunk; long ranges are split into chunks of about this size
+HISTORY_CHUNK_BARS = 20000
+# Trading seconds per day used to size chunks (09:15-15:30)
+TRADING_SECONDS_PER_DAY = 22500
+
+
+def history_chunk_days(interval):
+    """Calendar days per history() request for an interval, or None for daily and longer bars"""
+    if interval in ('D', 'W', 'M'):
+        return None
+    try:
+        seconds = interval_seconds(interval)
+    except ValueError:
+        return None
+    return max(1, HISTORY_CHUNK_BARS * seconds // TRADING_SECONDS_PER_DAY)
 
 class DataAPI(BaseAPI):
     """
@@ -16,72 +39,6 @@ class DataAPI(BaseAPI):
     Inherits from the BaseAPI class.
     """
 
-    def _make_request(self, endpoint, payload):
-        """Make HTTP request with proper error handling"""
-        url = self.base_url + endpoint
-        try:
-            response = httpx.post(url, json=payload, headers=self.headers, timeout=self.timeout)
-            return self._handle_response(response)
-        except httpx.TimeoutException:
-            return {
-                'status': 'error',
-                'message': 'Request timed out. The server took too long to respond.',
-                'error_type': 'timeout_error'
-            }
-        except httpx.ConnectError:
-            return {
-                'status': 'error',
-                'message': 'Failed to connect to the server. Please check if the server is running.',
-                'error_type': 'connection_error'
-            }
-        except httpx.HTTPError as e:
-            return {
-                'status': 'error',
-                'message': f'HTTP error occurred: {str(e)}',
-                'error_type': 'http_error'
-            }
-        except Exception as e:
-            return {
-                'status': 'error',
-                'message': f'An unexpected error occurred: {str(e)}',
-                'error_type': 'unknown_error'
-            }
-    
-    def _handle_response(self, response):
-        """Helper method to handle API responses"""
-        try:
-            if response.status_code != 200:
-                return {
-                    'status': 'error',
-                    'message': f'HTTP {response.status_code}: {response.text}',
-                    'code': response.status_code,
-                    'error_type': 'http_error'
-                }
-            
-            data = response.json()
-            if data.get('status') == 'error':
-                return {
-                    'status': 'error',
-                    'message': data.get('message', 'Unknown error'),
-                    'code': response.status_code,
-                    'error_type': 'api_error'
-                }
-            return data
-            
-        except ValueError:
-            return {
-                'status': 'error',
-                'message': 'Invalid JSON response from server',
-                'raw_response': response.text,
-                'error_type': 'json_error'
-            }
-        except Exception as e:
-            return {
-                'status': 'error',
-                'message': str(e),
-                'error_type': 'unknown_error'
-            }
-
     def quotes(self, *, symbol, exchange, **kwargs):
         """
         Get real-time quotes for a symbol.
@@ -195,7 +152,7 @@ class DataAPI(BaseAPI):
                 payload[key] = value
         return self._make_request("symbol", payload)
         
-    def search(self, *, query, exchange=None, **kwargs):
+    def search(self, *, query, exchange=None, local=False, instrumenttype=None, limit=20, **kwargs):
         """
         Search for symbols across exchanges.
 
@@ -203,6 +160,10 @@ class DataAPI(BaseAPI):
         - query (str): Search query for symbol. Required.
         - exchange (str): Exchange filter. Optional.
             Supported exchanges: NSE, NFO, BSE, BFO, MCX, CDS, BCD, NCDEX, NSE_INDEX, BSE_INDEX, MCX_INDEX
+        - local (bool): Search the local instrument master (see instrument_store()) instead of
+            calling the server. Default: False
+        - instrumenttype (str or list): Instrument type filter for local searches, e.g. "EQ" or ["CE", "PE"]. Optional.
+        - limit (int): Maximum results for local searches. Default: 20
         - **kwargs: Optional additional parameters for future API extensions.
 
         Returns:
@@ -216,6 +177,18 @@ class DataAPI(BaseAPI):
             - strike: Strike price (for options)
             - expiry: Expiry date (for derivatives)
         """
+        if local:
+            try:
+                data = self.instrument_store().search(query, exchange=exchange or None,
+                                                      instrumenttype=instrumenttype, limit=limit)
+            except Exception as e:
+                return {
+                    'status': 'error',
+                    'message': f'Local symbol search failed: {str(e)}',
+                    'error_type': 'processing_error'
+                }
+            return {'status': 'success', 'data': data}
+
         payload = {
             "apikey": self.api_key,
             "query": query
@@ -229,7 +202,8 @@ class DataAPI(BaseAPI):
 
         return self._make_request("search", payload)
         
-    def history(self, *, symbol, exchange, interval, start_date, end_date, **kwargs):
+    def history(self, *, symbol, exchange, interval, start_date, end_date, cache=True,
+                chunk_days=None, max_workers=4, on_progress=None, **kwargs):
         """
         Get historical data for a symbol in pandas DataFrame format.
 
@@ -240,6 +214,15 @@ class DataAPI(BaseAPI):
                        Use interval() method to get supported intervals.
         - start_date (str): Start date in format 'YYYY-MM-DD'. Required.
         - end_date (str): End date in format 'YYYY-MM-DD'. Required.
+        - cache (bool): Use the history cache when one is enabled (see enable_history_cache()).
+            Requests with additional kwargs always bypass it. Default: True
+        - chunk_days (int): Calendar days per request. Longer ranges are split into chunks
+            fetched concurrently and stitched together. Default: sized by interval
+            (about 20000 bars per chunk; daily and longer intervals are not chunked)
+        - max_workers (int): Chunks fetched at once; requests still pass through the
+            client's rate limiter. Default: 4
+        - on_progress (callable): Called as on_progress(completed_chunks, total_chunks)
+            after each chunk arrives. Optional.
         - **kwargs: Optional additional parameters for future API extensions.
 
         Returns:
@@ -248,21 +231,320 @@ class DataAPI(BaseAPI):
                                 For intraday data (non-daily timeframes), timestamps
                                 are converted to IST. Daily data is already in IST.
         """
-        payload = {
-            "apikey": self.api_key,
-            "symbol": symbol,
-            "exchange": exchange,
-            "interval": interval,
-            "start_date": start_date,
-            "end_date": end_date
-        }
-        # Add any additional kwargs
-        for key, value in kwargs.items():
-            if value is not None:
-                payload[key] = value
+        # Additional kwargs are passed through to every request
+        extra = {key: value for key, value in kwargs.items() if value is not None}
+
+        def fetch(start, end):
+            return self._fetch_history(symbol, exchange, interval, start, end, extra,
+                                       chunk_days, max_workers, on_progress)
+
+        history_cache = getattr(self, 'history_cache', None)
+        if history_cache is not None and cache and not extra:
+            result = history_cache.get(symbol, exchange, interval, start_date, end_date, fetch)
+            if result.get('status') == 'error':
+                return result
+            return self._columns_to_dataframe(result, interval)
+
+        result = fetch(start_date, end_date)
+        if result.get('status') == 'success' and 'columns' in result:
+            return self._columns_to_dataframe(result['columns'], interval)
+        return self._history_to_dataframe(result, interval)
+
+    def history_many(self, *, symbols, interval, start_date, end_date, exchange=None, output="frame",
+                     max_workers=8, on_progress=None, cache=True, chunk_days=None, **kwargs):
+        """
+        Get historical data for many symbols at once.
 
-        result = self._make_request("history", payload)
-        
+        Symbols are downloaded concurrently (through the rate limiter and the history
+        cache, when enabled) as raw column arrays; the DataFrame or arrays and the
+        IST timestamp conversion are built once for the whole universe.
+
+        Parameters:
+        - symbols (list): Symbols as strings (using exchange) or dicts {"symbol": ..., "exchange": ...}. Required.
+        - interval (str): Time interval for the data. Required.
+        - start_date (str): Start date in format 'YYYY-MM-DD'. Required.
+        - end_date (str): End date in format 'YYYY-MM-DD'. Required.
+        - exchange (str): Exchange for symbols given as strings. Optional.
+        - output (str): "frame" for a long-format DataFrame indexed by (symbol, timestamp), or
+            "arrays" for aligned 2-D arrays (time x symbol) per field. Default: "frame"
+        - max_workers (int): Symbols downloaded at once. Default: 8
+        - on_progress (callable): Called as on_progress(completed_symbols, total_symbols). Optional.
+        - cache (bool): Use the history cache when enabled. Default: True
+        - chunk_days (int): Days per request for long ranges, as in history(). Optional.
+        - **kwargs: Optional additional parameters passed to every history request.
+
+        Returns:
+        pandas.DataFrame, dict or error dict:
+            - "frame": DataFrame with a (symbol, timestamp) MultiIndex; df.attrs['errors'] maps
+              symbols that failed to their error dicts
+            - "arrays": {'symbols': [...], 'timestamp': DatetimeIndex, 'open': ndarray, ...,
+              'errors': {...}} where each field is a float64 array of shape (time, symbol),
+              column-major so each symbol's series is contiguous, NaN where a symbol has no bar
+            - Error dict (with 'errors' per symbol) if every symbol failed
+        Symbols are labelled by symbol, or 'EXCHANGE:SYMBOL' when the same symbol is
+        requested on more than one exchange.
+
+        Examples:
+            panel = api.history_many(symbols=["SBIN", "INFY", "TCS"], exchange="NSE", interval="5m",
+                                     start_date="2024-01-01", end_date="2024-01-31")
+            sbin = panel.loc["SBIN"]
+
+            arrays = api.history_many(symbols=universe, exchange="NSE", interval="D",
+                                      start_date="2023-01-01", end_date="2023-12-31", output="arrays")
+            sma = ta.sma(arrays['close'][:, 0], 20)
+        """
+        if output not in ("frame", "arrays"):
+            return {
+                'status': 'error',
+                'message': "output must be 'frame' or 'arrays'",
+                'error_type': 'validation_error'
+            }
+        requests, labels = self._history_requests(symbols, exchange)
+        extra = {key: value for key, value in kwargs.items() if value is not None}
+
+        def fetch(request):
+            exch, sym = request
+            return self._history_columns(sym, exch, interval, start_date, end_date, cache, extra, chunk_days)
+
+        results = [None] * len(requests)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(requests) or 1))) as pool:
+            futures = {pool.submit(fetch, request): i for i, request in enumerate(requests)}
+            for completed, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = {
+                        'status': 'error',
+                        'message': f'Failed to process historical data: {str(e)}',
+                        'error_type': 'processing_error'
+                    }
+                if on_progress is not None:
+                    on_progress(completed, len(requests))
+        return self._history_panel(labels, results, output, interval)
+
+    @staticmethod
+    def _history_requests(symbols, exchange):
+        """(exchange, symbol) per requested symbol, and the label each is reported under"""
+        requests = []
+        for item in symbols:
+            if isinstance(item, dict):
+                requests.append((item.get("exchange") or exchange, item["symbol"]))
+            else:
+                requests.append((exchange, item))
+        counts = {}
+        for _, sym in requests:
+            counts[sym] = counts.get(sym, 0) + 1
+        labels = [sym if counts[sym] == 1 else f"{exch}:{sym}" for exch, sym in requests]
+        return requests, labels
+
+    def _history_panel(self, labels, results, output, interval):
+        """Frame or arrays panel from per-symbol _history_columns() results"""
+        columns, errors = {}, {}
+        for label, result in zip(labels, results):
+            if result.get('status') == 'error':
+                errors[label] = result
+            elif not result:
+                errors[label] = {
+                    'status': 'error',
+                    'message': 'No data available for the specified period',
+                    'error_type': 'no_data'
+                }
+            else:
+                columns[label] = result
+        if not columns:
+            return {
+                'status': 'error',
+                'message': 'Failed to fetch historical data for any symbol',
+                'error_type': 'no_data',
+                'errors': errors
+            }
+        if output == "arrays":
+            return self._history_panel_arrays(columns, errors, interval)
+        return self._history_panel_frame(columns, errors, interval)
+
+    def _history_columns(self, symbol, exchange, interval, start_date, end_date, cache=True,
+                         extra=None, chunk_days=None):
+        """Bars as {column: array} with epoch-second 'timestamp' ({} when empty), or an error dict"""
+        def fetch(start, end):
+            # One request at a time per symbol; concurrency comes from the caller
+            return self._fetch_history(symbol, exchange, interval, start, end, extra, chunk_days, 1)
+
+        history_cache = getattr(self, 'history_cache', None)
+        if history_cache is not None and cache and not extra:
+            return history_cache.get(symbol, exchange, interval, start_date, end_date, fetch)
+        return self._result_columns(fetch(start_date, end_date))
+
+    @staticmethod
+    def _result_columns(result):
+        """Columns of a _fetch_history() result ({} when empty), or its error dict"""
+        if result.get('status') != 'success':
+            return {} if result.get('error_type') == 'no_data' else result
+        if 'columns' in result:
+            return result['columns']
+        # Sorted and de-duplicated like history()
+        return merge_columns(history_arrays(result['data'])) if result.get('data') else {}
+
+    @staticmethod
+    def _history_timestamps(timestamps, interval):
+        """Epoch seconds to the DatetimeIndex history() uses (IST for intraday)"""
+        index = pd.to_datetime(timestamps, unit="s")
+        if interval not in ['D', 'W', 'M']:
+            index = index.tz_localize('UTC').tz_convert('Asia/Kolkata')
+        return pd.DatetimeIndex(index, name='timestamp')
+
+    def _history_panel_frame(self, columns, errors, interval):
+        """Long-format frame indexed by (symbol, timestamp) from per-symbol columns"""
+        labels = list(columns)
+        names = []
+        for cols in columns.values():
+            names.extend(name for name in cols if name != 'timestamp' and name not in names)
+        sizes = [len(cols['timestamp']) for cols in columns.values()]
+        data = {}
+        for name in names:
+            data[name] = np.concatenate([cols[name] if name in cols else np.full(size, np.nan)
+                                         for cols, size in zip(columns.values(), sizes)])
+        symbol_level = pd.Categorical.from_codes(np.repeat(np.arange(len(labels)), sizes), categories=labels)
+        timestamps = self._history_timestamps(
+            np.concatenate([cols['timestamp'] for cols in columns.values()]), interval)
+        index = pd.MultiIndex.from_arrays([symbol_level, timestamps], names=['symbol', 'timestamp'])
+        df = pd.DataFrame(data, index=index)
+        df.attrs['errors'] = errors
+        return df
+
+    def _history_panel_arrays(self, columns, errors, interval):
+        """Aligned (time x symbol) arrays per field from per-symbol columns"""
+        labels = list(columns)
+        timeline = np.unique(np.concatenate([cols['timestamp'] for cols in columns.values()]))
+        names = []
+        for cols in columns.values():
+            names.extend(name for name in cols if name != 'timestamp' and name not in names)
+        panel = {'symbols': labels, 'timestamp': self._history_timestamps(timeline, interval)}
+        for name in names:
+            panel[name] = np.full((len(timeline), len(labels)), np.nan, order='F')
+        for j, cols in enumerate(columns.values()):
+            rows = np.searchsorted(timeline, cols['timestamp'])
+            for name in names:
+                if name in cols:
+                    panel[name][rows, j] = cols[name]
+        panel['errors'] = errors
+        return panel
+
+    @staticmethod
+    def _history_chunks(interval, start_date, end_date, chunk_days=None):
+        """Split [start_date, end_date] into consecutive (start, end) 'YYYY-MM-DD' ranges"""
+        days = chunk_days or history_chunk_days(interval)
+        try:
+            start = datetime.strptime(str(start_date)[:10], '%Y-%m-%d').date()
+            end = datetime.strptime(str(end_date)[:10], '%Y-%m-%d').date()
+        except ValueError:
+            return [(start_date, end_date)]
+        if not days or (end - start).days < days:
+            return [(start_date, end_date)]
+        chunks = []
+        while start <= end:
+            chunk_end = min(start + timedelta(days=days - 1), end)
+            chunks.append((start.isoformat(), chunk_end.isoformat()))
+            start = chunk_end + timedelta(days=1)
+        return chunks
+
+    def _fetch_history(self, symbol, exchange, interval, start_date, end_date, extra=None,
+                       chunk_days=None, max_workers=4, on_progress=None):
+        """
+        Fetch a history range, in concurrent chunks when it is long.
+
+        Returns the raw response for a single request, or {'status': 'success',
+        'columns': {...}} with the chunks converted and stitched as they arrive.
+        """
+        def request(start, end):
+            payload = {
+                "apikey": self.api_key,
+                "symbol": symbol,
+                "exchange": exchange,
+                "interval": interval,
+                "start_date": start,
+                "end_date": end
+            }
+            payload.update(extra or {})
+            return self._make_request("history", payload)
+
+        chunks = self._history_chunks(interval, start_date, end_date, chunk_days)
+        if len(chunks) == 1:
+            result = request(*chunks[0])
+            if on_progress is not None:
+                on_progress(1, 1)
+            return result
+
+        def fetch_chunk(chunk):
+            result = request(*chunk)
+            if result.get('status') == 'success' and result.get('data'):
+                # Convert in the worker so each chunk's JSON is released as soon as it arrives
+                return result, history_arrays(result['data'])
+            return result, None
+
+        parts = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+            futures = {pool.submit(fetch_chunk, chunk): chunk for chunk in chunks}
+            for completed, future in enumerate(as_completed(futures), 1):
+                chunk = futures[future]
+                try:
+                    result, arrays = future.result()
+                except Exception as e:
+                    result, arrays = {
+                        'status': 'error',
+                        'message': f'Failed to process historical data: {str(e)}',
+                        'error_type': 'processing_error'
+                    }, None
+                if result.get('status') != 'success' and result.get('error_type') != 'no_data':
+                    for pending in futures:
+                        pending.cancel()
+                    return dict(result, start_date=chunk[0], end_date=chunk[1])
+                if arrays is not None:
+                    parts.append(arrays)
+                if on_progress is not None:
+                    on_progress(completed, len(chunks))
+        return {'status': 'success', 'columns': merge_columns(*parts)}
+
+    def _columns_to_dataframe(self, columns, interval):
+        """Build the history DataFrame from stitched column arrays"""
+        if not columns:
+            return {
+                'status': 'error',
+                'message': 'No data available for the specified period',
+                'error_type': 'no_data'
+            }
+        return self._history_frame(pd.DataFrame(columns), interval)
+
+    def enable_history_cache(self, *, path=None):
+        """
+        Cache history() bars on disk so repeated requests only download missing date ranges.
+
+        Bars are kept per (exchange, symbol, interval) as memory-mapped NumPy column
+        files plus the date ranges already fetched. The current day is always
+        re-downloaded since its bars are still forming.
+
+        Parameters:
+        - path (str, optional): Cache directory. Default: ~/.cache/layr0_imc/history
+
+        Returns:
+        HistoryCache: The cache, also available as client.history_cache. Call its
+            stats() for hit/miss counts and clear() to drop cached series.
+
+        Example:
+            api.enable_history_cache()
+            df = api.history(symbol="SBIN", exchange="NSE", interval="5m",
+                             start_date="2024-01-01", end_date="2024-03-31")
+            print(api.history_cache.stats())
+        """
+        self.history_cache = HistoryCache(path)
+        return self.history_cache
+
+    def disable_history_cache(self):
+        """Stop using the history cache (files on disk are kept)."""
+        self.history_cache = None
+
+    def _history_to_dataframe(self, result, interval):
+        """Convert a history API response into a timestamp-indexed DataFrame"""
         if result.get('status') == 'success' and 'data' in result:
             try:
                 df = pd.DataFrame(result['data'])
@@ -272,22 +554,7 @@ class DataAPI(BaseAPI):
                         'message': 'No data available for the specified period',
                         'error_type': 'no_data'
                     }
-                
-                # Convert timestamp to datetime
-                df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")
-                
-                # Convert to IST for intraday timeframes
-                if interval not in ['D', 'W', 'M']:  # Not daily/weekly/monthly
-                    df["timestamp"] = df["timestamp"].dt.tz_localize('UTC').dt.tz_convert('Asia/Kolkata')
-                
-                # Set timestamp as index
-                df.set_index('timestamp', inplace=True)
-                
-                # Sort index and remove duplicates
-                df = df.sort_index()
-                df = df[~df.index.duplicated(keep='first')]
-                
-                return df
+                return self._history_frame(df, interval)
             except Exception as e:
                 return {
                     'status': 'error',
@@ -297,6 +564,25 @@ class DataAPI(BaseAPI):
                 }
         return result
 
+    @staticmethod
+    def _history_frame(df, interval):
+        """Index a frame of history bars (epoch-second 'timestamp' column) by time"""
+        # Convert timestamp to datetime
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")
+
+        # Convert to IST for intraday timeframes
+        if interval not in ['D', 'W', 'M']:  # Not daily/weekly/monthly
+            df["timestamp"] = df["timestamp"].dt.tz_localize('UTC').dt.tz_convert('Asia/Kolkata')
+
+        # Set timestamp as index
+        df.set_index('timestamp', inplace=True)
+
+        # Sort index and remove duplicates
+        df = df.sort_index()
+        df = df[~df.index.duplicated(keep='first')]
+
+        return df
+
     def intervals(self, **kwargs):
         """
         Get supported time intervals for historical data from the API.
@@ -352,7 +638,7 @@ class DataAPI(BaseAPI):
                 payload[key] = value
         return self._make_request("expiry", payload)
 
-    def instruments(self, *, exchange=None):
+    def instruments(self, *, exchange=None, max_workers=None):
         """
         Download all trading symbols and instruments with optional exchange filtering.
 
@@ -363,11 +649,14 @@ class DataAPI(BaseAPI):
         - exchange (str, optional): Exchange to filter instruments. If not specified, downloads ALL exchanges.
             Supported exchanges: NSE, BSE, NFO, BFO, BCD, CDS, MCX, NSE_INDEX, BSE_INDEX
             Default: None (downloads all exchanges)
+        - max_workers (int, optional): Exchanges downloaded at once when exchange is None.
+            Requests still go through the client's rate limiter. Default: all at once
 
         Returns:
         pandas.DataFrame or dict:
-            - Success: DataFrame containing instrument data
-            - Error: dict with error details
+            - Success: DataFrame containing instrument data. When downloading all exchanges,
+              df.attrs['errors'] maps each exchange that failed to its error dict
+            - Error: dict with error details (with 'errors' per exchange if every exchange failed)
 
         DataFrame Columns:
         - symbol: layr0_imc standard symbol
@@ -413,8 +702,13 @@ class DataAPI(BaseAPI):
             nse_only = all_instruments[all_instruments['exchange'] == 'NSE']
             nfo_only = all_instruments[all_instruments['exchange'] == 'NFO']
 
+            # Check which exchanges could not be downloaded
+            for exch, error in all_instruments.attrs['errors'].items():
+                print(f"{exch}: {error['message']}")
+
         Notes:
         - Without exchange parameter: Downloads ALL exchanges (NSE, BSE, NFO, BFO, BCD, CDS, MCX, NSE_INDEX, BSE_INDEX)
+          concurrently, converting each response to a DataFrame as it arrives
         - With exchange parameter: Downloads only specified exchange
         - Rate limit: 50 requests/second
         - Data updates when master contracts are downloaded
@@ -422,100 +716,113 @@ class DataAPI(BaseAPI):
         """
         # If no exchange specified, fetch all exchanges and combine
         if exchange is None:
-            all_exchanges = ['NSE', 'BSE', 'NFO', 'BFO', 'MCX', 'CDS', 'BCD', 'NSE_INDEX', 'BSE_INDEX']
-            all_dfs = []
-
-            for exch in all_exchanges:
-                params = {
-                    "apikey": self.api_key,
-                    "exchange": exch
-                }
-
-                url = f"{self.base_url}instruments"
-                try:
-                    response = httpx.get(url, params=params, timeout=self.timeout)
-                    result = self._handle_response(response)
-
-                    if result.get('status') == 'success' and 'data' in result:
-                        try:
-                            df = pd.DataFrame(result['data'])
-                            if not df.empty:
-                                all_dfs.append(df)
-                        except Exception:
-                            pass  # Skip exchanges that fail
-                except Exception:
-                    pass  # Skip exchanges that fail
-
-            # Combine all dataframes
-            if all_dfs:
-                combined_df = pd.concat(all_dfs, ignore_index=True)
-                return combined_df
-            else:
-                return {
-                    'status': 'error',
-                    'message': 'Failed to fetch instruments from any exchange',
-                    'error_type': 'no_data'
-                }
+            return self._combine_instruments(self._fetch_instruments(INSTRUMENT_EXCHANGES, max_workers))
 
         # Fetch single exchange
         params = {
             "apikey": self.api_key,
             "exchange": exchange
         }
+        result = self._make_request("instruments", params, method="GET")
+        return self._instruments_to_dataframe(result)
 
-        # Make GET request
-        url = f"{self.base_url}instruments"
-        try:
-            # Don't include Content-Type header for GET requests
-            response = httpx.get(url, params=params, timeout=self.timeout)
+    def _instruments_to_dataframe(self, result):
+        """Convert an instruments API response into a DataFrame"""
+        if result.get('status') == 'success' and 'data' in result:
+            try:
+                df = pd.DataFrame(result['data'])
+                if df.empty:
+                    return {
+                        'status': 'error',
+                        'message': 'No instruments available for the specified exchange',
+                        'error_type': 'no_data'
+                    }
+                return df
+            except Exception as e:
+                return {
+                    'status': 'error',
+                    'message': f'Failed to process instruments data: {str(e)}',
+                    'error_type': 'processing_error',
+                    'raw_data': result['data']
+                }
+        return result
+
+    def instrument_store(self, *, path=None, refresh_time="08:00", auto_refresh=True):
+        """
+        Local instrument master for in-process symbol resolution and contract enumeration.
+
+        The master is downloaded with instruments(), kept in a SQLite file and
+        refreshed at most once per trading day; lookups are served from
+        in-memory indexes without HTTP calls. The store is created once per client.
 
-            # Handle JSON response
-            result = self._handle_response(response)
+        Parameters:
+        - path (str, optional): SQLite file. Default: ~/.cache/layr0_imc/instruments.sqlite
+        - refresh_time (str, optional): IST time ('HH:MM') after which the next day's
+            master is downloaded. Default: "08:00"
+        - auto_refresh (bool, optional): Download on first use when missing or stale. Default: True
+
+        Returns:
+        InstrumentStore: Store with lookup(), by_brsymbol(), by_token(), contracts(),
+            expiries() and strikes()
+
+        Examples:
+            store = api.instrument_store()
+            sbin = store.lookup("SBIN", "NSE")
+            token_row = store.by_token("3045", "NSE")
+            nifty_calls = store.contracts("NIFTY", expiry="26-DEC-24", instrumenttype="CE",
+                                          strike_min=23000, strike_max=25000)
+        """
+        store = getattr(self, '_instrument_store', None)
+        if store is None:
+            store = self._instrument_store = InstrumentStore(self, path=path, refresh_time=refresh_time,
+                                                             auto_refresh=auto_refresh)
+        return store
+
+    def _fetch_instruments(self, exchanges, max_workers=None):
+        """Download several exchanges concurrently; returns {exchange: DataFrame or error dict}"""
+        def fetch(exch):
+            params = {
+                "apikey": self.api_key,
+                "exchange": exch
+            }
+            return self._instruments_to_dataframe(self._make_request("instruments", params, method="GET"))
 
-            # Convert to DataFrame if successful
-            if result.get('status') == 'success' and 'data' in result:
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers or len(exchanges)) as pool:
+            futures = {pool.submit(fetch, exch): exch for exch in exchanges}
+            for future in as_completed(futures):
+                exch = futures[future]
                 try:
-                    df = pd.DataFrame(result['data'])
-                    if df.empty:
-                        return {
-                            'status': 'error',
-                            'message': 'No instruments available for the specified exchange',
-                            'error_type': 'no_data'
-                        }
-                    return df
+                    results[exch] = future.result()
                 except Exception as e:
-                    return {
+                    results[exch] = {
                         'status': 'error',
-                        'message': f'Failed to process instruments data: {str(e)}',
-                        'error_type': 'processing_error',
-                        'raw_data': result['data']
+                        'message': f'Failed to fetch instruments: {str(e)}',
+                        'error_type': 'unknown_error'
                     }
-            return result
-
-        except httpx.TimeoutException:
-            return {
-                'status': 'error',
-                'message': 'Request timed out. The server took too long to respond.',
-                'error_type': 'timeout_error'
-            }
-        except httpx.ConnectError:
-            return {
-                'status': 'error',
-                'message': 'Failed to connect to the server. Please check if the server is running.',
-                'error_type': 'connection_error'
-            }
-        except httpx.HTTPError as e:
-            return {
-                'status': 'error',
-                'message': f'HTTP error occurred: {str(e)}',
-                'error_type': 'http_error'
-            }
-        except Exception as e:
-            return {
-                'status': 'error',
-                'message': f'An unexpected error occurred: {str(e)}',
-                'error_type': 'unknown_error'
-            }
+        return {exch: results[exch] for exch in exchanges}
+
+    def _combine_instruments(self, results):
+        """Combine {exchange: response or DataFrame} into one DataFrame, reporting failed exchanges"""
+        all_dfs = []
+        errors = {}
+        for exch, result in results.items():
+            df = result if isinstance(result, pd.DataFrame) else self._instruments_to_dataframe(result)
+            if isinstance(df, pd.DataFrame):
+                all_dfs.append(df)
+            else:
+                errors[exch] = df
+
+        if all_dfs:
+            combined = pd.concat(all_dfs, ignore_index=True)
+            combined.attrs['errors'] = errors
+            return combined
+        return {
+            'status': 'error',
+            'message': 'Failed to fetch instruments from any exchange',
+            'error_type': 'no_data',
+            'errors': errors
+        }
 
     def syntheticfuture(self, *, underlying, exchange, expiry_date, **kwargs):
         """
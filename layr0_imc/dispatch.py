@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Callback Dispatcher
+    https://docs.layr0.org
+
+Runs feed callbacks off the WebSocket I/O thread. Every callback (consumer)
+gets its own bounded queue, served by worker threads or by an asyncio event
+loop, so a slow strategy only delays its own ticks and never stalls socket
+reads.
+
+Overflow policies when a consumer's queue is full:
+    block        - the WebSocket thread waits for space (no loss, back-pressure)
+    drop_oldest  - the oldest queued tick is discarded
+    conflate     - only the latest tick per (exchange, symbol, mode) is kept
+
+Example:
+    client.set_dispatcher(CallbackDispatcher(workers=2, queue_size=5000, policy="conflate"))
+    client.subscribe_quote(instruments, on_data_received=slow_strategy)
+    print(client.dispatcher.metrics())
+
+For consumers that only need the latest state at a bounded rate, a
+``Conflator`` delivers at most one merged update per instrument per interval:
+
+    client.subscribe_quote(instruments, on_data_received=dashboard, conflate=0.1)
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional
+
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+CONFLATE = 'conflate'
+POLICIES = (BLOCK, DROP_OLDEST, CONFLATE)
+
+
+def _conflation_key(message: Dict[str, Any]) -> Any:
+    if message.get('type') == 'market_data':
+        return message.get('exchange'), message.get('symbol'), message.get('mode')
+    return id(message)
+
+
+class _Consumer:
+    """Bounded queue and counters for one callback."""
+
+    def __init__(self, callback: Callable, policy: str, maxsize: int):
+        self.callback = callback
+        self.name = getattr(callback, '__qualname__', None) or repr(callback)
+        self.policy = policy
+        self.maxsize = maxsize
+        self.queue = OrderedDict() if policy == CONFLATE else deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.wakeup = None  # asyncio.Event when served by an event loop
+        self.threads: List[threading.Thread] = []
+        self.task = None
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.errors = 0
+        self.max_depth = 0
+
+    def put(self, message: Dict[str, Any]) -> bool:
+        """Queue a message; returns True if the queue was empty before."""
+        with self.cond:
+            queue = self.queue
+            was_empty = not queue
+            if self.policy == CONFLATE:
+                key = _conflation_key(message)
+                if key in queue:
+                    queue[key] = message
+                    self.conflated += 1
+                    return was_empty
+                if len(queue) >= self.maxsize:
+                    queue.popitem(last=False)
+                    self.dropped += 1
+                queue[key] = message
+            else:
+                if len(queue) >= self.maxsize:
+                    if self.policy == BLOCK:
+                        while len(queue) >= self.maxsize and not self.closed:
+                            self.cond.wait()
+                        if self.closed:
+                            return False
+                    else:
+                        queue.popleft()
+                        self.dropped += 1
+                queue.append(message)
+            if len(queue) > self.max_depth:
+                self.max_depth = len(queue)
+            self.cond.notify()
+            return was_empty
+
+    def pop(self) -> Optional[Dict[str, Any]]:
+        """Take the next message without waiting (caller holds ``cond``)."""
+        queue = self.queue
+        if not queue:
+            return None
+        message = queue.popitem(last=False)[1] if self.policy == CONFLATE else queue.popleft()
+        if self.policy == BLOCK:
+            self.cond.notify_all()
+        return message
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        """Wait for the next message; returns None once the consumer is closed."""
+        with self.cond:
+            while not self.queue and not self.closed:
+                self.cond.wait()
+            if self.closed:
+                return None
+            return self.pop()
+
+    def get_nowait(self) -> Optional[Dict[str, Any]]:
+        with self.cond:
+            return self.pop()
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def metrics(self) -> Dict[str, int]:
+        with self.cond:
+            depth = len(self.queue)
+        return {
+            'queue_depth': depth,
+            'max_queue_depth': self.max_depth,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'conflated': self.conflated,
+            'errors': self.errors,
+        }
+
+
+class CallbackDispatcher:
+    """
+    Deliver feed callbacks from per-consumer bounded queues.
+
+    With ``loop=None`` each consumer is served by ``workers`` threads (1 keeps
+    ticks in order). With an asyncio event loop each consumer is served by a
+    task on that loop, and coroutine callbacks are awaited.
+    """
+
+    def __init__(self, workers: int = 1, queue_size: int = 10000, policy: str = DROP_OLDEST,
+                 loop: Optional[asyncio.AbstractEventLoop] = None,
+                 logger: Optional[Callable[[int, str, str], None]] = None):
+        """
+        Args:
+            workers (int): Worker threads per consumer when no loop is given. Defaults to 1.
+            queue_size (int): Maximum queued messages per consumer. Defaults to 10000.
+            policy (str): 'block', 'drop_oldest' or 'conflate'. Defaults to 'drop_oldest'.
+            loop (asyncio.AbstractEventLoop, optional): Run callbacks on this event loop
+                instead of worker threads.
+            logger (callable, optional): ``logger(level, category, message)`` used for
+                callback errors. FeedAPI.set_dispatcher() wires in the feed's logger, so
+                errors follow its verbosity; without one they are only counted in metrics().
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy '{policy}'. Choose from {POLICIES}")
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self.policy = policy
+        self.loop = loop
+        self.logger = logger
+        self._consumers: Dict[Any, _Consumer] = {}
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def _log_error(self, consumer: _Consumer, error: Exception) -> None:
+        if self.logger:
+            self.logger(1, "ERROR", f"Callback error in {consumer.name}: {error}")
+
+    def _consumer(self, callback: Callable) -> _Consumer:
+        consumer = self._consumers.get(callback)
+        if consumer is None:
+            with self._lock:
+                consumer = self._consumers.get(callback)
+                if consumer is None:
+                    consumer = _Consumer(callback, self.policy, self.queue_size)
+                    self._start(consumer)
+                    self._consumers[callback] = consumer
+        return consumer
+
+    def _start(self, consumer: _Consumer) -> None:
+        if self.loop is not None:
+            consumer.task = asyncio.run_coroutine_threadsafe(self._serve_async(consumer), self.loop)
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._serve, args=(consumer,), daemon=True,
+                                      name=f"layr0-dispatch-{consumer.name}-{i}")
+            consumer.threads.append(thread)
+            thread.start()
+
+    def _call(self, consumer: _Consumer, message: Dict[str, Any]) -> Any:
+        try:
+            result = consumer.callback(message)
+            consumer.delivered += 1
+            return result
+        except Exception as e:
+            consumer.errors += 1
+            self._log_error(consumer, e)
+
+    def _serve(self, consumer: _Consumer) -> None:
+        """Worker thread loop for one consumer."""
+        while True:
+            message = consumer.get()
+            if message is None:
+                return
+            self._call(consumer, message)
+
+    async def _serve_async(self, consumer: _Consumer) -> None:
+        """Event-loop task for one consumer."""
+        consumer.wakeup = asyncio.Event()
+        while not consumer.closed:
+            consumer.wakeup.clear()
+            while True:
+                message = consumer.get_nowait()
+                if message is None:
+                    break
+                result = self._call(consumer, message)
+                if inspect.isawaitable(result):
+                    try:
+                        await result
+                    except Exception as e:
+                        consumer.errors += 1
+                        self._log_error(consumer, e)
+            await consumer.wakeup.wait()
+
+    def submit(self, callback: Callable, message: Dict[str, Any]) -> None:
+        """Queue ``message`` for ``callback`` (called on the WebSocket thread)."""
+        if self._stopped:
+            return
+        consumer = self._consumer(callback)
+        was_empty = consumer.put(message)
+        if was_empty and consumer.wakeup is not None:
+            self.loop.call_soon_threadsafe(consumer.wakeup.set)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Queue depth and drop counters.
+
+        Returns:
+            dict: {'queue_depth': total, 'dropped': total, 'conflated': total,
+                   'delivered': total, 'consumers': {name: {...per-consumer counters}}}
+        """
+        consumers = {}
+        for consumer in list(self._consumers.values()):
+            name = consumer.name
+            while name in consumers:
+                name += "'"
+            consumers[name] = consumer.metrics()
+        totals = {
+            key: sum(m[key] for m in consumers.values())
+            for key in ('queue_depth', 'dropped', 'conflated', 'delivered', 'errors')
+        }
+        totals['consumers'] = consumers
+        return totals
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop delivering; queued messages that were not delivered yet are discarded."""
+        self._stopped = True
+        with self._lock:
+            consumers = list(self._consumers.values())
+        for consumer in consumers:
+            consumer.close()
+            if consumer.wakeup is not None:
+                self.loop.call_soon_threadsafe(consumer.wakeup.set)
+        for consumer in consumers:
+            for thread in consumer.threads:
+                if thread is not threading.current_thread():
+                    thread.join(timeout)
+
+
+class Conflator:
+    """
+    Rate-limit a callback to one update per instrument per ``interval``.
+
+    Ticks arriving within an interval are merged into the pending update for
+    their (exchange, symbol, mode): newer ``data`` fields overwrite older ones,
+    so the consumer sees the latest quote/depth state. A background thread
+    delivers the pending updates once per interval, off the WebSocket thread.
+    """
+
+    def __init__(self, callback: Callable, interval: float = 0.1,
+                 logger: Optional[Callable[[int, str, str], None]] = None):
+        """
+        Args:
+            callback (callable): Consumer receiving merged market_data messages.
+            interval (float): Seconds between deliveries. Defaults to 0.1.
+            logger (callable, optional): ``logger(level, category, message)`` for callback errors.
+                The feed passes its own logger; without one, errors are not reported.
+        """
+        if interval <= 0:
+            raise ValueError("Conflation interval must be positive")
+        self.callback = callback
+        self.interval = interval
+        self.logger = logger
+        self.received = 0
+        self.delivered = 0
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __call__(self, message: Dict[str, Any]) -> None:
+        key = _conflation_key(message)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                # Copy so merging never mutates a message shared with other consumers
+                self._pending[key] = dict(message, data=dict(message.get('data') or {}))
+            else:
+                pending['data'].update(message.get('data') or {})
+            self.received += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="layr0-conflator")
+                self._thread.start()
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.interval
+        while not self._stop.wait(max(0.0, deadline - time.monotonic())):
+            deadline += self.interval
+            self.flush()
+
+    def flush(self) -> None:
+        """Deliver every pending update now."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        for message in batch.values():
+            try:
+                self.callback(message)
+                self.delivered += 1
+            except Exception as e:
+                if self.logger:
+                    self.logger(1, "ERROR", f"Conflated callback error: {e}")
+
+    def metrics(self) -> Dict[str, int]:
+        """Ticks received, updates delivered and updates currently pending."""
+        with self._lock:
+            pending = len(self._pending)
+        return {'received': self.received, 'delivered': self.delivered, 'pending': pending}
+
+    def stop(self) -> None:
+        """Stop the delivery thread; pending updates are discarded."""
+        self._stop.set()
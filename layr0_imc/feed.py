@@ -4,12 +4,84 @@ layr0_imc WebSocket API Documentation - Feed Methods
     https://docs.layr0.org
 """
 
-import json
+import random
 import threading
 import time
 from typing import List, Dict, Any, Callable, Optional
 import websocket
 from .base import BaseAPI
+from . import codec
+from .tickstore import TickStore
+from .shm import SharedTickStore, segment_name
+from .ringbuffer import TickRingBuffer, TickWindow
+from .orderbook import OrderBook
+from .recorder import TickRecorder, TickReplayer
+from .dispatch import CallbackDispatcher, Conflator
+from .metrics import FeedMetrics
+
+# Subscription modes
+MODE_LTP = 1
+MODE_QUOTE = 2
+MODE_DEPTH = 3
+MODE_NAMES = {MODE_LTP: "LTP", MODE_QUOTE: "Quote", MODE_DEPTH: "Depth"}
+_MODE_ALIASES = {"ltp": MODE_LTP, "quote": MODE_QUOTE, "depth": MODE_DEPTH}
+
+# Instruments sent per subscribe/unsubscribe frame
+DEFAULT_BATCH_SIZE = 100
+
+# Tick store fields returned by get_quotes()
+_QUOTE_SNAPSHOT_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'ltp', 'volume', 'last_trade_quantity',
+                          'avg_trade_price', 'change', 'change_percent')
+
+
+def normalize_market_data(mode: int, market_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the cleaned ``data`` dict delivered to callbacks for a market_data message.
+
+    Args:
+        mode (int): Subscription mode of the message (1=LTP, 2=Quote, 3=Depth).
+        market_data (dict): The raw ``data`` field of the message.
+    """
+    timestamp = market_data.get("timestamp", int(time.time() * 1000))
+    if mode == MODE_LTP:
+        data = {
+            'ltp': market_data.get("ltp"),
+            'timestamp': timestamp
+        }
+        # Include LTT if available in original data
+        if 'ltt' in market_data:
+            data['ltt'] = market_data['ltt']
+        # Check if ltt is in the nested data structure (which seems to be the case)
+        elif 'ltt' in market_data.get('data', {}):
+            data['ltt'] = market_data['data']['ltt']
+        return data
+    if mode == MODE_QUOTE:
+        return {
+            'open': market_data.get("open", 0),
+            'high': market_data.get("high", 0),
+            'low': market_data.get("low", 0),
+            'close': market_data.get("close", 0),
+            'ltp': market_data.get("ltp", 0),
+            'volume': market_data.get("volume", 0),
+            'last_trade_quantity': market_data.get("last_trade_quantity", 0),
+            'avg_trade_price': market_data.get("avg_trade_price", 0),
+            'change': market_data.get("change", 0),
+            'change_percent': market_data.get("change_percent", 0),
+            'timestamp': timestamp
+        }
+    return {
+        'ltp': market_data.get("ltp", 0),
+        'timestamp': timestamp,
+        'depth': market_data.get("depth", {"buy": [], "sell": []})
+    }
+
+
+class _SubscriptionRequest:
+    """Tracks the acknowledgements outstanding for one subscribe/unsubscribe call."""
+
+    def __init__(self):
+        self.statuses = {}  # Structure: {'EXCHANGE:SYMBOL': status}
+        self.outstanding = 0
 
 class FeedAPI(BaseAPI):
     """
@@ -57,6 +129,10 @@ class FeedAPI(BaseAPI):
             
             # Create default WebSocket URL
             self.ws_url = f"ws://{self.ws_host}:{self.ws_port}"
+        self._init_feed_state()
+
+    def _init_feed_state(self) -> None:
+        """Initialize WebSocket connection state, data storage and callbacks."""
         self.ws = None
         self.connected = False
         self.authenticated = False
@@ -67,16 +143,50 @@ class FeedAPI(BaseAPI):
         self.lock = threading.Lock()
         
         # Data storage
-        self.ltp_data = {}  # Structure: {'EXCHANGE:SYMBOL': {'price': price, 'timestamp': timestamp}}
-        self.quotes_data = {}  # Structure: {'EXCHANGE:SYMBOL': {'open': open, 'high': high, 'low': low, 'close': close, 'ltp': ltp, 'timestamp': timestamp}}
-        self.depth_data = {}  # Structure: {'EXCHANGE:SYMBOL': {'ltp': ltp, 'timestamp': timestamp, 'depth': {'buy': [...], 'sell': [...]}}}
+        self.ltp_data = TickStore()  # Columnar store, one row per 'EXCHANGE:SYMBOL' (ltp, timestamp, seq)
+        self.quotes_data = TickStore()  # Columnar store, one row per 'EXCHANGE:SYMBOL' (ltp, ohlc, volume, oi, ...)
+        self.depth_data = {}  # Structure: {'EXCHANGE:SYMBOL': OrderBook}, updated in place per depth tick
+        self.depth_levels = None  # Maximum levels per side kept by new order books (None keeps every level)
+        self._depth_index = {}  # Structure: {'EXCHANGE': {'SYMBOL': 'EXCHANGE:SYMBOL'}}
+        self.tick_buffers = {}  # Structure: {'EXCHANGE:SYMBOL': TickRingBuffer}, see enable_tick_buffers()
+        self.tick_buffer_capacity = 0  # 0 disables tick history
+        self.bar_aggregators = []  # BarAggregator instances fed with LTP/Quote ticks
+        self.dispatcher = None  # CallbackDispatcher; None runs callbacks on the WebSocket thread
+        self.recorder = None  # TickRecorder capturing raw messages, see start_recording()
+        self.metrics = None  # FeedMetrics; None disables instrumentation, see enable_metrics()
         
-        # Callback registry
+        # Mode-wide callbacks: receive every instrument of their mode (see add_listener() for routing)
         self.ltp_callback = None
         self.quote_callback = None
         self.quotes_callback = None
         self.depth_callback = None
 
+        # Outstanding subscribe/unsubscribe acknowledgements
+        # Structure: {(action, exchange, symbol, mode): _SubscriptionRequest}
+        self._pending_acks = {}
+        self._ack_cond = threading.Condition()
+
+        # Callback routing table
+        # Structure: {(exchange, symbol, mode): (callback, ...)}. Tuples are replaced rather than
+        # mutated, so the WebSocket thread reads routes without taking the lock.
+        self._routes = {}
+        self._conflators = {}  # Structure: {(callback, interval): Conflator}
+
+        # Reconnect and subscription replay
+        # Structure: {mode: {'EXCHANGE:SYMBOL': (exchange, symbol)}}
+        self._subscriptions = {MODE_LTP: {}, MODE_QUOTE: {}, MODE_DEPTH: {}}
+        self.auto_reconnect = True
+        self.reconnect_delay = 1.0  # Initial backoff in seconds
+        self.max_reconnect_delay = 30.0
+        self.gap_callback = None
+        self.last_gap = None
+        self._closing = False
+        self._reconnect_attempt = 0
+        self._disconnected_at = None
+        self._stop_event = threading.Event()
+        self._conn_event = threading.Event()
+        self._auth_event = threading.Event()
+
     def _log(self, level: int, category: str, message: str) -> None:
         """
         Internal logging method with verbosity control.
@@ -92,78 +202,161 @@ class FeedAPI(BaseAPI):
             formatted_cat = f"[{category}]".ljust(cat_width + 2)
             print(f"{formatted_cat} {message}")
 
-    def connect(self) -> bool:
+    def connect(self, auto_reconnect: bool = True, on_gap: Optional[Callable] = None) -> bool:
         """
         Connect to the WebSocket server and authenticate.
+
+        Args:
+            auto_reconnect (bool): Reconnect with exponential backoff when the connection
+                drops, re-authenticate and resubscribe every instrument. Defaults to True.
+            on_gap (callable, optional): Called after a reconnect with a gap event dict:
+                {'type': 'gap', 'disconnected_at': ms, 'reconnected_at': ms,
+                 'duration': seconds, 'subscriptions': {mode: [instruments]}}
+                so strategies can backfill the missing window via history().
         
         Returns:
             bool: True if connection and authentication are successful, False otherwise.
         """
         try:
-            def on_message(ws, message):
-                self._process_message(message)
-                
-            def on_error(ws, error):
-                self._log(1, "ERROR", f"WebSocket error: {error}")
-
-            def on_open(ws):
-                self._log(1, "WS", f"Connected to {self.ws_url}")
-                self.connected = True
-                self._authenticate()
-
-            def on_close(ws, close_status_code, close_reason):
-                self._log(1, "WS", f"Disconnected from {self.ws_url}")
-                self.connected = False
-                self.authenticated = False
-            
+            self.auto_reconnect = auto_reconnect
+            if on_gap:
+                self.gap_callback = on_gap
+            self._closing = False
+            self._stop_event.clear()
+            self._conn_event.clear()
+            self._auth_event.clear()
+            self._reconnect_attempt = 0
+            self._disconnected_at = None
+
             # Initialize WebSocket connection
-            self.ws = websocket.WebSocketApp(
-                self.ws_url,
-                on_message=on_message,
-                on_error=on_error,
-                on_open=on_open,
-                on_close=on_close
-            )
+            self.ws = self._create_ws_app()
             
             # Start WebSocket connection in a separate thread
-            self.ws_thread = threading.Thread(target=self.ws.run_forever)
+            self.ws_thread = threading.Thread(target=self._run_ws)
             self.ws_thread.daemon = True
             self.ws_thread.start()
             
             # Wait for connection to establish
-            timeout = 5
-            start_time = time.time()
-            while not self.connected and time.time() - start_time < timeout:
-                time.sleep(0.1)
-            
+            self._conn_event.wait(5)
             if not self.connected:
                 self._log(1, "ERROR", "Failed to connect to WebSocket server")
+                # Don't keep retrying a connection that never succeeded
+                self._closing = True
+                self._stop_event.set()
                 return False
                 
             # Wait for authentication to complete
-            timeout = 5
-            start_time = time.time()
-            while not self.authenticated and time.time() - start_time < timeout and self.connected:
-                time.sleep(0.1)
-                
+            self._auth_event.wait(5)
             return self.authenticated
             
         except Exception as e:
             self._log(1, "ERROR", f"Error connecting to WebSocket: {e}")
             return False
 
+    def _create_ws_app(self) -> websocket.WebSocketApp:
+        """Create the WebSocketApp with handlers bound to this feed."""
+        def on_message(ws, message):
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.record(message)
+            self._process_message(message)
+            
+        def on_error(ws, error):
+            self._log(1, "ERROR", f"WebSocket error: {error}")
+
+        def on_open(ws):
+            self._log(1, "WS", f"Connected to {self.ws_url}")
+            self.connected = True
+            self._conn_event.set()
+            self._authenticate()
+
+        def on_close(ws, close_status_code, close_reason):
+            self._log(1, "WS", f"Disconnected from {self.ws_url}")
+            if self.connected and not self._closing and self._disconnected_at is None:
+                self._disconnected_at = time.time()
+            self.connected = False
+            self.authenticated = False
+            self._conn_event.set()
+            self._auth_event.set()
+
+        return websocket.WebSocketApp(
+            self.ws_url,
+            on_message=on_message,
+            on_error=on_error,
+            on_open=on_open,
+            on_close=on_close
+        )
+
+    def _run_ws(self) -> None:
+        """WebSocket thread: run the connection and reconnect with backoff when it drops."""
+        while True:
+            try:
+                self.ws.run_forever()
+            except Exception as e:
+                self._log(1, "ERROR", f"WebSocket error: {e}")
+            self._conn_event.set()
+
+            if self._closing or not self.auto_reconnect:
+                break
+
+            # Exponential backoff with jitter
+            delay = min(self.max_reconnect_delay, self.reconnect_delay * (2 ** self._reconnect_attempt))
+            delay *= random.uniform(0.5, 1.0)
+            self._reconnect_attempt += 1
+            self._log(1, "WS", f"Reconnecting in {delay:.1f}s (attempt {self._reconnect_attempt})")
+            if self._stop_event.wait(delay):
+                break
+            self.ws = self._create_ws_app()
+
+    def _replay_subscriptions(self) -> None:
+        """Resubscribe every registered instrument after a reconnect and emit a gap event."""
+        disconnected_at = self._disconnected_at or time.time()
+        reconnected_at = time.time()
+        self._disconnected_at = None
+
+        with self.lock:
+            registry = {mode: list(entries.values()) for mode, entries in self._subscriptions.items() if entries}
+
+        for mode, keys in registry.items():
+            instruments = [{"exchange": exchange, "symbol": symbol} for exchange, symbol in keys]
+            statuses = self._send_subscription("subscribe", instruments, mode, DEFAULT_BATCH_SIZE,
+                                               4, True, 10.0)
+            restored = sum(1 for status in statuses.values() if status in ("success", "pending"))
+            self._log(1, "SUB", f"Resubscribed {restored}/{len(instruments)} {MODE_NAMES[mode]} instruments")
+
+        gap = {
+            'type': 'gap',
+            'disconnected_at': int(disconnected_at * 1000),
+            'reconnected_at': int(reconnected_at * 1000),
+            'duration': reconnected_at - disconnected_at,
+            'subscriptions': {mode: [{"exchange": exchange, "symbol": symbol} for exchange, symbol in keys]
+                              for mode, keys in registry.items()}
+        }
+        self.last_gap = gap
+        self._log(1, "WS", f"Feed gap of {gap['duration']:.1f}s recovered")
+        if self.gap_callback:
+            try:
+                self.gap_callback(gap)
+            except Exception as e:
+                self._log(1, "ERROR", f"Gap callback error: {str(e)}")
+
     def disconnect(self) -> None:
         """Disconnect from the WebSocket server."""
+        self._closing = True
+        self._stop_event.set()
         if self.ws:
             self.ws.close()
             # Wait for websocket to close
-            timeout = 2
-            start_time = time.time()
-            while self.connected and time.time() - start_time < timeout:
-                time.sleep(0.1)
+            if self.ws_thread and self.ws_thread is not threading.current_thread():
+                self.ws_thread.join(timeout=2)
             self.ws = None
             self.connected = False
             self.authenticated = False
+        with self.lock:
+            for entries in self._subscriptions.values():
+                entries.clear()
+            self._routes.clear()
+            self._release_conflators()
 
     def _authenticate(self) -> None:
         """Authenticate with the WebSocket server using the API key."""
@@ -177,7 +370,7 @@ class FeedAPI(BaseAPI):
         }
 
         self._log(1, "AUTH", f"Authenticating with API key: {self.api_key[:8]}...{self.api_key[-8:]}")
-        self.ws.send(json.dumps(auth_msg))
+        self.ws.send(codec.dumps(auth_msg))
 
     def _process_message(self, message_str: str) -> None:
         """
@@ -187,7 +380,13 @@ class FeedAPI(BaseAPI):
             message_str (str): The message string received from the WebSocket.
         """
         try:
-            message = json.loads(message_str)
+            metrics = self.metrics
+            if metrics is not None:
+                decode_start = time.perf_counter_ns()
+                message = codec.loads(message_str)
+                decode_ns = time.perf_counter_ns() - decode_start
+            else:
+                message = codec.loads(message_str)
             
             # Handle authentication response
             if message.get("type") == "auth":
@@ -197,8 +396,13 @@ class FeedAPI(BaseAPI):
                     user_id = message.get("user_id", "unknown")
                     self._log(1, "AUTH", f"Success | Broker: {broker} | User: {user_id}")
                     self._log(2, "AUTH", f"Full response: {message}")
+                    self._reconnect_attempt = 0
+                    if self._disconnected_at is not None:
+                        # Reconnected: replay subscriptions off the socket thread so acks can be read
+                        threading.Thread(target=self._replay_subscriptions, daemon=True).start()
                 else:
                     self._log(1, "ERROR", f"Authentication failed: {message.get('message', 'Unknown error')}")
+                self._auth_event.set()
                 return
 
             # Handle subscription response
@@ -209,9 +413,16 @@ class FeedAPI(BaseAPI):
                     exch = sub.get("exchange", "?")
                     status = sub.get("status", "?")
                     mode = sub.get("mode", 0)
-                    mode_name = {1: "LTP", 2: "Quote", 3: "Depth"}.get(mode, "Unknown")
+                    mode_name = MODE_NAMES.get(mode, "Unknown")
                     self._log(1, "SUB", f"{exch}:{sym} | Mode: {mode_name} | Status: {status}")
                 self._log(2, "SUB", f"Full response: {message}")
+                self._resolve_acks(message)
+                return
+
+            # Handle unsubscription response
+            if message.get("type") == "unsubscribe":
+                self._log(2, "UNSUB", f"Full response: {message}")
+                self._resolve_acks(message)
                 return
                 
             # Handle market data
@@ -221,25 +432,33 @@ class FeedAPI(BaseAPI):
                 if exchange and symbol:
                     mode = message.get("mode")
                     market_data = message.get("data", {})
+                    if metrics is not None:
+                        metrics.record_message(mode, exchange, symbol, decode_ns,
+                                               time.time() * 1000, market_data.get("timestamp"))
                     
                     # Handle LTP data (mode 1)
                     if mode == 1 and "ltp" in market_data:
                         with self.lock:
                             # Get LTP and timestamp from the message
                             ltp = market_data.get("ltp")
-                            timestamp = market_data.get("timestamp", int(time.time() * 1000))
+                            timestamp = market_data.get("timestamp")
+                            if timestamp is None:
+                                timestamp = int(time.time() * 1000)
                             
-                            # Store both price and timestamp with format 'EXCHANGE:SYMBOL'
+                            # Update the instrument's row in place, keyed 'EXCHANGE:SYMBOL'
                             symbol_key = f"{exchange}:{symbol}"
-                            self.ltp_data[symbol_key] = {
-                                'price': ltp,
-                                'timestamp': timestamp
-                            }
+                            self.ltp_data.update_ltp(symbol_key, ltp, timestamp)
+                            if self.tick_buffer_capacity:
+                                self._record_tick(symbol_key, ltp, 0, timestamp)
 
                             self._log(2, "LTP", f"{symbol_key:<20} | LTP: {ltp}")
+
+                        for aggregator in self.bar_aggregators:
+                            aggregator.update(exchange, symbol, ltp, timestamp)
                         
-                        # Invoke callback if set
-                        if self.ltp_callback:
+                        # Invoke the callbacks routed to this instrument, if any
+                        listeners = self._listeners(exchange, symbol, mode, self.ltp_callback)
+                        if listeners:
                             try:
                                 # Create a clean market data update without redundant fields
                                 clean_data = {
@@ -247,48 +466,39 @@ class FeedAPI(BaseAPI):
                                     'symbol': symbol,
                                     'exchange': exchange,
                                     'mode': mode,
-                                    'data': {
-                                        'ltp': ltp,
-                                        'timestamp': timestamp
-                                    }
+                                    'data': normalize_market_data(mode, market_data)
                                 }
-                                # Include LTT if available in original data
-                                if 'ltt' in market_data:
-                                    clean_data['data']['ltt'] = market_data['ltt']
-                                # Check if ltt is in the nested data structure (which seems to be the case)
-                                elif 'ltt' in market_data.get('data', {}):
-                                    clean_data['data']['ltt'] = market_data['data']['ltt']
-                                    
-                                # Pass the cleaned message to callback
-                                self.ltp_callback(clean_data)
+
+                                # Pass the cleaned message to each callback
+                                for callback in listeners:
+                                    self._deliver(callback, clean_data, "LTP")
                             except Exception as e:
                                 self._log(1, "ERROR", f"LTP callback error: {str(e)}")                 
                     # Handle Quotes data (mode 2)
                     elif mode == 2:
                         with self.lock:
-                            # Extract quote data fields
-                            quote_data = {
-                                'open': market_data.get("open", 0),
-                                'high': market_data.get("high", 0),
-                                'low': market_data.get("low", 0),
-                                'close': market_data.get("close", 0),
-                                'ltp': market_data.get("ltp", 0),
-                                'volume': market_data.get("volume", 0),
-                                'last_trade_quantity': market_data.get("last_trade_quantity", 0),
-                                'avg_trade_price': market_data.get("avg_trade_price", 0),
-                                'change': market_data.get("change", 0),
-                                'change_percent': market_data.get("change_percent", 0),
-                                'timestamp': market_data.get("timestamp", int(time.time() * 1000))
-                            }
-                            
-                            # Store quote data with format 'EXCHANGE:SYMBOL'
+                            timestamp = market_data.get("timestamp")
+                            if timestamp is None:
+                                timestamp = int(time.time() * 1000)
+
+                            # Update the instrument's row in place, keyed 'EXCHANGE:SYMBOL'
                             symbol_key = f"{exchange}:{symbol}"
-                            self.quotes_data[symbol_key] = quote_data
+                            self.quotes_data.update_quote(symbol_key, market_data, timestamp)
+                            if self.tick_buffer_capacity:
+                                self._record_tick(symbol_key, market_data.get("ltp", 0),
+                                                  market_data.get("last_trade_quantity") or 0, timestamp)
+
+                            if self.verbose >= 2:
+                                self._log(2, "QUOTE", f"{symbol_key:<20} | O: {market_data.get('open', 0):<10} H: {market_data.get('high', 0):<10} L: {market_data.get('low', 0):<10} C: {market_data.get('close', 0):<10} LTP: {market_data.get('ltp', 0)}")
 
-                            self._log(2, "QUOTE", f"{symbol_key:<20} | O: {quote_data['open']:<10} H: {quote_data['high']:<10} L: {quote_data['low']:<10} C: {quote_data['close']:<10} LTP: {quote_data['ltp']}")
+                        for aggregator in self.bar_aggregators:
+                            aggregator.update(exchange, symbol, market_data.get("ltp"), timestamp,
+                                              market_data.get("last_trade_quantity") or 0,
+                                              market_data.get("volume"))
                         
-                        # Invoke callback if set
-                        if self.quote_callback:
+                        # Invoke the callbacks routed to this instrument, if any
+                        listeners = self._listeners(exchange, symbol, mode, self.quote_callback)
+                        if listeners:
                             try:
                                 # Create a clean market data update without redundant fields
                                 clean_data = {
@@ -296,31 +506,34 @@ class FeedAPI(BaseAPI):
                                     'symbol': symbol,
                                     'exchange': exchange,
                                     'mode': mode,
-                                    'data': quote_data.copy()
+                                    'data': normalize_market_data(mode, market_data)
                                 }
-                                # Pass the cleaned message to callback
-                                self.quote_callback(clean_data)
+                                # Pass the cleaned message to each callback
+                                for callback in listeners:
+                                    self._deliver(callback, clean_data, "Quote")
                             except Exception as e:
                                 self._log(1, "ERROR", f"Quote callback error: {str(e)}")                 
                     # Handle Market Depth data (mode 3)
                     elif mode == 3 and "depth" in market_data:
                         with self.lock:
-                            # Extract depth data
-                            depth_data = {
-                                'ltp': market_data.get("ltp", 0),
-                                'timestamp': market_data.get("timestamp", int(time.time() * 1000)),
-                                'depth': market_data.get("depth", {"buy": [], "sell": []})
-                            }
-                            
-                            # Store depth data with format 'EXCHANGE:SYMBOL'
+                            timestamp = market_data.get("timestamp")
+                            if timestamp is None:
+                                timestamp = int(time.time() * 1000)
+
+                            # Update the instrument's order book in place, keyed 'EXCHANGE:SYMBOL'
                             symbol_key = f"{exchange}:{symbol}"
-                            self.depth_data[symbol_key] = depth_data
+                            book = self.depth_data.get(symbol_key)
+                            if book is None:
+                                book = self.depth_data[symbol_key] = OrderBook(self.depth_levels)
+                                self._depth_index.setdefault(exchange, {})[symbol] = symbol_key
+                            depth = market_data.get("depth") or {}
+                            book.update(depth, market_data.get("ltp", 0), timestamp)
 
                             # Log depth data
-                            buy_depth = depth_data.get('depth', {}).get('buy', [])
-                            sell_depth = depth_data.get('depth', {}).get('sell', [])
+                            buy_depth = depth.get('buy') or []
+                            sell_depth = depth.get('sell') or []
 
-                            self._log(2, "DEPTH", f"{symbol_key:<20} | LTP: {depth_data.get('ltp')}")
+                            self._log(2, "DEPTH", f"{symbol_key:<20} | LTP: {market_data.get('ltp')}")
 
                             if self.verbose >= 2:
                                 # Print buy depth summary
@@ -339,8 +552,9 @@ class FeedAPI(BaseAPI):
                                     so = sell_lvl.get('orders', '-')
                                     print(f"         {str(bp):<10} {str(bq):<10} {str(bo):<8} | {str(sp):<10} {str(sq):<10} {str(so):<8}")
                         
-                        # Invoke callback if set
-                        if self.depth_callback:
+                        # Invoke the callbacks routed to this instrument, if any
+                        listeners = self._listeners(exchange, symbol, mode, self.depth_callback)
+                        if listeners:
                             try:
                                 # Create a clean market data update
                                 clean_data = {
@@ -348,78 +562,362 @@ class FeedAPI(BaseAPI):
                                     'symbol': symbol,
                                     'exchange': exchange,
                                     'mode': mode,
-                                    'data': depth_data.copy()
+                                    'data': normalize_market_data(mode, market_data)
                                 }
-                                # Pass the cleaned message to callback
-                                self.depth_callback(clean_data)
+                                # Pass the cleaned message to each callback
+                                for callback in listeners:
+                                    self._deliver(callback, clean_data, "Depth")
                             except Exception as e:
                                 self._log(1, "ERROR", f"Depth callback error: {str(e)}")
                         
-        except json.JSONDecodeError:
+        except codec.DecodeError:
             self._log(1, "ERROR", f"Invalid JSON message: {message_str[:100]}...")
         except Exception as e:
             self._log(1, "ERROR", f"Error handling message: {e}")
 
-    def subscribe_ltp(self, instruments: List[Dict[str, Any]], on_data_received: Optional[Callable] = None) -> bool:
+    @staticmethod
+    def _instrument_key(instrument: Dict[str, Any]) -> Optional[tuple]:
+        """Return (exchange, symbol) for an instrument dict, or None if it is invalid."""
+        exchange = instrument.get("exchange")
+        symbol = instrument.get("symbol")
+        exchange_token = instrument.get("exchange_token")
+
+        # If only exchange_token is provided, we need to map it to a symbol
+        if not symbol and exchange_token:
+            symbol = exchange_token
+
+        if not exchange or not symbol:
+            return None
+        return exchange, symbol
+
+    @staticmethod
+    def _mode_number(mode) -> int:
+        """Normalize a subscription mode given as 1/2/3 or 'ltp'/'quote'/'depth'."""
+        if isinstance(mode, str):
+            if mode.lower() not in _MODE_ALIASES:
+                raise ValueError(f"Unknown subscription mode '{mode}'")
+            return _MODE_ALIASES[mode.lower()]
+        if mode not in MODE_NAMES:
+            raise ValueError(f"Unknown subscription mode {mode}")
+        return mode
+
+    def _resolve_acks(self, message: Dict[str, Any]) -> None:
+        """Match a subscribe/unsubscribe response to the requests waiting on it."""
+        action = message.get("type")
+        acks = [(sub, sub.get("status", message.get("status", "unknown")))
+                for sub in message.get("subscriptions") or []]
+        # Some servers report unsubscriptions as successful/failed lists
+        acks += [(sub, "success") for sub in message.get("successful") or [] if isinstance(sub, dict)]
+        acks += [(sub, "error") for sub in message.get("failed") or [] if isinstance(sub, dict)]
+        if not acks:
+            return
+
+        with self._ack_cond:
+            for sub, status in acks:
+                exchange, symbol, mode = sub.get("exchange"), sub.get("symbol"), sub.get("mode")
+                key = (action, exchange, symbol, mode)
+                if key not in self._pending_acks and mode is None:
+                    # Response without a mode: match any pending mode for the instrument
+                    key = next((k for k in self._pending_acks if k[:3] == (action, exchange, symbol)), key)
+                request = self._pending_acks.pop(key, None)
+                if request is not None:
+                    request.statuses[f"{exchange}:{symbol}"] = status
+                    request.outstanding -= 1
+            self._ack_cond.notify_all()
+
+    def _send_subscription(self, action: str, instruments: List[Dict[str, Any]], mode: int,
+                           batch_size: int, max_in_flight: int, wait: bool,
+                           timeout: float) -> Dict[str, str]:
         """
-        Subscribe to LTP updates for instruments.
-        
+        Send subscribe/unsubscribe frames in batches with flow control.
+
+        Up to ``max_in_flight`` batches may be awaiting acknowledgement at once;
+        further frames are held back until the server catches up or the
+        timeout expires. No fixed sleeps are used between frames.
+        """
+        statuses = {}
+        keys = []
+        for instrument in instruments:
+            key = self._instrument_key(instrument)
+            if key is None:
+                self._log(1, "ERROR", f"Invalid instrument: {instrument}")
+                statuses[f"{instrument.get('exchange')}:{instrument.get('symbol')}"] = "invalid"
+                continue
+            keys.append(key)
+
+        if threading.current_thread() is self.ws_thread:
+            # Acks are read on this thread, so waiting here would only time out
+            wait = False
+
+        batch_size = max(1, int(batch_size))
+        window = batch_size * max(1, int(max_in_flight))
+        deadline = time.monotonic() + timeout
+        request = _SubscriptionRequest()
+        category = "SUB" if action == "subscribe" else "UNSUB"
+        self._log(1, category, f"{action.capitalize()} {len(keys)} instruments | Mode: "
+                               f"{MODE_NAMES[mode]} | Batches: {-(-len(keys) // batch_size)}")
+
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+
+            with self._ack_cond:
+                if wait:
+                    # Flow control: wait for earlier batches to be acknowledged
+                    self._ack_cond.wait_for(lambda: request.outstanding + len(batch) <= window,
+                                            timeout=max(0.0, deadline - time.monotonic()))
+                for exchange, symbol in batch:
+                    self._pending_acks[(action, exchange, symbol, mode)] = request
+                    request.outstanding += 1
+
+            if batch_size == 1:
+                exchange, symbol = batch[0]
+                msg = {"action": action, "symbol": symbol, "exchange": exchange, "mode": mode}
+            else:
+                msg = {
+                    "action": action,
+                    "symbols": [{"symbol": symbol, "exchange": exchange} for exchange, symbol in batch],
+                    "mode": mode
+                }
+            if action == "subscribe":
+                msg["depth"] = 5  # Default depth level
+
+            try:
+                self.ws.send(codec.dumps(msg))
+            except Exception as e:
+                self._log(1, "ERROR", f"Error sending {action} batch: {e}")
+                failed = keys[start:]
+                with self._ack_cond:
+                    for exchange, symbol in failed:
+                        self._pending_acks.pop((action, exchange, symbol, mode), None)
+                for exchange, symbol in failed:
+                    statuses[f"{exchange}:{symbol}"] = "send_failed"
+                break
+
+        with self._ack_cond:
+            if wait:
+                self._ack_cond.wait_for(lambda: request.outstanding <= 0,
+                                        timeout=max(0.0, deadline - time.monotonic()))
+            # Drop anything still unacknowledged
+            for exchange, symbol in keys:
+                self._pending_acks.pop((action, exchange, symbol, mode), None)
+
+        for exchange, symbol in keys:
+            symbol_key = f"{exchange}:{symbol}"
+            if symbol_key not in statuses:
+                statuses[symbol_key] = request.statuses.get(symbol_key, "pending" if wait else "sent")
+        return statuses
+
+    def subscribe(self, instruments: List[Dict[str, Any]], mode=MODE_LTP,
+                  on_data_received: Optional[Callable] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                  max_in_flight: int = 4, wait: bool = True, timeout: float = 10.0,
+                  conflate: Optional[float] = None) -> Dict[str, str]:
+        """
+        Subscribe to market data for many instruments using batched frames.
+
+        Instruments are sent ``batch_size`` per frame and acknowledgements are
+        collected asynchronously, so subscribing thousands of instruments takes
+        seconds rather than minutes.
+
         Args:
             instruments: List of instrument dictionaries with keys:
                 - exchange (str): Exchange code (e.g., 'NSE', 'BSE', 'NFO')
                 - symbol (str): Trading symbol
                 - exchange_token (str, optional): Exchange token for the instrument
-            on_data_received: Callback function for data updates
-                
+            mode: 1/'ltp', 2/'quote' or 3/'depth'. Defaults to LTP.
+            on_data_received: Callback for data updates of these instruments in this mode.
+                Callbacks registered by other subscribe() calls keep receiving their own
+                instruments (see add_listener()).
+            batch_size (int): Instruments per frame. Use 1 for servers that only accept
+                single-instrument frames. Defaults to 100.
+            max_in_flight (int): Batches allowed to await acknowledgement at once. Defaults to 4.
+            wait (bool): Wait for acknowledgements before returning. Defaults to True.
+            timeout (float): Maximum seconds to wait for acknowledgements. Defaults to 10.0.
+            conflate (float, optional): Deliver at most one update per instrument every
+                ``conflate`` seconds to on_data_received, with the ticks in between merged
+                into it (latest values win). Useful for dashboards and risk checks.
+
         Returns:
-            bool: True if subscription successful, False otherwise
+            dict: Status per 'EXCHANGE:SYMBOL' key: the server status (e.g. 'success',
+                'error'), 'pending' if no acknowledgement arrived in time, 'sent' when
+                wait=False, 'invalid' for malformed instruments or 'send_failed'.
         """
+        mode = self._mode_number(mode)
         if not self.connected:
             self._log(1, "ERROR", "Not connected to WebSocket server")
-            return False
+            return {}
 
         if not self.authenticated:
             self._log(1, "ERROR", "Not authenticated with WebSocket server")
-            return False
+            return {}
 
-        # Set callback if provided
+        # Route these instruments' ticks to the callback, alongside any existing listeners
         if on_data_received:
-            self.ltp_callback = on_data_received
+            listener = on_data_received
+            if conflate:
+                with self.lock:
+                    listener = self._conflators.get((on_data_received, conflate))
+                    if listener is None:
+                        listener = Conflator(on_data_received, conflate, logger=self._log)
+                        self._conflators[(on_data_received, conflate)] = listener
+            self.add_listener(instruments, mode, listener)
 
-        # Subscribe to each instrument individually (matching the working test implementation)
-        for instrument in instruments:
-            exchange = instrument.get("exchange")
-            symbol = instrument.get("symbol")
-            exchange_token = instrument.get("exchange_token")
+        statuses = self._send_subscription("subscribe", instruments, mode, batch_size,
+                                           max_in_flight, wait, timeout)
 
-            # If only exchange_token is provided, we need to map it to a symbol
-            if not symbol and exchange_token:
-                symbol = exchange_token
+        # Remember subscriptions so they can be replayed after a reconnect
+        with self.lock:
+            registry = self._subscriptions[mode]
+            for symbol_key, status in statuses.items():
+                if status in ("success", "pending", "sent"):
+                    registry[symbol_key] = tuple(symbol_key.split(":", 1))
+        return statuses
+
+    def unsubscribe(self, instruments: List[Dict[str, Any]], mode=MODE_LTP,
+                    batch_size: int = DEFAULT_BATCH_SIZE, max_in_flight: int = 4,
+                    wait: bool = True, timeout: float = 10.0,
+                    on_data_received: Optional[Callable] = None) -> Dict[str, str]:
+        """
+        Unsubscribe many instruments from a mode using batched frames.
 
-            if not exchange or not symbol:
-                self._log(1, "ERROR", f"Invalid instrument: {instrument}")
-                continue
+        Args:
+            instruments: List of instrument dictionaries (see subscribe()).
+            mode: 1/'ltp', 2/'quote' or 3/'depth'. Defaults to LTP.
+            batch_size (int): Instruments per frame. Defaults to 100.
+            max_in_flight (int): Batches allowed to await acknowledgement at once. Defaults to 4.
+            wait (bool): Wait for acknowledgements before returning. Defaults to True.
+            timeout (float): Maximum seconds to wait for acknowledgements. Defaults to 10.0.
+            on_data_received (callable, optional): Only detach this callback. Instruments
+                other callbacks still listen to stay subscribed and are reported as 'retained'.
 
-            # Use the exact same message format as the working test
-            subscription_msg = {
-                "action": "subscribe",
-                "symbol": symbol,
-                "exchange": exchange,
-                "mode": 1,  # 1 for LTP
-                "depth": 5  # Default depth level
-            }
+        Returns:
+            dict: Status per 'EXCHANGE:SYMBOL' key (see subscribe()).
+        """
+        mode = self._mode_number(mode)
+        if not self.connected or not self.authenticated:
+            return {}
+
+        retained = {}
+        if on_data_received is not None:
+            self.remove_listener(instruments, mode, on_data_received)
+            remaining = []
+            for instrument in instruments:
+                key = self._instrument_key(instrument)
+                if key is not None and self._routes.get(key + (mode,)):
+                    retained[f"{key[0]}:{key[1]}"] = "retained"
+                else:
+                    remaining.append(instrument)
+            instruments = remaining
+        else:
+            self.remove_listener(instruments, mode)
 
-            self._log(1, "SUB", f"Subscribing {exchange}:{symbol} LTP...")
-            try:
-                self.ws.send(json.dumps(subscription_msg))
+        statuses = self._send_subscription("unsubscribe", instruments, mode, batch_size,
+                                           max_in_flight, wait, timeout) if instruments else {}
 
-                # Small delay to ensure the message is processed separately (just like the test)
-                time.sleep(0.1)
-            except Exception as e:
-                self._log(1, "ERROR", f"Error subscribing to {exchange}:{symbol}: {e}")
-                return False
+        # Clean up the data
+        store = {MODE_LTP: self.ltp_data, MODE_QUOTE: self.quotes_data, MODE_DEPTH: self.depth_data}[mode]
+        with self.lock:
+            for symbol_key, status in statuses.items():
+                if status not in ("invalid", "send_failed"):
+                    store.pop(symbol_key, None)
+                    if mode == MODE_DEPTH:
+                        ex, _, sym = symbol_key.partition(":")
+                        self._depth_index.get(ex, {}).pop(sym, None)
+                    self._subscriptions[mode].pop(symbol_key, None)
+                    if symbol_key not in self._subscriptions[MODE_LTP] and \
+                            symbol_key not in self._subscriptions[MODE_QUOTE]:
+                        self.tick_buffers.pop(symbol_key, None)
+        statuses.update(retained)
+        return statuses
+
+    def add_listener(self, instruments: List[Dict[str, Any]], mode, callback: Callable) -> None:
+        """
+        Route ticks of ``mode`` for the given instruments to ``callback``.
+
+        Routes are keyed by (exchange, symbol, mode), so each tick is delivered only
+        to the callbacks registered for that instrument, and any number of callbacks
+        can listen to the same instrument. This does not send a subscription; use
+        subscribe(..., on_data_received=callback) to do both.
+
+        Args:
+            instruments: List of instrument dictionaries with 'exchange' and 'symbol'.
+            mode: 1/'ltp', 2/'quote' or 3/'depth'.
+            callback (callable): Receives the cleaned market_data messages.
+        """
+        mode = self._mode_number(mode)
+        with self.lock:
+            for instrument in instruments:
+                key = self._instrument_key(instrument)
+                if key is None:
+                    continue
+                route = key + (mode,)
+                listeners = self._routes.get(route, ())
+                if callback not in listeners:
+                    self._routes[route] = listeners + (callback,)
+
+    def remove_listener(self, instruments: List[Dict[str, Any]], mode, callback: Optional[Callable] = None) -> None:
+        """
+        Stop routing ticks of ``mode`` for the given instruments to ``callback``.
 
-        return True
+        Args:
+            instruments: List of instrument dictionaries with 'exchange' and 'symbol'.
+            mode: 1/'ltp', 2/'quote' or 3/'depth'.
+            callback (callable, optional): Listener to remove; None removes every listener.
+        """
+        mode = self._mode_number(mode)
+        with self.lock:
+            for instrument in instruments:
+                key = self._instrument_key(instrument)
+                if key is None:
+                    continue
+                route = key + (mode,)
+                listeners = self._routes.get(route)
+                if not listeners:
+                    continue
+                if callback is not None:
+                    listeners = tuple(listener for listener in listeners if listener != callback and not
+                                      (isinstance(listener, Conflator) and listener.callback == callback))
+                if listeners and callback is not None:
+                    self._routes[route] = listeners
+                else:
+                    del self._routes[route]
+            self._release_conflators()
+
+    def _release_conflators(self) -> None:
+        """Stop conflators no route refers to any more (caller holds the lock)."""
+        if not self._conflators:
+            return
+        live = {listener for listeners in self._routes.values() for listener in listeners}
+        for key, conflator in list(self._conflators.items()):
+            if conflator not in live:
+                conflator.stop()
+                del self._conflators[key]
+
+    def _listeners(self, exchange: str, symbol: str, mode: int, fallback: Optional[Callable]) -> tuple:
+        """Callbacks for a tick: the routed listeners plus the mode-wide callback attribute, if set."""
+        listeners = self._routes.get((exchange, symbol, mode), ())
+        return listeners + (fallback,) if fallback else listeners
+
+    def _subscription_sent(self, statuses: Dict[str, str]) -> bool:
+        """True if connected and every valid instrument's frame was sent."""
+        return self.connected and self.authenticated and "send_failed" not in statuses.values()
+
+    def subscribe_ltp(self, instruments: List[Dict[str, Any]], on_data_received: Optional[Callable] = None,
+                      conflate: Optional[float] = None) -> bool:
+        """
+        Subscribe to LTP updates for instruments.
+        
+        Args:
+            instruments: List of instrument dictionaries with keys:
+                - exchange (str): Exchange code (e.g., 'NSE', 'BSE', 'NFO')
+                - symbol (str): Trading symbol
+                - exchange_token (str, optional): Exchange token for the instrument
+            on_data_received: Callback function for data updates
+                
+        Returns:
+            bool: True if subscription successful, False otherwise
+        """
+        statuses = self.subscribe(instruments, MODE_LTP, on_data_received, wait=False, conflate=conflate)
+        return self._subscription_sent(statuses)
 
     def unsubscribe_ltp(self, instruments: List[Dict[str, Any]]) -> bool:
         """
@@ -434,51 +932,11 @@ class FeedAPI(BaseAPI):
         Returns:
             bool: True if unsubscription successful, False otherwise
         """
-        if not self.connected or not self.authenticated:
-            return False
-
-        # Unsubscribe from each instrument individually (matching the working test implementation)
-        for instrument in instruments:
-            exchange = instrument.get("exchange")
-            symbol = instrument.get("symbol")
-            exchange_token = instrument.get("exchange_token")
-
-            # If only exchange_token is provided, we need to map it to a symbol
-            if not symbol and exchange_token:
-                symbol = exchange_token
-
-            if not exchange or not symbol:
-                self._log(1, "ERROR", f"Invalid instrument: {instrument}")
-                continue
-
-            self._log(1, "UNSUB", f"Unsubscribing {exchange}:{symbol} LTP")
-
-            # Use the exact same message format as the working test
-            unsubscribe_msg = {
-                "action": "unsubscribe",
-                "symbol": symbol,
-                "exchange": exchange,
-                "mode": 1  # 1 for LTP
-            }
-
-            try:
-                self.ws.send(json.dumps(unsubscribe_msg))
-
-                # Clean up the data
-                with self.lock:
-                    symbol_key = f"{exchange}:{symbol}"
-                    if symbol_key in self.ltp_data:
-                        del self.ltp_data[symbol_key]
-
-                # Small delay to ensure the message is processed separately
-                time.sleep(0.1)
-            except Exception as e:
-                self._log(1, "ERROR", f"Error unsubscribing {exchange}:{symbol}: {e}")
-                return False
-
-        return True
+        statuses = self.unsubscribe(instruments, MODE_LTP, wait=False)
+        return self._subscription_sent(statuses)
         
-    def subscribe_quote(self, instruments: List[Dict[str, Any]], on_data_received: Optional[Callable] = None) -> bool:
+    def subscribe_quote(self, instruments: List[Dict[str, Any]], on_data_received: Optional[Callable] = None,
+                        conflate: Optional[float] = None) -> bool:
         """
         Subscribe to Quote updates for instruments.
 
@@ -492,56 +950,46 @@ class FeedAPI(BaseAPI):
         Returns:
             bool: True if subscription request sent successfully
         """
-        if not self.connected:
-            self._log(1, "ERROR", "Not connected to WebSocket server")
-            return False
-
-        if not self.authenticated:
-            self._log(1, "ERROR", "Not authenticated with WebSocket server")
-            return False
-
-        # Set callback if provided
-        if on_data_received:
-            self.quote_callback = on_data_received
-
-        # Subscribe to each instrument individually
-        for instrument in instruments:
-            exchange = instrument.get("exchange")
-            symbol = instrument.get("symbol")
-            exchange_token = instrument.get("exchange_token")
-
-            # If only exchange_token is provided, we need to map it to a symbol
-            if not symbol and exchange_token:
-                symbol = exchange_token
-
-            if not exchange or not symbol:
-                self._log(1, "ERROR", f"Invalid instrument: {instrument}")
-                continue
+        statuses = self.subscribe(instruments, MODE_QUOTE, on_data_received, wait=False, conflate=conflate)
+        return self._subscription_sent(statuses)
+    
+    def unsubscribe_quote(self, instruments: List[Dict[str, Any]]) -> bool:
+        """
+        Unsubscribe from Quote updates for instruments.
 
-            # Use the same message format as for LTP but with mode 2 for Quote
-            subscription_msg = {
-                "action": "subscribe",
-                "symbol": symbol,
-                "exchange": exchange,
-                "mode": 2,  # 2 for Quote
-                "depth": 5  # Default depth level
-            }
+        Args:
+            instruments: List of instrument dictionaries with keys:
+                - exchange (str): Exchange code (e.g., 'NSE', 'BSE', 'NFO')
+                - symbol (str): Trading symbol
+                - exchange_token (str, optional): Exchange token for the instrument
 
-            self._log(1, "SUB", f"Subscribing {exchange}:{symbol} Quote...")
-            try:
-                self.ws.send(json.dumps(subscription_msg))
+        Returns:
+            bool: True if unsubscription successful, False otherwise
+        """
+        statuses = self.unsubscribe(instruments, MODE_QUOTE, wait=False)
+        return self._subscription_sent(statuses)
+        
+    def subscribe_depth(self, instruments: List[Dict[str, Any]], on_data_received: Optional[Callable] = None,
+                      conflate: Optional[float] = None) -> bool:
+        """
+        Subscribe to Market Depth updates for instruments.
 
-                # Small delay to ensure the message is processed separately
-                time.sleep(0.1)
-            except Exception as e:
-                self._log(1, "ERROR", f"Error subscribing to {exchange}:{symbol}: {e}")
-                return False
+        Args:
+            instruments: List of instrument dictionaries with keys:
+                - exchange (str): Exchange code (e.g., 'NSE', 'BSE', 'NFO')
+                - symbol (str): Trading symbol
+                - exchange_token (str, optional): Exchange token for the instrument
+            on_data_received: Callback function for data updates
 
-        return True
+        Returns:
+            bool: True if subscription request sent successfully
+        """
+        statuses = self.subscribe(instruments, MODE_DEPTH, on_data_received, wait=False, conflate=conflate)
+        return self._subscription_sent(statuses)
     
-    def unsubscribe_quote(self, instruments: List[Dict[str, Any]]) -> bool:
+    def unsubscribe_depth(self, instruments: List[Dict[str, Any]]) -> bool:
         """
-        Unsubscribe from Quote updates for instruments.
+        Unsubscribe from Market Depth updates for instruments.
 
         Args:
             instruments: List of instrument dictionaries with keys:
@@ -552,167 +1000,296 @@ class FeedAPI(BaseAPI):
         Returns:
             bool: True if unsubscription successful, False otherwise
         """
-        if not self.connected or not self.authenticated:
-            return False
+        statuses = self.unsubscribe(instruments, MODE_DEPTH, wait=False)
+        return self._subscription_sent(statuses)
 
-        # Unsubscribe from each instrument individually
-        for instrument in instruments:
-            exchange = instrument.get("exchange")
-            symbol = instrument.get("symbol")
-            exchange_token = instrument.get("exchange_token")
+    def publish_shared_memory(self, name: str = "layr0_feed", capacity: int = 4096) -> Dict[str, str]:
+        """
+        Publish LTP and Quote tick state to shared memory for other local processes.
 
-            # If only exchange_token is provided, we need to map it to a symbol
-            if not symbol and exchange_token:
-                symbol = exchange_token
+        The feed's tick stores are moved into ``multiprocessing.shared_memory``
+        segments and keep being updated in place, so strategy processes using
+        SharedTickReader share this one upstream connection and read ticks
+        without copying. Depth is not published.
 
-            if not exchange or not symbol:
-                self._log(1, "ERROR", f"Invalid instrument: {instrument}")
-                continue
+        Args:
+            name (str): Bus name readers attach to. Defaults to 'layr0_feed'.
+            capacity (int): Maximum instruments per mode. Defaults to 4096.
 
-            self._log(1, "UNSUB", f"Unsubscribing {exchange}:{symbol} Quote")
+        Returns:
+            dict: Segment names by mode, e.g. {'ltp': 'layr0_feed_ltp', 'quote': 'layr0_feed_quote'}.
 
-            # Use the same message format as for LTP but with mode 2 for Quote
-            unsubscribe_msg = {
-                "action": "unsubscribe",
-                "symbol": symbol,
-                "exchange": exchange,
-                "mode": 2  # 2 for Quote
-            }
+        Raises:
+            MemoryError: More instruments are held than ``capacity``. The new segment is
+                removed and that mode's ticks stay in process-local memory.
 
-            try:
-                self.ws.send(json.dumps(unsubscribe_msg))
+        Calling this again replaces the published segments (the name may be reused).
 
-                # Clean up the data
-                with self.lock:
-                    symbol_key = f"{exchange}:{symbol}"
-                    if symbol_key in self.quotes_data:
-                        del self.quotes_data[symbol_key]
+        Example:
+            client.publish_shared_memory("layr0_feed")
+            # in another process:
+            reader = SharedTickReader("layr0_feed", mode="quote")
+        """
+        segments = {}
+        with self.lock:
+            for mode, attr in ((MODE_LTP, 'ltp_data'), (MODE_QUOTE, 'quotes_data')):
+                old = getattr(self, attr)
+                if isinstance(old, SharedTickStore):
+                    # Release the current segment first so the same name can be created again
+                    old = self._local_tick_store(old)
+                    getattr(self, attr).close()
+                    setattr(self, attr, old)
+                store = SharedTickStore(segment_name(name, mode), capacity)
+                try:
+                    # Carry over instruments that already have data
+                    for key, row in list(old.index.items()):
+                        store.data[store.row_for(key)] = old.data[row]
+                except Exception:
+                    # e.g. MemoryError: more instruments than capacity; don't leak the segment
+                    store.close()
+                    raise
+                setattr(self, attr, store)
+                segments[MODE_NAMES[mode].lower()] = store.name
+        self._log(1, "WS", f"Publishing ticks to shared memory: {', '.join(segments.values())}")
+        return segments
+
+    def stop_shared_memory(self) -> None:
+        """
+        Stop publishing to shared memory and unlink the segments.
 
-                # Small delay to ensure the message is processed separately
-                time.sleep(0.1)
-            except Exception as e:
-                self._log(1, "ERROR", f"Error unsubscribing {exchange}:{symbol}: {e}")
-                return False
+        Ticks move back to process-local stores. Views taken from the shared stores
+        (e.g. ``ltp_data.column('ltp')``) stay readable but no longer update.
+        """
+        with self.lock:
+            for attr in ('ltp_data', 'quotes_data'):
+                old = getattr(self, attr)
+                if isinstance(old, SharedTickStore):
+                    setattr(self, attr, self._local_tick_store(old))
+                    old.close()
+
+    @staticmethod
+    def _local_tick_store(shared: SharedTickStore) -> TickStore:
+        """Copy a shared-memory tick store into a process-local TickStore."""
+        store = TickStore(max(1024, len(shared.keys_by_row)))
+        for key, row in list(shared.index.items()):
+            store.data[store.row_for(key)] = shared.data[row]
+        return store
+
+    def start_recording(self, path: str, append: bool = False) -> TickRecorder:
+        """
+        Record every raw WebSocket message with its receive time to a binary log.
 
-        return True
-        
-    def subscribe_depth(self, instruments: List[Dict[str, Any]], on_data_received: Optional[Callable] = None) -> bool:
+        Args:
+            path (str): Log file path.
+            append (bool): Append to an existing log. Defaults to False.
+
+        Returns:
+            TickRecorder: The active recorder.
         """
-        Subscribe to Market Depth updates for instruments.
+        self.stop_recording()
+        self.recorder = TickRecorder(path, append=append)
+        self._log(1, "WS", f"Recording feed to {path}")
+        return self.recorder
+
+    def stop_recording(self) -> None:
+        """Stop recording and close the log."""
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+            self._log(1, "WS", f"Recorded {recorder.count} messages to {recorder.path}")
+
+    def replay(self, path: str, speed: Optional[float] = 1.0) -> Dict[str, Any]:
+        """
+        Replay a recorded log through this feed's message handling and callbacks.
 
         Args:
-            instruments: List of instrument dictionaries with keys:
-                - exchange (str): Exchange code (e.g., 'NSE', 'BSE', 'NFO')
-                - symbol (str): Trading symbol
-                - exchange_token (str, optional): Exchange token for the instrument
-            on_data_received: Callback function for data updates
+            path (str): Log written by start_recording().
+            speed (float, optional): 1.0 for recorded pace, 2.0 for twice as fast,
+                None for as fast as possible. Defaults to 1.0.
 
         Returns:
-            bool: True if subscription request sent successfully
+            dict: Replay statistics (messages, elapsed, recorded, rate).
         """
-        if not self.connected:
-            self._log(1, "ERROR", "Not connected to WebSocket server")
-            return False
+        return TickReplayer(path).replay(self, speed=speed)
 
-        if not self.authenticated:
-            self._log(1, "ERROR", "Not authenticated with WebSocket server")
-            return False
+    def enable_tick_buffers(self, capacity: int = 1000) -> None:
+        """
+        Keep the last ``capacity`` ticks (price, quantity, timestamp) per instrument.
 
-        # Set callback if provided
-        if on_data_received:
-            self.depth_callback = on_data_received
+        LTP and Quote ticks are recorded into a ring buffer per 'EXCHANGE:SYMBOL',
+        readable through window(). Pass 0 to disable and drop the buffers.
 
-        # Subscribe to each instrument individually
-        for instrument in instruments:
-            exchange = instrument.get("exchange")
-            symbol = instrument.get("symbol")
-            exchange_token = instrument.get("exchange_token")
+        Args:
+            capacity (int): Ticks retained per instrument. Defaults to 1000.
+        """
+        with self.lock:
+            self.tick_buffer_capacity = max(0, int(capacity))
+            self.tick_buffers = {}
 
-            # If only exchange_token is provided, we need to map it to a symbol
-            if not symbol and exchange_token:
-                symbol = exchange_token
+    def _record_tick(self, symbol_key: str, price: float, quantity: int, timestamp: int) -> None:
+        """Append a tick to the instrument's ring buffer (caller holds the lock)."""
+        buffer = self.tick_buffers.get(symbol_key)
+        if buffer is None:
+            buffer = self.tick_buffers[symbol_key] = TickRingBuffer(self.tick_buffer_capacity)
+        buffer.append(price, quantity, timestamp)
 
-            if not exchange or not symbol:
-                self._log(1, "ERROR", f"Invalid instrument: {instrument}")
-                continue
+    def set_dispatcher(self, dispatcher: Optional[CallbackDispatcher]) -> Optional[CallbackDispatcher]:
+        """
+        Run data callbacks through a CallbackDispatcher instead of on the WebSocket thread.
 
-            # Use the same message format as for Quote but with mode 3 for Market Depth
-            subscription_msg = {
-                "action": "subscribe",
-                "symbol": symbol,
-                "exchange": exchange,
-                "mode": 3,  # 3 for Market Depth
-                "depth": 5  # Default depth level
-            }
+        Args:
+            dispatcher (CallbackDispatcher or None): Dispatcher to use; None restores
+                synchronous callbacks. A previously set dispatcher is stopped.
 
-            self._log(1, "SUB", f"Subscribing {exchange}:{symbol} Depth...")
-            try:
-                self.ws.send(json.dumps(subscription_msg))
+        Returns:
+            CallbackDispatcher: The dispatcher now in use.
 
-                # Small delay to ensure the message is processed separately
-                time.sleep(0.1)
+        Example:
+            client.set_dispatcher(CallbackDispatcher(workers=1, queue_size=5000, policy="drop_oldest"))
+            print(client.dispatcher.metrics())
+        """
+        previous, self.dispatcher = self.dispatcher, dispatcher
+        if previous is not None and previous is not dispatcher:
+            previous.stop()
+        if dispatcher is not None and dispatcher.logger is None:
+            dispatcher.logger = self._log
+        return dispatcher
+
+    def _deliver(self, callback: Callable, message: Dict[str, Any], label: str) -> None:
+        """Hand a cleaned message to a callback, via the dispatcher when one is set."""
+        dispatcher = self.dispatcher
+        if dispatcher is not None:
+            dispatcher.submit(callback, message)
+            return
+        metrics = self.metrics
+        if metrics is None:
+            try:
+                callback(message)
             except Exception as e:
-                self._log(1, "ERROR", f"Error subscribing to {exchange}:{symbol}: {e}")
-                return False
+                self._log(1, "ERROR", f"{label} callback error: {str(e)}")
+            return
+        start = time.perf_counter_ns()
+        try:
+            callback(message)
+        except Exception as e:
+            self._log(1, "ERROR", f"{label} callback error: {str(e)}")
+        metrics.record_callback(message['mode'], message['exchange'], message['symbol'],
+                                time.perf_counter_ns() - start)
 
-        return True
-    
-    def unsubscribe_depth(self, instruments: List[Dict[str, Any]]) -> bool:
+    def enable_metrics(self, symbol_histograms: bool = False) -> FeedMetrics:
         """
-        Unsubscribe from Market Depth updates for instruments.
+        Start measuring feed throughput and latency.
+
+        Tracks, per mode and per symbol, messages per second, decode time,
+        exchange-to-receive latency (receive time minus the message ``timestamp``)
+        and callback time. Callback time covers callbacks run on the WebSocket
+        thread; with a dispatcher set, see ``dispatcher.metrics()`` instead.
 
         Args:
-            instruments: List of instrument dictionaries with keys:
-                - exchange (str): Exchange code (e.g., 'NSE', 'BSE', 'NFO')
-                - symbol (str): Trading symbol
-                - exchange_token (str, optional): Exchange token for the instrument
+            symbol_histograms (bool): Also keep latency histograms per symbol
+                (rates are always kept per symbol). Defaults to False.
 
         Returns:
-            bool: True if unsubscription successful, False otherwise
+            FeedMetrics: The metrics object; also available as ``client.metrics``.
+
+        Example:
+            metrics = client.enable_metrics()
+            print(client.metrics_snapshot(reset=True)['modes']['LTP']['latency_us']['p99'])
         """
-        if not self.connected or not self.authenticated:
-            return False
+        self.metrics = FeedMetrics(symbol_histograms=symbol_histograms)
+        return self.metrics
 
-        # Unsubscribe from each instrument individually
-        for instrument in instruments:
-            exchange = instrument.get("exchange")
-            symbol = instrument.get("symbol")
-            exchange_token = instrument.get("exchange_token")
+    def disable_metrics(self) -> None:
+        """Stop measuring; the hot path goes back to a single ``None`` check."""
+        self.metrics = None
 
-            # If only exchange_token is provided, we need to map it to a symbol
-            if not symbol and exchange_token:
-                symbol = exchange_token
+    def metrics_snapshot(self, reset: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Current feed metrics (see FeedMetrics.snapshot), or None when metrics are disabled.
 
-            if not exchange or not symbol:
-                self._log(1, "ERROR", f"Invalid instrument: {instrument}")
-                continue
+        Args:
+            reset (bool): Start a new measurement window afterwards. Defaults to False.
+        """
+        metrics = self.metrics
+        return metrics.snapshot(reset=reset) if metrics is not None else None
 
-            self._log(1, "UNSUB", f"Unsubscribing {exchange}:{symbol} Depth")
+    def reset_metrics(self) -> None:
+        """Clear all counters and histograms and restart the rate window."""
+        if self.metrics is not None:
+            self.metrics.reset()
 
-            # Use the same message format as for Quote but with mode 3 for Market Depth
-            unsubscribe_msg = {
-                "action": "unsubscribe",
-                "symbol": symbol,
-                "exchange": exchange,
-                "mode": 3  # 3 for Market Depth
-            }
+    def add_bar_aggregator(self, aggregator) -> None:
+        """
+        Feed LTP and Quote ticks into a BarAggregator.
 
-            try:
-                self.ws.send(json.dumps(unsubscribe_msg))
+        Args:
+            aggregator (BarAggregator): Aggregator to receive every LTP/Quote tick.
+                Its bar callback errors are logged by the feed unless it has a logger.
+        """
+        if aggregator.logger is None:
+            aggregator.logger = self._log
+        if aggregator not in self.bar_aggregators:
+            self.bar_aggregators.append(aggregator)
+
+    def remove_bar_aggregator(self, aggregator) -> None:
+        """Stop feeding ticks into a BarAggregator."""
+        if aggregator in self.bar_aggregators:
+            self.bar_aggregators.remove(aggregator)
+
+    def window(self, symbol: str, n: Optional[int] = None, exchange: str = None,
+               copy: bool = False) -> Optional[TickWindow]:
+        """
+        Get the most recent ticks for an instrument, oldest first.
 
-                # Clean up the data
-                with self.lock:
-                    symbol_key = f"{exchange}:{symbol}"
-                    if symbol_key in self.depth_data:
-                        del self.depth_data[symbol_key]
+        Args:
+            symbol (str): 'EXCHANGE:SYMBOL', or a bare symbol together with ``exchange``.
+            n (int, optional): Number of ticks. Defaults to every retained tick.
+            exchange (str, optional): Exchange of a bare symbol.
+            copy (bool): Return copies rather than views into the ring buffer. Views
+                stay valid for (capacity - n) further ticks. Defaults to False.
 
-                # Small delay to ensure the message is processed separately
-                time.sleep(0.1)
-            except Exception as e:
-                self._log(1, "ERROR", f"Error unsubscribing {exchange}:{symbol}: {e}")
-                return False
+        Returns:
+            TickWindow: Named tuple of NumPy arrays (price, quantity, timestamp),
+                or None if no ticks were recorded for the instrument.
 
-        return True
+        Example:
+            w = client.window("NSE:SBIN", 200)
+            ema = ta.ema(w.price, 20)
+        """
+        symbol_key = f"{exchange}:{symbol}" if exchange else symbol
+        with self.lock:
+            buffer = self.tick_buffers.get(symbol_key)
+            if buffer is None:
+                return None
+            return buffer.window(n, copy=copy)
+
+    def order_book(self, symbol: str, exchange: str = None) -> Optional[OrderBook]:
+        """
+        Get the live order book of a depth subscription.
+
+        Args:
+            symbol (str): 'EXCHANGE:SYMBOL', or a bare symbol together with ``exchange``.
+            exchange (str, optional): Exchange of a bare symbol.
+
+        Returns:
+            OrderBook: Updated in place by the feed, with spread, mid, microprice,
+                imbalance and cumulative depth precomputed; None if not subscribed.
+        """
+        return self.depth_data.get(f"{exchange}:{symbol}" if exchange else symbol)
+
+    def _select_depth(self, exchange: Optional[str], symbol: Optional[str]):
+        """Yield (exchange, symbol, 'EXCHANGE:SYMBOL') for depth entries matching the filters."""
+        index = self._depth_index
+        for ex in ([exchange] if exchange else list(index)):
+            symbols = index.get(ex)
+            if not symbols:
+                continue
+            if symbol:
+                if symbol in symbols:
+                    yield ex, symbol, symbols[symbol]
+            else:
+                for sym, symbol_key in list(symbols.items()):
+                    yield ex, sym, symbol_key
 
     def get_ltp(self, exchange: str = None, symbol: str = None) -> Dict[str, Any]:
         """
@@ -726,37 +1303,21 @@ class FeedAPI(BaseAPI):
             dict: Dictionary with LTP data in nested format:
                 {"ltp": {"EXCHANGE": {"SYMBOL": {"timestamp": timestamp, "ltp": price}}}}
         """
-        with self.lock:
-            # Create nested format response
-            result = {"ltp": {}}
-            
-            # Process each item in the data structure
-            for symbol_key, data in self.ltp_data.items():
-                # Extract exchange and symbol from the key (format: "EXCHANGE:SYMBOL")
-                if ":" in symbol_key:
-                    parts = symbol_key.split(":")
-                    ex = parts[0]  # Exchange
-                    sym = parts[1]  # Symbol
-                    
-                    # Filter by exchange if specified
-                    if exchange and ex != exchange:
-                        continue
-                        
-                    # Filter by symbol if specified
-                    if symbol and sym != symbol:
-                        continue
-                    
-                    # Initialize exchange dict if not exists
-                    if ex not in result["ltp"]:
-                        result["ltp"][ex] = {}
-                    
-                    # Add data to the nested structure
-                    result["ltp"][ex][sym] = {
-                        "timestamp": data['timestamp'],
-                        "ltp": data['price']
-                    }
-            
-            return result
+        # Lock-free: indexed lookup plus a seqlock read of each row
+        result = {"ltp": {}}
+        store = self.ltp_data
+        for ex, sym, row in store.select(exchange, symbol):
+            values = store.read(row, ('timestamp', 'ltp'), (ex, sym))
+            if values is None:
+                continue
+
+            # Add data to the nested structure
+            result["ltp"].setdefault(ex, {})[sym] = {
+                "timestamp": int(values[0]),
+                "ltp": float(values[1])
+            }
+
+        return result
             
     def get_quotes(self, exchange: str = None, symbol: str = None) -> Dict[str, Any]:
         """
@@ -782,46 +1343,21 @@ class FeedAPI(BaseAPI):
                     "change_percent": change_percent
                 }}}}
         """
-        with self.lock:
-            # Create nested format response
-            result = {"quote": {}}
-            
-            # Process each item in the data structure
-            for symbol_key, data in self.quotes_data.items():
-                # Extract exchange and symbol from the key (format: "EXCHANGE:SYMBOL")
-                if ":" in symbol_key:
-                    parts = symbol_key.split(":")
-                    ex = parts[0]  # Exchange
-                    sym = parts[1]  # Symbol
-                    
-                    # Filter by exchange if specified
-                    if exchange and ex != exchange:
-                        continue
-                        
-                    # Filter by symbol if specified
-                    if symbol and sym != symbol:
-                        continue
-                    
-                    # Initialize exchange dict if not exists
-                    if ex not in result["quote"]:
-                        result["quote"][ex] = {}
-                    
-                    # Add data to the nested structure
-                    result["quote"][ex][sym] = {
-                        "timestamp": data['timestamp'],
-                        "open": data['open'],
-                        "high": data['high'],
-                        "low": data['low'],
-                        "close": data['close'],
-                        "ltp": data['ltp'],
-                        "volume": data.get('volume', 0),
-                        "last_trade_quantity": data.get('last_trade_quantity', 0),
-                        "avg_trade_price": data.get('avg_trade_price', 0),
-                        "change": data.get('change', 0),
-                        "change_percent": data.get('change_percent', 0)
-                    }
-            
-            return result
+        # Lock-free: indexed lookup plus a seqlock read of each row
+        result = {"quote": {}}
+        store = self.quotes_data
+        for ex, sym, row in store.select(exchange, symbol):
+            values = store.read(row, _QUOTE_SNAPSHOT_FIELDS, (ex, sym))
+            if values is None:
+                continue
+
+            # Add data to the nested structure
+            quote = {name: float(value) for name, value in zip(_QUOTE_SNAPSHOT_FIELDS, values)}
+            for name in ('timestamp', 'volume', 'last_trade_quantity'):
+                quote[name] = int(quote[name])
+            result["quote"].setdefault(ex, {})[sym] = quote
+
+        return result
             
     def get_depth(self, exchange: str = None, symbol: str = None) -> Dict[str, Any]:
         """
@@ -845,75 +1381,19 @@ class FeedAPI(BaseAPI):
                         # Additional levels...
                     }
                 }}}}
+                Each side has every level of the last message (up to ``depth_levels``
+                when set), padded with zero levels up to 5.
+                The per-symbol dicts are shared until the next depth update; treat them
+                as read-only. Use order_book() for spread, mid, microprice and imbalance.
         """
-        with self.lock:
-            # Create nested format response
-            result = {"depth": {}}
-            
-            # Process each item in the data structure
-            for symbol_key, data in self.depth_data.items():
-                # Extract exchange and symbol from the key (format: "EXCHANGE:SYMBOL")
-                if ":" in symbol_key:
-                    parts = symbol_key.split(":")
-                    ex = parts[0]  # Exchange
-                    sym = parts[1]  # Symbol
-                    
-                    # Filter by exchange if specified
-                    if exchange and ex != exchange:
-                        continue
-                        
-                    # Filter by symbol if specified
-                    if symbol and sym != symbol:
-                        continue
-                    
-                    # Initialize exchange dict if not exists
-                    if ex not in result["depth"]:
-                        result["depth"][ex] = {}
-                    
-                    # Initialize the symbol structure
-                    result["depth"][ex][sym] = {
-                        "timestamp": data.get('timestamp', int(time.time() * 1000)),
-                        "ltp": data.get('ltp', 0),
-                        "buyBook": {},
-                        "sellBook": {}
-                    }
-                    
-                    # Process buy depth book
-                    buy_depth = data.get('depth', {}).get('buy', [])
-                    for i, level in enumerate(buy_depth):
-                        level_num = str(i + 1)
-                        result["depth"][ex][sym]["buyBook"][level_num] = {
-                            "price": float(level.get('price') or 0),
-                            "qty": int(level.get('quantity') or 0),
-                            "orders": int(level.get('orders') or 0)
-                        }
-
-                    # If there are fewer than 5 levels, add empty levels to complete the structure
-                    for i in range(len(buy_depth), 5):
-                        level_num = str(i + 1)
-                        result["depth"][ex][sym]["buyBook"][level_num] = {
-                            "price": 0.0,
-                            "qty": 0,
-                            "orders": 0
-                        }
-
-                    # Process sell depth book
-                    sell_depth = data.get('depth', {}).get('sell', [])
-                    for i, level in enumerate(sell_depth):
-                        level_num = str(i + 1)
-                        result["depth"][ex][sym]["sellBook"][level_num] = {
-                            "price": float(level.get('price') or 0),
-                            "qty": int(level.get('quantity') or 0),
-                            "orders": int(level.get('orders') or 0)
-                        }
-
-                    # If there are fewer than 5 levels, add empty levels to complete the structure
-                    for i in range(len(sell_depth), 5):
-                        level_num = str(i + 1)
-                        result["depth"][ex][sym]["sellBook"][level_num] = {
-                            "price": 0.0,
-                            "qty": 0,
-                            "orders": 0
-                        }
-            
-            return result
+        # Lock-free: order books are read with their seqlock, and the nested view is
+        # built once per depth update and shared between calls
+        result = {"depth": {}}
+        depth_data = self.depth_data
+        for ex, sym, symbol_key in self._select_depth(exchange, symbol):
+            book = depth_data.get(symbol_key)
+            if book is None:
+                continue
+            result["depth"].setdefault(ex, {})[sym] = book.as_depth()
+
+        return result
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Historical Data Cache
+    https://docs.layr0.org
+
+Persistent OHLCV cache behind ``DataAPI.history``. Each (exchange, symbol,
+interval) series is stored as one memory-mapped ``.npy`` file per column plus
+a ``meta.json`` recording which date ranges have been fetched:
+
+    <root>/<EXCHANGE>/<SYMBOL>/<interval>/timestamp.npy, open.npy, ..., meta.json
+
+A request only downloads the date ranges its series does not cover yet;
+the new bars are merged (newer values win on duplicate timestamps) and the
+requested range is sliced from the memory map. The current trading day is
+never marked as covered, so today's bars are always refreshed.
+
+Example:
+    client.enable_history_cache(path="~/.cache/layr0_imc/history")
+    df = client.history(symbol="SBIN", exchange="NSE", interval="1m",
+                        start_date="2024-01-01", end_date="2024-06-30")
+    print(client.history_cache.stats())
+"""
+
+import json
+import os
+import shutil
+import threading
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .instruments import IST
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'layr0_imc', 'history')
+
+# Intervals whose timestamps already denote an IST calendar day
+DAILY_INTERVALS = ('D', 'W', 'M')
+
+_IST_OFFSET = 19800  # seconds
+
+Range = Tuple[int, int]  # inclusive date ordinals
+
+
+def _ordinal(value: Any) -> int:
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date().toordinal()
+
+
+def _iso(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+
+def _merge_ranges(ranges: List[Range]) -> List[Range]:
+    merged: List[Range] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(coverage: List[Range], start: int, end: int) -> List[Range]:
+    """Parts of the inclusive ordinal range [start, end] not in ``coverage`` (merged, sorted)."""
+    gaps: List[Range] = []
+    cursor = start
+    for covered_start, covered_end in coverage:
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start - 1))
+        cursor = max(cursor, covered_end + 1)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def history_arrays(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Columns of a history response's bar list: int64 'timestamp' plus numeric fields."""
+    frame = pd.DataFrame(rows)
+    arrays = {'timestamp': frame.pop('timestamp').to_numpy(dtype=np.int64)}
+    for name in frame.columns:
+        arrays[name] = pd.to_numeric(frame[name], errors='coerce').to_numpy()
+    return arrays
+
+
+def merge_columns(*parts: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Stitch column dicts into one, sorted by timestamp. On duplicate timestamps
+    the row from the later part wins; columns missing from a part are NaN.
+    """
+    parts = [part for part in parts if part and len(part['timestamp'])]
+    if not parts:
+        return {}
+    names = ['timestamp']
+    for part in parts:
+        names.extend(name for name in part if name not in names)
+    merged = {}
+    for name in names:
+        merged[name] = np.concatenate([part[name] if name in part else np.full(len(part['timestamp']), np.nan)
+                                       for part in parts])
+    timestamps = merged['timestamp']
+    order = np.argsort(timestamps, kind='stable')
+    ordered = timestamps[order]
+    keep = np.append(ordered[1:] != ordered[:-1], True)
+    selection = order[keep]
+    return {name: values[selection] for name, values in merged.items()}
+
+
+class HistoryCache:
+    """
+    On-disk columnar cache of history bars keyed by (exchange, symbol, interval).
+
+    Thread-safe: requests for the same series are serialised, different series
+    proceed in parallel.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path (str, optional): Cache directory. Defaults to ~/.cache/layr0_imc/history.
+        """
+        self.path = os.path.expanduser(path or DEFAULT_PATH)
+        self._lock = threading.Lock()
+        self._series_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self.reset_stats()
+
+    # Statistics
+
+    def reset_stats(self) -> None:
+        self._stats = {'requests': 0, 'hits': 0, 'partial_hits': 0, 'misses': 0,
+                       'ranges_fetched': 0, 'rows_fetched': 0, 'rows_served': 0}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache statistics since creation or reset_stats().
+
+        Returns:
+            dict: requests, hits (served entirely from disk), partial_hits (some ranges
+                downloaded), misses (nothing cached), ranges_fetched, rows_fetched,
+                rows_served and hit_rate (hits / requests).
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['hit_rate'] = stats['hits'] / stats['requests'] if stats['requests'] else 0.0
+        return stats
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+    # Storage
+
+    def _series_dir(self, exchange: str, symbol: str, interval: str) -> str:
+        parts = [str(part).replace(os.sep, '_').replace('/', '_') for part in (exchange, symbol, interval)]
+        return os.path.join(self.path, *parts)
+
+    def _series_lock(self, key: Tuple[str, str, str]) -> threading.Lock:
+        with self._lock:
+            lock = self._series_locks.get(key)
+            if lock is None:
+                lock = self._series_locks[key] = threading.Lock()
+            return lock
+
+    @staticmethod
+    def _read_meta(directory: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(directory, 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'columns': [], 'rows': 0, 'coverage': []}
+
+    @staticmethod
+    def _read_columns(directory: str, columns: List[str]) -> Dict[str, np.ndarray]:
+        return {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+                for name in ['timestamp'] + columns}
+
+    @staticmethod
+    def _write(directory: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name, values in arrays.items():
+            target = os.path.join(directory, f'{name}.npy')
+            with open(target + '.tmp', 'wb') as f:
+                np.save(f, values)
+            os.replace(target + '.tmp', target)
+        # Meta last: a crash mid-write leaves coverage describing the old files
+        target = os.path.join(directory, 'meta.json')
+        with open(target + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(target + '.tmp', target)
+
+    def coverage(self, symbol: str, exchange: str, interval: str) -> List[Tuple[str, str]]:
+        """Date ranges ('YYYY-MM-DD', 'YYYY-MM-DD') cached for a series."""
+        meta = self._read_meta(self._series_dir(exchange, symbol, interval))
+        return [(_iso(start), _iso(end)) for start, end in meta['coverage']]
+
+    def clear(self, symbol: Optional[str] = None, exchange: Optional[str] = None,
+              interval: Optional[str] = None) -> None:
+        """Delete one series (all three given) or the whole cache (none given)."""
+        if symbol is None and exchange is None and interval is None:
+            target = self.path
+        elif None in (symbol, exchange, interval):
+            raise ValueError("clear() needs symbol, exchange and interval, or none of them")
+        else:
+            target = self._series_dir(exchange, symbol, interval)
+        shutil.rmtree(target, ignore_errors=True)
+
+    # Lookup
+
+    @staticmethod
+    def _days(timestamps: np.ndarray, interval: str) -> np.ndarray:
+        """IST calendar day ordinal of each epoch-second timestamp."""
+        offset = 0 if interval in DAILY_INTERVALS else _IST_OFFSET
+        return (np.asarray(timestamps, dtype=np.int64) + offset) // 86400 + date(1970, 1, 1).toordinal()
+
+    def get(self, symbol: str, exchange: str, interval: str, start_date: Any, end_date: Any,
+            fetch: Callable[[str, str], Dict[str, Any]], today: Optional[date] = None) -> Any:
+        """
+        Bars for [start_date, end_date], downloading only the uncached ranges.
+
+        Args:
+            symbol, exchange, interval: Series key.
+            start_date, end_date: 'YYYY-MM-DD' (or date) bounds, inclusive.
+            fetch (callable): ``fetch(start_date, end_date)`` returning a history API
+                response dict for that range ('data' rows, or already converted
+                'columns' as from history_arrays()).
+            today (date, optional): Current IST date; ranges from it onwards are never
+                marked as cached. Defaults to today in IST.
+
+        Returns:
+            dict: {column: np.ndarray} with 'timestamp' in epoch seconds, or the error
+                dict of the first failed download.
+        """
+        start, end = _ordinal(start_date), _ordinal(end_date)
+        if end < start:
+            start, end = end, start
+        last_final = (today or datetime.now(IST).date()).toordinal() - 1
+        key = (exchange, symbol, interval)
+        directory = self._series_dir(exchange, symbol, interval)
+
+        with self._series_lock(key):
+            meta = self._read_meta(directory)
+            coverage = [tuple(r) for r in meta['coverage']]
+            gaps = missing_ranges(coverage, start, end)
+            cached = self._read_columns(directory, meta['columns']) if meta.get('rows') else {}
+
+            fetched: List[Dict[str, np.ndarray]] = []
+            covered: List[Range] = []
+            for gap_start, gap_end in gaps:
+                result = fetch(_iso(gap_start), _iso(gap_end))
+                if result.get('status') != 'success':
+                    if result.get('error_type') != 'no_data':
+                        return result
+                elif result.get('columns'):
+                    fetched.append(result['columns'])
+                elif result.get('data'):
+                    fetched.append(history_arrays(result['data']))
+                if gap_start <= last_final:
+                    covered.append((gap_start, min(gap_end, last_final)))
+
+            merged = merge_columns(cached, *fetched) if fetched else cached
+            if covered or fetched:
+                columns = [name for name in merged if name != 'timestamp']
+                new_meta = {'columns': columns,
+                            'rows': len(merged['timestamp']) if merged else 0,
+                            'coverage': [list(r) for r in _merge_ranges(coverage + covered)]}
+                self._write(directory, merged if fetched else {}, new_meta)
+                if fetched:
+                    merged = self._read_columns(directory, columns)
+
+            if not merged or not len(merged.get('timestamp', ())):
+                selected = {}
+            else:
+                days = self._days(merged['timestamp'], interval)
+                lo, hi = np.searchsorted(days, start, 'left'), np.searchsorted(days, end, 'right')
+                selected = {name: np.array(values[lo:hi]) for name, values in merged.items()}
+
+        rows_fetched = sum(len(arrays['timestamp']) for arrays in fetched)
+        outcome = 'hits' if not gaps else ('misses' if gaps == [(start, end)] else 'partial_hits')
+        self._count(requests=1, ranges_fetched=len(gaps), rows_fetched=rows_fetched,
+                    rows_served=len(selected.get('timestamp', ())), **{outcome: 1})
+        return selected
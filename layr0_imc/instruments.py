@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Local Instrument Master
+    https://docs.layr0.org
+
+Keeps the instrument master downloaded by ``instruments()`` in a local SQLite
+file, refreshed at most once per trading day, and serves lookups from
+in-process indexes instead of ``symbol()`` round-trips:
+
+    hash indexes    (exchange, symbol), (exchange, brsymbol), (exchange, token)
+    sorted index    (name, expiry, strike, instrumenttype) for derivative
+                    contract enumeration by underlying, expiry and strike range
+
+Example:
+    store = client.instrument_store()
+    sbin = store.lookup("SBIN", "NSE")
+    calls = store.contracts("NIFTY", expiry="26-DEC-24", instrumenttype="CE",
+                            strike_min=23000, strike_max=25000)
+"""
+
+import asyncio
+import bisect
+import inspect
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Seconds between staleness checks made by lookups when auto_refresh is on
+STALE_CHECK_INTERVAL = 60.0
+
+# Seconds before lookups retry a refresh that left exchanges missing; doubles per failure up to the max
+REFRESH_RETRY_DELAY = 60.0
+REFRESH_RETRY_MAX = 3600.0
+
+# Columns kept per instrument, in storage order
+COLUMNS = ('symbol', 'brsymbol', 'name', 'exchange', 'brexchange', 'token', 'expiry', 'strike',
+           'lotsize', 'instrumenttype', 'tick_size')
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+_EXPIRY_FORMATS = ('%d-%b-%y', '%d-%b-%Y', '%d%b%y', '%d%b%Y', '%Y-%m-%d', '%d-%m-%Y')
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'layr0_imc', 'instruments.sqlite')
+
+_SYMBOL, _BRSYMBOL, _NAME, _EXCHANGE, _BREXCHANGE, _TOKEN, _EXPIRY, _STRIKE, _LOTSIZE, _TYPE, _TICK = range(len(COLUMNS))
+
+
+def expiry_key(expiry: Any) -> int:
+    """Sortable YYYYMMDD integer for an expiry string ('26-DEC-24', '26DEC24', '2024-12-26'); 0 if none."""
+    if not expiry:
+        return 0
+    text = str(expiry).strip().upper()
+    for fmt in _EXPIRY_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return parsed.year * 10000 + parsed.month * 100 + parsed.day
+    return 0
+
+
+def trading_date(now: Optional[datetime] = None, refresh_time: str = '08:00') -> str:
+    """
+    IST trading date the master should be current for: before ``refresh_time``
+    (IST, when brokers publish the day's master) the previous day still counts.
+    """
+    now = (now or datetime.now(IST)).astimezone(IST)
+    hour, minute = (int(part) for part in refresh_time.split(':'))
+    return (now - timedelta(hours=hour, minutes=minute)).date().isoformat()
+
+
+def _strike(value: Any) -> float:
+    try:
+        return float(value) if value is not None and value != '' else -1.0
+    except (TypeError, ValueError):
+        return -1.0
+
+
+class InstrumentStore:
+    """
+    Instrument master persisted in SQLite and indexed in memory.
+
+    Rows are held as tuples in ``COLUMNS`` order; lookups return dicts. A
+    refresh builds new indexes and swaps them in one assignment, so readers on
+    other threads never see a half-built index.
+    """
+
+    def __init__(self, client: Any = None, path: Optional[str] = None, refresh_time: str = '08:00',
+                 auto_refresh: bool = True):
+        """
+        Args:
+            client: REST client used to download the master (anything with ``instruments()``).
+            path (str, optional): SQLite file. Defaults to ~/.cache/layr0_imc/instruments.sqlite.
+            refresh_time (str): IST time ('HH:MM') after which a new day's master is fetched.
+                Defaults to '08:00'.
+            auto_refresh (bool): Refresh on first use when the file is missing or stale.
+                Defaults to True.
+        """
+        self.client = client
+        self.path = path or DEFAULT_PATH
+        self.refresh_time = refresh_time
+        self.auto_refresh = auto_refresh
+        self.trading_date = None
+        self.last_errors: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._state = None
+        self._next_check = 0.0
+        self._failed_refreshes = 0
+        self._retry_at = 0.0
+        self._search_index = None
+
+    # Persistence
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS instruments ({', '.join(COLUMNS)}, expiry_key INTEGER)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_symbol ON instruments (exchange, symbol)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_brsymbol ON instruments (exchange, brsymbol)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_token ON instruments (exchange, token)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_contract ON instruments "
+                     "(name, expiry_key, strike, instrumenttype)")
+        return conn
+
+    def stale(self) -> bool:
+        """True when the stored master is older than the current trading date."""
+        self._ensure_loaded(refresh=False)
+        return self.trading_date != trading_date(refresh_time=self.refresh_time)
+
+    def load(self) -> int:
+        """(Re)build the in-memory indexes from the SQLite file. Returns the row count."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM instruments").fetchall()
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            conn.close()
+        self._state = self._build(rows)
+        self.trading_date = meta.get('trading_date')
+        return len(rows)
+
+    def refresh(self, force: bool = True) -> Dict[str, Any]:
+        """
+        Download the master through the client and persist it.
+
+        Exchanges that fail to download keep their previously stored rows; their
+        errors are returned and kept in ``last_errors``, and the stored trading date
+        is not advanced. Lookups then retry automatically with exponential backoff
+        (REFRESH_RETRY_DELAY doubling up to REFRESH_RETRY_MAX) and serve the stored
+        rows in between. Stores backed by an async client (``AsyncAPI``) are
+        refreshed with ``await refresh_async()`` instead.
+
+        Args:
+            force (bool): Download even if the stored master is current. Defaults to True.
+
+        Returns:
+            dict: {'status': 'success', 'instruments': count, 'trading_date': date,
+                   'errors': {exchange: error dict}} or an error dict.
+        """
+        if self.client is None:
+            return self._no_client()
+        if inspect.iscoroutinefunction(self.client.instruments):
+            return {
+                'status': 'error',
+                'message': 'InstrumentStore with an async client must be refreshed with await refresh_async()',
+                'error_type': 'validation_error'
+            }
+        with self._lock:
+            if not force and self._current():
+                return self._unchanged()
+            return self._save(self.client.instruments())
+
+    async def refresh_async(self, force: bool = True) -> Dict[str, Any]:
+        """
+        Like refresh(), downloading through an async client such as ``AsyncAPI``.
+
+        The download runs on the event loop; loading and writing the SQLite file
+        run in the loop's default executor.
+        """
+        if self.client is None:
+            return self._no_client()
+        loop = asyncio.get_running_loop()
+        if self._state is None:
+            await loop.run_in_executor(None, self.load)
+        if not force and self._current():
+            return self._unchanged()
+        result = await self.client.instruments()
+        return await loop.run_in_executor(None, self._save_locked, result)
+
+    @staticmethod
+    def _no_client() -> Dict[str, Any]:
+        return {
+            'status': 'error',
+            'message': 'InstrumentStore has no client to download instruments with',
+            'error_type': 'validation_error'
+        }
+
+    def _current(self) -> bool:
+        return self._state is not None and self.trading_date == trading_date(refresh_time=self.refresh_time)
+
+    def _unchanged(self) -> Dict[str, Any]:
+        return {'status': 'success', 'instruments': len(self._state[0]),
+                'trading_date': self.trading_date, 'errors': {}}
+
+    def _save_locked(self, result: Any) -> Dict[str, Any]:
+        with self._lock:
+            return self._save(result)
+
+    def _save(self, result: Any) -> Dict[str, Any]:
+        """Persist an instruments() result (DataFrame or error dict) and reload the indexes."""
+        if isinstance(result, dict):
+            self.last_errors = result.get('errors', {})
+            self._backoff(False)
+            return result
+        errors = dict(result.attrs.get('errors', {}))
+        frame = result.reindex(columns=list(COLUMNS)).astype(object)
+        frame = frame.where(frame.notna(), None)
+        records = [row + (expiry_key(row[_EXPIRY]),) for row in frame.itertuples(index=False, name=None)]
+        fetched = sorted(set(frame['exchange'].dropna()))
+        # Exchanges the server reports as empty count as downloaded
+        complete = all(error.get('error_type') == 'no_data' for error in errors.values())
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM instruments WHERE exchange = ?", [(e,) for e in fetched])
+                conn.executemany(f"INSERT INTO instruments VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                                 records)
+                if complete:
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('trading_date', ?)",
+                                 (trading_date(refresh_time=self.refresh_time),))
+        finally:
+            conn.close()
+        self.last_errors = errors
+        self._backoff(complete)
+        self.load()
+        return {'status': 'success', 'instruments': len(self._state[0]),
+                'trading_date': self.trading_date, 'errors': errors}
+
+    def _backoff(self, complete: bool) -> None:
+        """Schedule the next automatic refresh attempt after an incomplete download."""
+        if complete:
+            self._failed_refreshes = 0
+            self._retry_at = 0.0
+            return
+        delay = min(REFRESH_RETRY_MAX, REFRESH_RETRY_DELAY * 2 ** self._failed_refreshes)
+        self._failed_refreshes += 1
+        self._retry_at = time.monotonic() + delay
+
+    def _ensure_loaded(self, refresh: Optional[bool] = None) -> None:
+        if self._state is None:
+            self.load()
+        if (self.auto_refresh if refresh is None else refresh) and self.client is not None and \
+                time.monotonic() >= self._retry_at and \
+                self.trading_date != trading_date(refresh_time=self.refresh_time):
+            self.refresh(force=False)
+
+    # Indexes
+
+    @staticmethod
+    def _build(rows: Sequence[Tuple]) -> Tuple:
+        rows = [tuple(row) for row in rows]
+        by_symbol, by_brsymbol, by_token = {}, {}, {}
+        contracts = []
+        for i, row in enumerate(rows):
+            exchange = row[_EXCHANGE]
+            by_symbol[(exchange, row[_SYMBOL])] = i
+            if row[_BRSYMBOL] is not None:
+                by_brsymbol[(exchange, row[_BRSYMBOL])] = i
+            if row[_TOKEN] is not None:
+                by_token[(exchange, str(row[_TOKEN]))] = i
+            if row[_NAME]:
+                contracts.append((row[_NAME], expiry_key(row[_EXPIRY]), _strike(row[_STRIKE]),
+                                  row[_TYPE] or '', i))
+        contracts.sort()
+        return rows, by_symbol, by_brsymbol, by_token, contracts
+
+    def _state_now(self) -> Tuple:
+        if self._state is None or (self.auto_refresh and time.monotonic() >= self._next_check):
+            self._next_check = time.monotonic() + STALE_CHECK_INTERVAL
+            self._ensure_loaded()
+        return self._state
+
+    @staticmethod
+    def _as_dict(row: Tuple) -> Dict[str, Any]:
+        return dict(zip(COLUMNS, row))
+
+    def __len__(self) -> int:
+        return len(self._state_now()[0])
+
+    def lookup(self, symbol: str, exchange: str) -> Optional[Dict[str, Any]]:
+        """Instrument by layr0_imc symbol, or None."""
+        rows, by_symbol = self._state_now()[:2]
+        i = by_symbol.get((exchange, symbol))
+        return None if i is None else self._as_dict(rows[i])
+
+    def by_brsymbol(self, brsymbol: str, exchange: str) -> Optional[Dict[str, Any]]:
+        """Instrument by broker symbol, or None."""
+        state = self._state_now()
+        i = state[2].get((exchange, brsymbol))
+        return None if i is None else self._as_dict(state[0][i])
+
+    def by_token(self, token: Any, exchange: str) -> Optional[Dict[str, Any]]:
+        """Instrument by exchange token, or None."""
+        state = self._state_now()
+        i = state[3].get((exchange, str(token)))
+        return None if i is None else self._as_dict(state[0][i])
+
+    def _contract_range(self, name: str, expiry: Any = None, strike_min: Optional[float] = None,
+                        strike_max: Optional[float] = None) -> Tuple[List[Tuple], int, int]:
+        contracts = self._state_now()[4]
+        inf = float('inf')
+        if expiry is None:
+            lo = bisect.bisect_left(contracts, (name,))
+            hi = bisect.bisect_left(contracts, (name, inf))
+        else:
+            key = expiry_key(expiry)
+            lo = bisect.bisect_left(contracts, (name, key, -inf if strike_min is None else float(strike_min)))
+            hi = bisect.bisect_left(contracts, (name, key, inf if strike_max is None else float(strike_max), '\uffff'))
+        return contracts, lo, hi
+
+    def contracts(self, name: str, expiry: Any = None, instrumenttype: Optional[str] = None,
+                  exchange: Optional[str] = None, strike_min: Optional[float] = None,
+                  strike_max: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Contracts of an underlying in (expiry, strike, instrumenttype) order.
+
+        Args:
+            name (str): Underlying name, e.g. 'NIFTY'.
+            expiry (str, optional): Expiry date in any common format ('26-DEC-24', '26DEC24').
+            instrumenttype (str, optional): e.g. 'CE', 'PE', 'FUT'.
+            exchange (str, optional): Exchange filter, e.g. 'NFO'.
+            strike_min (float, optional): Lowest strike (inclusive).
+            strike_max (float, optional): Highest strike (inclusive).
+        """
+        rows = self._state_now()[0]
+        contracts, lo, hi = self._contract_range(name, expiry, strike_min, strike_max)
+        result = []
+        for _, _, strike, kind, i in contracts[lo:hi]:
+            if instrumenttype is not None and kind != instrumenttype:
+                continue
+            if (strike_min is not None and strike < strike_min) or (strike_max is not None and strike > strike_max):
+                continue
+            row = rows[i]
+            if exchange is not None and row[_EXCHANGE] != exchange:
+                continue
+            result.append(self._as_dict(row))
+        return result
+
+    def expiries(self, name: str, instrumenttype: Optional[str] = None,
+                 exchange: Optional[str] = None) -> List[str]:
+        """Distinct expiry strings of an underlying, nearest first."""
+        rows = self._state_now()[0]
+        contracts, lo, hi = self._contract_range(name)
+        seen = {}
+        for _, key, _, kind, i in contracts[lo:hi]:
+            if key and key not in seen and (instrumenttype is None or kind == instrumenttype) and \
+                    (exchange is None or rows[i][_EXCHANGE] == exchange):
+                seen[key] = rows[i][_EXPIRY]
+        return list(seen.values())
+
+    def strikes(self, name: str, expiry: Any, instrumenttype: Optional[str] = None,
+                exchange: Optional[str] = None) -> List[float]:
+        """Distinct strikes of an underlying for one expiry, ascending."""
+        strikes = {_strike(c['strike']) for c in self.contracts(name, expiry, instrumenttype, exchange)}
+        return sorted(strike for strike in strikes if strike >= 0)
+
+    def search(self, query: str, exchange: Any = None, instrumenttype: Any = None,
+               limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Offline symbol search: exact, prefix, substring and fuzzy matches, best first.
+
+        The search index (see ``search.SymbolIndex``) is built on first use and
+        rebuilt after each refresh.
+
+        Args:
+            query (str): Symbol, symbol prefix, name prefix or approximate symbol.
+            exchange (str or iterable, optional): Exchange(s) to include.
+            instrumenttype (str or iterable, optional): Instrument type(s) to include.
+            limit (int): Maximum results. Defaults to 20.
+        """
+        from .search import SymbolIndex
+
+        state = self._state_now()
+        index = self._search_index
+        if index is None or index.rows is not state[0]:
+            index = self._search_index = SymbolIndex(state[0])
+        return index.search_dicts(query, exchange, instrumenttype, limit)
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Feed Metrics
+    https://docs.layr0.org
+
+Low-overhead instrumentation for the WebSocket feed: message rates per mode
+and per symbol, decode time, exchange-to-receive latency (from the message
+``timestamp``) and callback time, kept in HDR-style log-linear histograms.
+
+Recording a value is an integer bit_length and a list increment; memory per
+histogram is fixed (~1.2k counters) regardless of how many values are
+recorded. Values are in microseconds with ~3% relative precision.
+
+Example:
+    metrics = client.enable_metrics()
+    ...
+    snap = metrics.snapshot(reset=True)
+    print(snap['modes']['Quote']['latency_us']['p99'])
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Exact below 64, then 32 linear sub-buckets per power of two (<= 1/32 relative error)
+_SUB_BITS = 6
+_SUB_COUNT = 1 << _SUB_BITS
+_SUB_HALF = _SUB_COUNT >> 1
+_MAX_BITS = 42  # ~50 days in microseconds
+_BUCKETS = _SUB_COUNT + (_MAX_BITS - _SUB_BITS) * _SUB_HALF
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of non-negative integer values (microseconds).
+
+    Values below 64 are exact; above that each power of two is split into 32
+    linear buckets. Percentiles report the bucket's lower bound.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < _SUB_COUNT:
+            return value
+        shift = value.bit_length() - _SUB_BITS
+        index = _SUB_COUNT + (shift - 1) * _SUB_HALF + (value >> shift) - _SUB_HALF
+        return index if index < _BUCKETS else _BUCKETS - 1
+
+    @staticmethod
+    def _value(index: int) -> int:
+        """Lower bound of the values counted in bucket ``index``."""
+        if index < _SUB_COUNT:
+            return index
+        shift = (index - _SUB_COUNT) // _SUB_HALF + 1
+        return ((index - _SUB_COUNT) % _SUB_HALF + _SUB_HALF) << shift
+
+    def record(self, value: float) -> None:
+        value = int(value) if value > 0 else 0
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percentile: float) -> int:
+        """Value at ``percentile`` (0-100), or 0 when empty."""
+        if not self.count:
+            return 0
+        target = max(1, int(round(self.count * percentile / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= target:
+                    return min(self._value(index), self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """count, min, max, mean and the PERCENTILES ('p50', 'p90', 'p99', 'p99.9')."""
+        result = {
+            'count': self.count,
+            'min': self.min or 0,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else 0.0,
+        }
+        for percentile in PERCENTILES:
+            result[f"p{percentile:g}"] = self.percentile(percentile)
+        return result
+
+
+class _Stream:
+    """Counters and histograms for one mode (or one symbol)."""
+
+    __slots__ = ('messages', 'decode_us', 'latency_us', 'callback_us')
+
+    def __init__(self, histograms: bool = True):
+        self.messages = 0
+        self.decode_us = LatencyHistogram() if histograms else None
+        self.latency_us = LatencyHistogram() if histograms else None
+        self.callback_us = LatencyHistogram() if histograms else None
+
+    def snapshot(self, elapsed: float) -> Dict[str, Any]:
+        result = {
+            'messages': self.messages,
+            'rate': self.messages / elapsed if elapsed > 0 else 0.0,
+        }
+        for name in ('decode_us', 'latency_us', 'callback_us'):
+            histogram = getattr(self, name)
+            if histogram is not None:
+                result[name] = histogram.snapshot()
+        return result
+
+
+class FeedMetrics:
+    """
+    Message rate, decode time, exchange-to-receive latency and callback time
+    per mode and per symbol.
+
+    Per-symbol entries keep message counts and rates; set
+    ``symbol_histograms=True`` to also keep full histograms per symbol.
+    """
+
+    def __init__(self, symbol_histograms: bool = False):
+        """
+        Args:
+            symbol_histograms (bool): Keep latency/decode/callback histograms per
+                symbol as well as per mode. Defaults to False.
+        """
+        self.symbol_histograms = symbol_histograms
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear every counter and histogram and restart the rate window."""
+        with self._lock:
+            self.modes: Dict[int, _Stream] = {}
+            self.symbols: Dict[tuple, _Stream] = {}
+            self.started = time.monotonic()
+
+    def _streams(self, mode: int, exchange: str, symbol: str):
+        stream = self.modes.get(mode)
+        if stream is None:
+            stream = self.modes[mode] = _Stream()
+        key = (exchange, symbol, mode)
+        per_symbol = self.symbols.get(key)
+        if per_symbol is None:
+            per_symbol = self.symbols[key] = _Stream(self.symbol_histograms)
+        return stream, per_symbol
+
+    def record_message(self, mode: int, exchange: str, symbol: str, decode_ns: int,
+                       received_ms: float, timestamp: Optional[Any]) -> None:
+        """Record one market_data message: decode time and exchange-to-receive latency."""
+        stream, per_symbol = self._streams(mode, exchange, symbol)
+        stream.messages += 1
+        per_symbol.messages += 1
+        decode_us = decode_ns // 1000
+        stream.decode_us.record(decode_us)
+        if per_symbol.decode_us is not None:
+            per_symbol.decode_us.record(decode_us)
+        if isinstance(timestamp, (int, float)) and timestamp > 0:
+            latency_us = (received_ms - timestamp) * 1000
+            stream.latency_us.record(latency_us)
+            if per_symbol.latency_us is not None:
+                per_symbol.latency_us.record(latency_us)
+
+    def record_callback(self, mode: int, exchange: str, symbol: str, elapsed_ns: int) -> None:
+        """Record the time one callback took for a message."""
+        stream, per_symbol = self._streams(mode, exchange, symbol)
+        elapsed_us = elapsed_ns // 1000
+        stream.callback_us.record(elapsed_us)
+        if per_symbol.callback_us is not None:
+            per_symbol.callback_us.record(elapsed_us)
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Current metrics.
+
+        Args:
+            reset (bool): Start a new window after taking the snapshot. Defaults to False.
+
+        Returns:
+            dict: {'elapsed': seconds, 'modes': {'LTP'|'Quote'|'Depth': {...}},
+                   'symbols': {'EXCHANGE:SYMBOL': {mode name: {...}}}} where each entry
+                has 'messages', 'rate' (per second) and, where kept, 'decode_us',
+                'latency_us' and 'callback_us' histogram summaries.
+        """
+        from .feed import MODE_NAMES
+
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            modes = {MODE_NAMES.get(mode, str(mode)): stream.snapshot(elapsed)
+                     for mode, stream in list(self.modes.items())}
+            symbols: Dict[str, Dict[str, Any]] = {}
+            for (exchange, symbol, mode), stream in list(self.symbols.items()):
+                symbols.setdefault(f"{exchange}:{symbol}", {})[MODE_NAMES.get(mode, str(mode))] = \
+                    stream.snapshot(elapsed)
+            if reset:
+                self.modes, self.symbols, self.started = {}, {}, time.monotonic()
+        return {'elapsed': elapsed, 'modes': modes, 'symbols': symbols}
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Order Book
+    https://docs.layr0.org
+
+Per-instrument market depth held in fixed-size NumPy arrays and updated in
+place from depth (mode 3) messages. Derived fields (spread, mid, microprice,
+top-N imbalance and cumulative depth) are computed once per update, so
+readers that poll the book far more often than it changes pay nothing extra.
+
+Example:
+    client.subscribe_depth([{"exchange": "NSE", "symbol": "SBIN"}])
+    book = client.order_book("NSE:SBIN")
+    print(book.spread, book.microprice, book.imbalance_at(3))
+"""
+
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Levels per side allocated up front, and shown by as_depth() when a message carries fewer
+DEFAULT_DEPTH_LEVELS = 5
+
+# Attempts a lock-free read makes before returning its last (possibly torn) result
+SEQLOCK_RETRIES = 100
+
+
+class OrderBook:
+    """
+    Array-backed order book for one instrument.
+
+    ``bid_*``/``ask_*`` arrays hold price, quantity and orders per level (best
+    first, unused levels zero) and ``bid_cum_qty``/``ask_cum_qty`` the running
+    totals. ``version`` is a seqlock counter (odd during an update) used by
+    ``as_depth()`` to read a consistent book without locking.
+    """
+
+    def __init__(self, levels: Optional[int] = None, imbalance_levels: Optional[int] = None):
+        """
+        Args:
+            levels (int, optional): Maximum levels kept per side; extra levels in a message are
+                ignored. Defaults to None: the arrays start at 5 levels and grow to the deepest
+                message seen (replacing the arrays, so re-fetch cumulative_depth() views).
+            imbalance_levels (int, optional): Levels used for ``imbalance``. Defaults to all levels.
+        """
+        self.max_levels = max(1, int(levels)) if levels is not None else None
+        self._imbalance_levels = imbalance_levels
+        self._allocate(self.max_levels or DEFAULT_DEPTH_LEVELS)
+        self.bid_levels = 0
+        self.ask_levels = 0
+        self.ltp = 0.0
+        self.timestamp = 0
+        self.seq = 0
+        self.version = 0
+        self.spread = math.nan
+        self.mid = math.nan
+        self.microprice = math.nan
+        self.imbalance = 0.0
+        self._depth_view = None
+        self._depth_view_seq = -1
+
+    def _allocate(self, levels: int) -> None:
+        self.levels = levels
+        self.imbalance_levels = min(levels, self._imbalance_levels or levels)
+        self.bid_price = np.zeros(levels, dtype=np.float64)
+        self.bid_qty = np.zeros(levels, dtype=np.int64)
+        self.bid_orders = np.zeros(levels, dtype=np.int64)
+        self.bid_cum_qty = np.zeros(levels, dtype=np.int64)
+        self.ask_price = np.zeros(levels, dtype=np.float64)
+        self.ask_qty = np.zeros(levels, dtype=np.int64)
+        self.ask_orders = np.zeros(levels, dtype=np.int64)
+        self.ask_cum_qty = np.zeros(levels, dtype=np.int64)
+
+    @staticmethod
+    def _parse(levels: List[Dict[str, Any]], limit: Optional[int]):
+        """Price, quantity and orders arrays for up to ``limit`` levels; raises on malformed values."""
+        levels = levels[:limit]
+        price = np.array([level.get('price') or 0 for level in levels], dtype=np.float64)
+        qty = np.array([level.get('quantity') or 0 for level in levels], dtype=np.int64)
+        orders = np.array([level.get('orders') or 0 for level in levels], dtype=np.int64)
+        return price, qty, orders
+
+    @staticmethod
+    def _fill(parsed, price: np.ndarray, qty: np.ndarray, orders: np.ndarray) -> int:
+        count = len(parsed[0])
+        price[:count], qty[:count], orders[:count] = parsed
+        price[count:] = 0
+        qty[count:] = 0
+        orders[count:] = 0
+        return count
+
+    def update(self, depth: Dict[str, Any], ltp: Optional[float] = None, timestamp: Optional[int] = None) -> None:
+        """
+        Apply a depth message in place.
+
+        The message is parsed before the seqlock is opened, so a malformed level
+        raises ValueError/TypeError and leaves the book as it was.
+
+        Args:
+            depth (dict): {'buy': [{'price', 'quantity', 'orders'}, ...], 'sell': [...]}, best level first.
+            ltp (float, optional): Last traded price carried by the message.
+            timestamp (int, optional): Message time in epoch ms. Defaults to now.
+        """
+        bids = self._parse(depth.get('buy') or [], self.max_levels)
+        asks = self._parse(depth.get('sell') or [], self.max_levels)
+        ltp = float(ltp) if ltp is not None else self.ltp
+        timestamp = int(timestamp) if timestamp is not None else int(time.time() * 1000)
+
+        self.version += 1  # odd: update in progress
+        deepest = max(len(bids[0]), len(asks[0]))
+        if deepest > self.levels:
+            self._allocate(deepest)
+        self.bid_levels = self._fill(bids, self.bid_price, self.bid_qty, self.bid_orders)
+        self.ask_levels = self._fill(asks, self.ask_price, self.ask_qty, self.ask_orders)
+        np.cumsum(self.bid_qty, out=self.bid_cum_qty)
+        np.cumsum(self.ask_qty, out=self.ask_cum_qty)
+        self.ltp = ltp
+        self.timestamp = timestamp
+        self._derive()
+        self.seq += 1
+        self.version += 1
+
+    def _derive(self) -> None:
+        bid = float(self.bid_price[0])
+        ask = float(self.ask_price[0])
+        if bid > 0 and ask > 0:
+            bid_qty = int(self.bid_qty[0])
+            ask_qty = int(self.ask_qty[0])
+            self.spread = ask - bid
+            self.mid = (ask + bid) / 2
+            # Weighted toward the side with less resting size, where the price is likely to move
+            self.microprice = (bid * ask_qty + ask * bid_qty) / (bid_qty + ask_qty) if bid_qty + ask_qty else self.mid
+        else:
+            self.spread = self.mid = self.microprice = math.nan
+        self.imbalance = self.imbalance_at(self.imbalance_levels)
+
+    @property
+    def best_bid(self) -> float:
+        return float(self.bid_price[0])
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.ask_price[0])
+
+    def imbalance_at(self, n: int) -> float:
+        """
+        Order-flow imbalance over the top ``n`` levels: (bid qty - ask qty) / (bid qty + ask qty),
+        in [-1, 1]; positive means more resting buy interest.
+        """
+        n = max(1, min(int(n), self.levels))
+        bid = int(self.bid_cum_qty[n - 1])
+        ask = int(self.ask_cum_qty[n - 1])
+        total = bid + ask
+        return (bid - ask) / total if total else 0.0
+
+    def cumulative_depth(self, side: str = 'buy') -> np.ndarray:
+        """Running quantity per level for 'buy' or 'sell' (a view; updated in place)."""
+        return self.bid_cum_qty if side == 'buy' else self.ask_cum_qty
+
+    def _build_depth(self) -> Dict[str, Any]:
+        # Every level of the last message, padded with empty levels up to 5 per side
+        padded = min(DEFAULT_DEPTH_LEVELS, self.levels)
+
+        def book(count: int, price: np.ndarray, qty: np.ndarray, orders: np.ndarray) -> Dict[str, Dict[str, Any]]:
+            n = max(count, padded)
+            return {
+                str(i + 1): {"price": p, "qty": q, "orders": o}
+                for i, (p, q, o) in enumerate(zip(price[:n].tolist(), qty[:n].tolist(), orders[:n].tolist()))
+            }
+
+        return {
+            "timestamp": self.timestamp,
+            "ltp": self.ltp,
+            "buyBook": book(self.bid_levels, self.bid_price, self.bid_qty, self.bid_orders),
+            "sellBook": book(self.ask_levels, self.ask_price, self.ask_qty, self.ask_orders),
+        }
+
+    def as_depth(self) -> Dict[str, Any]:
+        """
+        The book in the ``get_depth()`` format ({'timestamp', 'ltp', 'buyBook', 'sellBook'}).
+
+        Built at most once per update and shared between readers, so treat the
+        result as read-only. Safe to call while the feed thread is updating.
+        """
+        view = self._depth_view
+        if view is not None and self._depth_view_seq == self.seq:
+            return view
+        for _ in range(SEQLOCK_RETRIES):
+            before = self.version
+            if before & 1:
+                time.sleep(0)  # let the writer finish
+                continue
+            view = self._build_depth()
+            if self.version == before:
+                self._depth_view, self._depth_view_seq = view, before // 2
+                break
+        return view
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Top of book and derived fields as plain Python values."""
+        return {
+            'timestamp': self.timestamp,
+            'ltp': self.ltp,
+            'best_bid': self.best_bid,
+            'best_ask': self.best_ask,
+            'spread': self.spread,
+            'mid': self.mid,
+            'microprice': self.microprice,
+            'imbalance': self.imbalance,
+            'bid_qty': int(self.bid_cum_qty[-1]),
+            'ask_qty': int(self.ask_cum_qty[-1]),
+        }
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Client-side Rate Limiting
+    https://docs.layr0.org
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+# Default limits (requests/second) matching the layr0_imc server defaults
+DEFAULT_LIMITS = {
+    'api': 50,
+    'order': 10,
+    'smart_order': 2,
+}
+
+# Endpoints that do not belong to the default 'api' group
+DEFAULT_ENDPOINT_GROUPS = {
+    'placeorder': 'order',
+    'modifyorder': 'order',
+    'cancelorder': 'order',
+    'cancelallorder': 'order',
+    'closeposition': 'order',
+    'basketorder': 'order',
+    'splitorder': 'order',
+    'optionsorder': 'order',
+    'optionsmultiorder': 'order',
+    'placesmartorder': 'smart_order',
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    The lock is only held while updating the bucket, never while waiting,
+    so the same bucket can be shared by threads and asyncio tasks.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float, optional): Maximum burst size. Defaults to ``rate``.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available right now. Returns False without waiting otherwise."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take tokens unconditionally and return how long the caller must wait
+        before using them. Callers queue up in reservation order.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Per-endpoint-group rate limiter for the REST client.
+
+    Each group (e.g. ``'order'``, ``'api'``) has its own token bucket. In
+    ``'block'`` mode a request waits until its group has capacity; in
+    ``'fail'`` mode the request is rejected immediately and the client
+    returns an error response with ``error_type='rate_limit_error'``.
+
+    Example:
+        limiter = RateLimiter(limits={'order': 5, 'api': (50, 100)}, mode='block')
+        client = api(api_key="...", rate_limiter=limiter)
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Union[float, Tuple[float, float]]]] = None,
+                 endpoint_groups: Optional[Dict[str, str]] = None, mode: str = 'block',
+                 default_group: str = 'api'):
+        """
+        Args:
+            limits (dict, optional): Group name to rate (req/s) or (rate, burst) tuple.
+                Merged over DEFAULT_LIMITS.
+            endpoint_groups (dict, optional): Endpoint name to group name.
+                Merged over DEFAULT_ENDPOINT_GROUPS.
+            mode (str): 'block' to wait for capacity, 'fail' to reject immediately.
+            default_group (str): Group used for endpoints not listed in endpoint_groups.
+        """
+        if mode not in ('block', 'fail'):
+            raise ValueError("mode must be 'block' or 'fail'")
+        self.mode = mode
+        self.default_group = default_group
+        self.endpoint_groups = dict(DEFAULT_ENDPOINT_GROUPS)
+        if endpoint_groups:
+            self.endpoint_groups.update(endpoint_groups)
+
+        merged = dict(DEFAULT_LIMITS)
+        if limits:
+            merged.update(limits)
+        self.buckets = {}
+        for group, limit in merged.items():
+            if isinstance(limit, (tuple, list)):
+                self.buckets[group] = TokenBucket(limit[0], limit[1])
+            else:
+                self.buckets[group] = TokenBucket(limit)
+
+    def group_for(self, endpoint: str) -> str:
+        """Return the rate limit group an endpoint belongs to."""
+        return self.endpoint_groups.get(endpoint, self.default_group)
+
+    def _bucket(self, endpoint: str) -> Optional[TokenBucket]:
+        return self.buckets.get(self.group_for(endpoint))
+
+    def acquire(self, endpoint: str) -> bool:
+        """
+        Acquire a slot for ``endpoint``, blocking the calling thread in 'block' mode.
+
+        Returns:
+            bool: True if the request may proceed, False if it was rejected.
+        """
+        bucket = self._bucket(endpoint)
+        if bucket is None:
+            return True
+        if self.mode == 'fail':
+            return bucket.try_acquire()
+        delay = bucket.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    async def acquire_async(self, endpoint: str) -> bool:
+        """Asyncio version of acquire(); waits without blocking the event loop."""
+        bucket = self._bucket(endpoint)
+        if bucket is None:
+            return True
+        if self.mode == 'fail':
+            return bucket.try_acquire()
+        delay = bucket.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return True
+
+    def rejection(self, endpoint: str) -> Dict[str, str]:
+        """Build the error response returned when a request is rejected in 'fail' mode."""
+        return {
+            'status': 'error',
+            'message': f'Client-side rate limit exceeded for {self.group_for(endpoint)} endpoints.',
+            'error_type': 'rate_limit_error'
+        }
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Tick Recorder and Replayer
+    https://docs.layr0.org
+
+Captures every raw WebSocket message the feed receives, with its receive
+time, into a compact binary log, and plays a log back through
+``FeedAPI._process_message`` so the same stores, routes and callbacks run
+again - at recorded speed, scaled, or as fast as possible. Use it to
+benchmark strategy callbacks under real message rates and to reproduce
+incidents offline.
+
+File format: an 8-byte magic ``b'L0TICKS1'`` followed by records of
+``<int64 receive time in ns since epoch><uint32 length><raw message bytes>``.
+
+Example:
+    client.start_recording("session.ticks")
+    ...
+    client.stop_recording()
+
+    replay = api(api_key="...")
+    replay.subscribe_quote(...)          # or set add_listener()/callbacks
+    replay.replay("session.ticks", speed=None)
+"""
+
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+
+MAGIC = b'L0TICKS1'
+_RECORD = struct.Struct('<qI')
+
+
+class TickRecorder:
+    """Append raw feed messages with receive timestamps to a binary log."""
+
+    def __init__(self, path: str, append: bool = False, buffer_size: int = 1 << 20):
+        """
+        Args:
+            path (str): Log file path.
+            append (bool): Append to an existing log instead of truncating. Defaults to False.
+            buffer_size (int): Write buffer in bytes. Defaults to 1 MiB.
+        """
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab' if append else 'wb', buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def record(self, message: Union[str, bytes], received_ns: Optional[int] = None) -> None:
+        """Append one message; ``received_ns`` defaults to now."""
+        if isinstance(message, str):
+            message = message.encode('utf-8')
+        if received_ns is None:
+            received_ns = time.time_ns()
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_RECORD.pack(received_ns, len(message)))
+            self._file.write(message)
+            self.count += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class TickReplayer:
+    """Read a TickRecorder log and drive a feed (or any callable) with it."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Log file written by TickRecorder.
+        """
+        self.path = path
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        """Yield ``(received_ns, message)`` in recorded order."""
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a layr0_imc tick log")
+            header_size = _RECORD.size
+            while True:
+                header = f.read(header_size)
+                if len(header) < header_size:
+                    return
+                received_ns, length = _RECORD.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length:
+                    return  # truncated final record, e.g. the recorder was killed
+                yield received_ns, payload.decode('utf-8')
+
+    def replay(self, target: Any, speed: Optional[float] = 1.0) -> Dict[str, Any]:
+        """
+        Play the log into ``target``.
+
+        Args:
+            target: A FeedAPI (messages go through ``_process_message``) or a callable
+                taking the raw message string.
+            speed (float, optional): 1.0 replays at recorded wall-clock pace, 2.0 twice
+                as fast; None replays as fast as possible. Defaults to 1.0.
+
+        Returns:
+            dict: {'messages': count, 'elapsed': seconds, 'recorded': seconds spanned
+                by the log, 'rate': messages per second achieved}
+        """
+        handler: Callable[[str], Any] = getattr(target, '_process_message', target)
+        count = 0
+        first_ns = last_ns = None
+        start = time.perf_counter()
+        for received_ns, message in self:
+            if first_ns is None:
+                first_ns = received_ns
+            last_ns = received_ns
+            if speed:
+                delay = (received_ns - first_ns) / 1e9 / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            handler(message)
+            count += 1
+        elapsed = time.perf_counter() - start
+        return {
+            'messages': count,
+            'elapsed': elapsed,
+            'recorded': (last_ns - first_ns) / 1e9 if count else 0.0,
+            'rate': count / elapsed if elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Retry Policy and Circuit Breaker
+    https://docs.layr0.org
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import httpx
+
+# Read-only endpoints that are always safe to send again
+IDEMPOTENT_ENDPOINTS = frozenset({
+    'quotes', 'multiquotes', 'depth', 'symbol', 'search', 'history', 'intervals',
+    'expiry', 'instruments', 'syntheticfuture', 'funds', 'orderbook', 'tradebook',
+    'positionbook', 'holdings', 'orderstatus', 'openposition', 'analyzer', 'margin',
+    'optiongreeks', 'optionsymbol', 'optionchain', 'market/holidays', 'market/timings',
+})
+
+
+class RetryPolicy:
+    """
+    Retry policy with jittered exponential backoff for REST requests.
+
+    Idempotent reads (``quotes``, ``history``, ``funds``, ...) are retried
+    automatically. Any other endpoint, such as order placement, is retried
+    only when the payload carries an idempotency key, e.g.
+    ``client.placeorder(..., idempotency_key="strategy-42-entry")``, so the
+    server can recognise a duplicate submission.
+
+    Example:
+        client = api(api_key="...", retry_policy=RetryPolicy(max_attempts=4))
+    """
+
+    def __init__(self, max_attempts: int = 3, backoff_base: float = 0.25, backoff_max: float = 8.0,
+                 retry_statuses: Iterable[int] = (429, 502, 503, 504),
+                 idempotent_endpoints: Optional[Iterable[str]] = None,
+                 idempotency_key: str = 'idempotency_key'):
+        """
+        Args:
+            max_attempts (int): Total attempts including the first request. Defaults to 3.
+            backoff_base (float): Base delay in seconds, doubled on each retry. Defaults to 0.25.
+            backoff_max (float): Upper bound for a single delay in seconds. Defaults to 8.0.
+            retry_statuses (iterable): HTTP status codes that trigger a retry.
+            idempotent_endpoints (iterable, optional): Endpoints retried without an
+                idempotency key. Defaults to IDEMPOTENT_ENDPOINTS.
+            idempotency_key (str): Payload field that marks a write as safe to retry.
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.idempotent_endpoints = frozenset(idempotent_endpoints) if idempotent_endpoints is not None \
+            else IDEMPOTENT_ENDPOINTS
+        self.idempotency_key = idempotency_key
+
+    def attempts_for(self, endpoint: str, payload: Optional[Dict]) -> int:
+        """Number of attempts allowed for a request to ``endpoint``."""
+        if endpoint in self.idempotent_endpoints:
+            return self.max_attempts
+        if payload and payload.get(self.idempotency_key):
+            return self.max_attempts
+        return 1
+
+    def should_retry_exception(self, error: Exception) -> bool:
+        """Transport failures (timeouts, refused/reset connections) are retryable."""
+        return isinstance(error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+
+    def should_retry_response(self, response: httpx.Response) -> bool:
+        return response.status_code in self.retry_statuses
+
+    def backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """
+        Delay before retry number ``attempt`` (0-based), using full jitter.
+        A ``Retry-After`` header on the response takes precedence.
+        """
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return min(self.backoff_max, max(0.0, float(retry_after)))
+                except ValueError:
+                    pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for the layr0_imc host.
+
+    After ``failure_threshold`` consecutive failures (transport errors or 5xx
+    responses) the circuit opens and requests fail fast with
+    ``error_type='circuit_open_error'`` instead of waiting on the request
+    timeout. After ``recovery_timeout`` seconds a single probe request is let
+    through; success closes the circuit, failure keeps it open.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures before opening. Defaults to 5.
+            recovery_timeout (float): Seconds to stay open before probing. Defaults to 30.0.
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # Half-open: let exactly one probe through
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def record(self, error: Optional[Exception] = None, response: Optional[httpx.Response] = None) -> None:
+        """Record the outcome of a request: a transport error or a response."""
+        if error is not None:
+            if isinstance(error, httpx.TransportError):
+                self.record_failure()
+            else:
+                # Not a server failure; just free the half-open probe slot
+                with self._lock:
+                    self._probe_in_flight = False
+            return
+        if response is not None and response.status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def rejection(self, base_url: str) -> Dict[str, str]:
+        """Build the error response returned while the circuit is open."""
+        remaining = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+        return {
+            'status': 'error',
+            'message': f'Circuit breaker open for {base_url}: server unavailable, '
+                       f'next attempt allowed in {remaining:.1f}s.',
+            'error_type': 'circuit_open_error'
+        }
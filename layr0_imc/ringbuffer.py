@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Tick Ring Buffers
+    https://docs.layr0.org
+
+Fixed-capacity history of the last N ticks (price, quantity, timestamp) per
+instrument in contiguous NumPy arrays. Every tick is written twice, at
+``i`` and ``i + capacity``, so the most recent ``n`` ticks always form one
+contiguous slice and ``window()`` can return them oldest-first without
+copying.
+
+Example:
+    client.enable_tick_buffers(capacity=2000)
+    client.subscribe_ltp([{"exchange": "NSE", "symbol": "SBIN"}])
+    ...
+    w = client.window("NSE:SBIN", 200)
+    rsi = ta.rsi(w.price, 14)
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class TickWindow(NamedTuple):
+    """Oldest-first arrays for the ticks in a window."""
+    price: np.ndarray
+    quantity: np.ndarray
+    timestamp: np.ndarray
+
+
+class TickRingBuffer:
+    """
+    Ring buffer of the last ``capacity`` ticks for one instrument.
+
+    Views returned by ``window(n)`` stay valid for ``capacity - n`` further
+    ticks; after that the oldest values in the view are overwritten. Pass
+    ``copy=True`` when the window must outlive that.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Args:
+            capacity (int): Number of ticks retained. Defaults to 1000.
+        """
+        self.capacity = max(1, int(capacity))
+        self.price = np.zeros(2 * self.capacity, dtype=np.float64)
+        self.quantity = np.zeros(2 * self.capacity, dtype=np.int64)
+        self.timestamp = np.zeros(2 * self.capacity, dtype=np.int64)
+        self.count = 0  # Ticks appended since creation
+        self._pos = 0   # Next write position in [0, capacity)
+
+    def append(self, price: float, quantity: int, timestamp: int) -> None:
+        pos = self._pos
+        mirror = pos + self.capacity
+        self.price[pos] = self.price[mirror] = price
+        self.quantity[pos] = self.quantity[mirror] = quantity
+        self.timestamp[pos] = self.timestamp[mirror] = timestamp
+        self._pos = pos + 1 if pos + 1 < self.capacity else 0
+        self.count += 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def window(self, n: Optional[int] = None, copy: bool = False) -> TickWindow:
+        """
+        Return the last ``n`` ticks (all retained ticks if None), oldest first.
+
+        Args:
+            n (int, optional): Number of ticks. Clamped to the ticks available.
+            copy (bool): Return copies instead of views into the buffer. Defaults to False.
+        """
+        size = len(self)
+        n = size if n is None else max(0, min(int(n), size))
+        end = self._pos + self.capacity
+        window = slice(end - n, end)
+        if copy:
+            return TickWindow(self.price[window].copy(), self.quantity[window].copy(),
+                              self.timestamp[window].copy())
+        return TickWindow(self.price[window], self.quantity[window], self.timestamp[window])
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Offline Symbol Search
+    https://docs.layr0.org
+
+In-process symbol search over the local instrument master (see
+``InstrumentStore``), for symbol pickers and order-entry validation that
+cannot afford a server round-trip per keystroke.
+
+Matches are found in tiers, best first, and each tier only runs while fewer
+than ``limit`` results have been found:
+
+    1. exact symbol
+    2. symbol prefix          (bisect over sorted symbols, filtered and ranked
+                               over the whole prefix range)
+    3. name prefix            (bisect over sorted names, likewise)
+    4. symbol substring       (trigram posting list, filtered, verified)
+    5. fuzzy                  (shared trigrams, tolerates typos; only when
+                               nothing else matched)
+
+Within a tier, equities and indices rank before futures, futures before
+options, then nearer expiry, shorter symbol and alphabetical order.
+
+Example:
+    store = client.instrument_store()
+    store.search("reliance", exchange="NSE")
+    store.search("NIFTY", instrumenttype=("CE", "PE"), limit=50)
+"""
+
+import bisect
+import heapq
+from array import array
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .instruments import COLUMNS, expiry_key
+
+_SYMBOL = COLUMNS.index('symbol')
+_NAME = COLUMNS.index('name')
+_EXCHANGE = COLUMNS.index('exchange')
+_EXPIRY = COLUMNS.index('expiry')
+_TYPE = COLUMNS.index('instrumenttype')
+
+# Candidates the substring and fuzzy tiers rank at most (after filtering); bounds work for common trigrams
+MAX_PREFIX_CANDIDATES = 1000
+# Posting lists longer than this are skipped by the fuzzy tier (too common to discriminate)
+MAX_FUZZY_POSTING = 2000
+
+_TYPE_RANK = {'EQ': 0, 'INDEX': 0, 'FUT': 1}
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _as_filter(value: Union[None, str, Iterable[str]]) -> Optional[frozenset]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return frozenset((value,))
+    return frozenset(value)
+
+
+class SymbolIndex:
+    """Prefix, trigram and fuzzy search over instrument rows (tuples in COLUMNS order)."""
+
+    def __init__(self, rows: Sequence[Tuple]):
+        """
+        Args:
+            rows (sequence): Instrument tuples in ``instruments.COLUMNS`` order.
+        """
+        self.rows = rows
+        symbols = [(row[_SYMBOL] or '').upper() for row in rows]
+        self._symbols = symbols
+        # Position of each row in global rank order, so ranking compares plain ints
+        order = sorted(range(len(rows)), key=lambda i: (_TYPE_RANK.get(rows[i][_TYPE], 2),
+                                                       expiry_key(rows[i][_EXPIRY]), len(symbols[i]), symbols[i]))
+        self._rank = [0] * len(rows)
+        for position, i in enumerate(order):
+            self._rank[i] = position
+
+        self._exact: Dict[str, List[int]] = {}
+        for i, symbol in enumerate(symbols):
+            self._exact.setdefault(symbol, []).append(i)
+
+        # Exchange and instrument type as small ints, so prefix ranges are filtered with array masks
+        self._exchange_codes: Dict[Any, int] = {}
+        self._type_codes: Dict[Any, int] = {}
+        exchange_of = np.array([self._exchange_codes.setdefault(row[_EXCHANGE], len(self._exchange_codes))
+                                for row in rows], dtype=np.int32)
+        type_of = np.array([self._type_codes.setdefault(row[_TYPE], len(self._type_codes)) for row in rows],
+                           dtype=np.int32)
+        rank_of = np.array(self._rank, dtype=np.int64)
+
+        def sorted_keys(keyed: List[Tuple[str, int]]) -> Tuple[List[str], Tuple[np.ndarray, ...]]:
+            keyed.sort()
+            order = np.array([i for _, i in keyed], dtype=np.int64)
+            return [key for key, _ in keyed], (order, rank_of[order], exchange_of[order], type_of[order])
+
+        self._symbol_keys, self._symbol_arrays = sorted_keys(
+            [(symbol, i) for i, symbol in enumerate(symbols) if symbol])
+        self._name_keys, self._name_arrays = sorted_keys(
+            [((row[_NAME] or '').upper(), i) for i, row in enumerate(rows) if row[_NAME]])
+
+        grams: Dict[str, array] = {}
+        for i, symbol in enumerate(symbols):
+            for gram in _trigrams(symbol):
+                posting = grams.get(gram)
+                if posting is None:
+                    posting = grams[gram] = array('I')
+                posting.append(i)
+        self._grams = grams
+
+    @staticmethod
+    def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+        lo = bisect.bisect_left(keys, prefix)
+        return lo, bisect.bisect_left(keys, prefix + '\uffff', lo)
+
+    @staticmethod
+    def _codes(codes: Dict[Any, int], allowed: Optional[frozenset]) -> Optional[np.ndarray]:
+        if allowed is None:
+            return None
+        return np.array([codes[value] for value in allowed if value in codes], dtype=np.int32)
+
+    @staticmethod
+    def _best_in_range(arrays: Tuple[np.ndarray, ...], lo: int, hi: int, exchanges: Optional[np.ndarray],
+                       types: Optional[np.ndarray], count: int) -> List[int]:
+        """The ``count`` best-ranked rows of sorted positions [lo, hi) passing the filters, best first."""
+        order, ranks, exchange_of, type_of = (array_[lo:hi] for array_ in arrays)
+        keep = None
+        if exchanges is not None:
+            keep = np.isin(exchange_of, exchanges)
+        if types is not None:
+            keep = np.isin(type_of, types) if keep is None else keep & np.isin(type_of, types)
+        if keep is not None:
+            order, ranks = order[keep], ranks[keep]
+        if len(ranks) > count:
+            best = np.argpartition(ranks, count)[:count]
+            order, ranks = order[best], ranks[best]
+        return order[np.argsort(ranks, kind='stable')].tolist()
+
+    def search(self, query: str, exchange: Union[None, str, Iterable[str]] = None,
+               instrumenttype: Union[None, str, Iterable[str]] = None, limit: int = 20) -> List[int]:
+        """
+        Row numbers of the best matches, best first.
+
+        Args:
+            query (str): Symbol, symbol prefix, name prefix or approximate symbol (case-insensitive).
+            exchange (str or iterable, optional): Exchange(s) to include.
+            instrumenttype (str or iterable, optional): Instrument type(s) to include, e.g. ('CE', 'PE').
+            limit (int): Maximum results. Defaults to 20.
+        """
+        text = (query or '').strip().upper()
+        if not text or limit <= 0:
+            return []
+        compact = text.replace(' ', '')
+        exchanges = _as_filter(exchange)
+        types = _as_filter(instrumenttype)
+        rows, rank = self.rows, self._rank
+        found: List[int] = []
+        seen = set()
+
+        def accept(candidates: Iterable[int], ranked: bool = False) -> None:
+            matches = []
+            for i in candidates:
+                if i in seen:
+                    continue
+                row = rows[i]
+                if exchanges is not None and row[_EXCHANGE] not in exchanges:
+                    continue
+                if types is not None and row[_TYPE] not in types:
+                    continue
+                seen.add(i)
+                matches.append(i)
+            wanted = limit - len(found)
+            if not ranked:
+                matches = heapq.nsmallest(wanted, matches, key=rank.__getitem__)
+            found.extend(matches[:wanted])
+
+        exchange_codes = self._codes(self._exchange_codes, exchanges)
+        type_codes = self._codes(self._type_codes, types)
+        accept(self._exact.get(compact, ()))
+        for keys, arrays, prefix in ((self._symbol_keys, self._symbol_arrays, compact),
+                                     (self._name_keys, self._name_arrays, text)):
+            if len(found) >= limit:
+                break
+            lo, hi = self._prefix_range(keys, prefix)
+            if hi > lo:
+                # Rows already found may be among the best; ask for enough to still fill the limit
+                count = limit - len(found) + len(seen)
+                accept(self._best_in_range(arrays, lo, hi, exchange_codes, type_codes, count), ranked=True)
+        if len(found) < limit and len(compact) >= 3:
+            grams = _trigrams(compact)
+            postings = [self._grams.get(gram) for gram in grams]
+            if all(postings):
+                symbols = self._symbols
+                shortest = min(postings, key=len)
+                accept(islice((i for i in shortest if (exchanges is None or rows[i][_EXCHANGE] in exchanges)
+                               and (types is None or rows[i][_TYPE] in types) and compact in symbols[i]),
+                              MAX_PREFIX_CANDIDATES))
+            if not found:
+                self._fuzzy(grams, accept)
+        return found
+
+    def _fuzzy(self, grams: set, accept) -> None:
+        counts: Dict[int, int] = {}
+        for gram in grams:
+            posting = self._grams.get(gram)
+            if posting is None or len(posting) > MAX_FUZZY_POSTING:
+                continue
+            for i in posting:
+                counts[i] = counts.get(i, 0) + 1
+        # A third of the query's trigrams must appear in the symbol (one transposition breaks up to three)
+        needed = max(1, len(grams) // 3)
+        ranked = sorted((i for i, count in counts.items() if count >= needed),
+                        key=lambda i: (-counts[i], self._rank[i]))
+        accept(ranked[:MAX_PREFIX_CANDIDATES], ranked=True)
+
+    def search_dicts(self, query: str, exchange: Union[None, str, Iterable[str]] = None,
+                     instrumenttype: Union[None, str, Iterable[str]] = None,
+                     limit: int = 20) -> List[Dict[str, Any]]:
+        """Like search(), returning instrument dicts."""
+        rows = self.rows
+        return [dict(zip(COLUMNS, rows[i])) for i in self.search(query, exchange, instrumenttype, limit)]
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Shared-Memory Market Data Bus
+    https://docs.layr0.org
+
+Lets one process own the WebSocket connection while any number of local
+strategy processes read its tick state without copying. The publishing feed
+keeps its LTP and Quote tick stores directly in ``multiprocessing.shared_memory``
+segments, so publishing costs nothing beyond the normal in-place update.
+
+Segment layout (one segment per mode, named '<name>_ltp' / '<name>_quote'):
+
+    header      magic, capacity, rows in use, key-table version, global seq
+    rows        capacity x TICK_DTYPE (per-row seq and seqlock version)
+    keys        capacity x 64-byte 'EXCHANGE:SYMBOL' names
+
+The header ``seq`` increases with every tick, so readers can cheaply poll for
+changes; each row's ``version`` lets them read a row consistently.
+
+Example:
+    # Process 1: the only process connected to the server
+    client.connect()
+    client.publish_shared_memory("layr0_feed")
+    client.subscribe_quote(instruments)
+
+    # Processes 2..N
+    reader = SharedTickReader("layr0_feed", mode="quote")
+    print(reader.get("NSE:SBIN"))
+"""
+
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .tickstore import TICK_DTYPE, TickStore, seqlock_read
+
+MAGIC = 0x4C3049544943  # 'L0ITIC'
+KEY_SIZE = 64
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'u8'),
+    ('capacity', 'u8'),
+    ('rows', 'u8'),
+    ('keys_version', 'u8'),
+    ('seq', 'u8'),
+])
+
+SEGMENT_SUFFIXES = {1: 'ltp', 2: 'quote'}
+
+
+def segment_name(name: str, mode: Any) -> str:
+    """Shared-memory segment name for a bus ``name`` and mode (1/'ltp' or 2/'quote')."""
+    suffix = SEGMENT_SUFFIXES.get(mode, mode)
+    if suffix not in SEGMENT_SUFFIXES.values():
+        raise ValueError(f"Shared memory supports the 'ltp' and 'quote' modes, not {mode!r}")
+    return f"{name}_{suffix}"
+
+
+# Segments closed while views of them were still alive; unmapped once the views are gone
+_retired: List[shared_memory.SharedMemory] = []
+
+
+def _layout(buffer, capacity: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # frombuffer holds a buffer export, so the segment cannot be unmapped under a live view
+    header = np.frombuffer(buffer, dtype=HEADER_DTYPE, count=1).reshape(())
+    if capacity is None:
+        capacity = int(header['capacity'])
+    offset = HEADER_DTYPE.itemsize
+    rows = np.frombuffer(buffer, dtype=TICK_DTYPE, count=capacity, offset=offset)
+    offset += capacity * TICK_DTYPE.itemsize
+    keys = np.frombuffer(buffer, dtype=f'S{KEY_SIZE}', count=capacity, offset=offset)
+    return header, rows, keys
+
+
+def _release(shm: Optional[shared_memory.SharedMemory] = None) -> None:
+    """Unmap ``shm`` and any earlier retired segment that no NumPy view references any more."""
+    if shm is not None:
+        _retired.append(shm)
+    for segment in list(_retired):
+        try:
+            segment.close()
+        except BufferError:
+            continue  # still viewed; retried on the next release
+        _retired.remove(segment)
+
+
+def _segment_size(capacity: int) -> int:
+    return HEADER_DTYPE.itemsize + capacity * (TICK_DTYPE.itemsize + KEY_SIZE)
+
+
+class SharedTickStore(TickStore):
+    """
+    TickStore whose rows live in a shared-memory segment readable by SharedTickReader.
+
+    The capacity is fixed: new instruments beyond it are rejected with
+    MemoryError, since a shared segment cannot grow in place.
+    """
+
+    def __init__(self, name: str, capacity: int = 4096):
+        """
+        Args:
+            name (str): Segment name; readers attach with the same name.
+            capacity (int): Maximum instruments. Defaults to 4096.
+        """
+        capacity = max(1, int(capacity))
+        self.name = name
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=_segment_size(capacity))
+        self.header, rows, self.key_table = _layout(self.shm.buf, capacity)
+        rows[:] = 0
+        self.key_table[:] = b''
+        self.header['capacity'] = capacity
+        self.header['rows'] = 0
+        self.header['keys_version'] = 0
+        self.header['seq'] = 0
+        self.header['magic'] = MAGIC
+        super().__init__(data=rows)
+
+    def _grow(self) -> None:
+        raise MemoryError(f"Shared tick store '{self.name}' is full ({len(self.data)} instruments)")
+
+    def row_for(self, key: str) -> int:
+        if key in self.index:
+            return self.index[key]
+        encoded = key.encode()
+        if len(encoded) > KEY_SIZE:
+            raise ValueError(f"Instrument key too long for shared memory: {key}")
+        row = super().row_for(key)
+        self.key_table[row] = encoded
+        self.header['rows'] = len(self.keys_by_row)
+        self.header['keys_version'] += 1
+        return row
+
+    def update_ltp(self, key: str, ltp: float, timestamp: int) -> int:
+        row = super().update_ltp(key, ltp, timestamp)
+        self.header['seq'] += 1
+        return row
+
+    def update_quote(self, key: str, market_data: Dict[str, Any], timestamp: int) -> int:
+        row = super().update_quote(key, market_data, timestamp)
+        self.header['seq'] += 1
+        return row
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        row = super().pop(key, default)
+        if row is not default:
+            self.key_table[row] = b''
+            self.header['keys_version'] += 1
+        return row
+
+    def close(self, unlink: bool = True) -> None:
+        """
+        Release the segment; ``unlink`` removes its name for every process.
+
+        The mapping itself stays valid while this store or any view taken from it
+        (``column()``, ``snapshot()``, row views) is still referenced, so readers
+        racing with close() never touch unmapped memory.
+        """
+        if unlink:
+            self.shm.unlink()
+        _release(self.shm)
+
+
+class SharedTickReader:
+    """
+    Read-only, zero-copy view of a tick store published by another process.
+
+    ``snapshot()`` and ``column()`` return views straight over shared memory;
+    ``get()`` reads one instrument consistently using the row's seqlock.
+    """
+
+    def __init__(self, name: str, mode: Any = 'ltp'):
+        """
+        Args:
+            name (str): Bus name given to FeedAPI.publish_shared_memory(), or a full
+                segment name when ``mode`` is None.
+            mode: 1/'ltp' or 2/'quote'. Defaults to 'ltp'.
+        """
+        self.name = segment_name(name, mode) if mode is not None else name
+        self.shm = self._attach(self.name)
+        self.header, self.data, self.key_table = _layout(self.shm.buf)
+        if int(self.header['magic']) != MAGIC:
+            self.header = self.data = self.key_table = None
+            self.shm.close()
+            raise ValueError(f"Shared memory segment '{self.name}' is not a layr0_imc tick store")
+        self._columns = {field: self.data[field] for field in TICK_DTYPE.names}
+        self.index: Dict[str, int] = {}
+        self._keys_version = -1
+
+    @staticmethod
+    def _attach(name: str) -> shared_memory.SharedMemory:
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 registers attached segments for cleanup at exit, which
+            # would unlink the publisher's segment; undo that registration
+            shm = shared_memory.SharedMemory(name=name)
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, 'shared_memory')
+            except Exception:
+                pass
+            return shm
+
+    @property
+    def seq(self) -> int:
+        """Ticks published so far; poll it to detect new data."""
+        return int(self.header['seq'])
+
+    def _refresh(self) -> None:
+        version = int(self.header['keys_version'])
+        if version != self._keys_version:
+            rows = int(self.header['rows'])
+            self.index = {key.decode(): row for row, key in enumerate(self.key_table[:rows].tolist()) if key}
+            self._keys_version = version
+
+    def keys(self) -> List[str]:
+        self._refresh()
+        return list(self.index)
+
+    def row(self, key: str) -> Optional[int]:
+        self._refresh()
+        return self.index.get(key)
+
+    def get(self, key: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Consistent copy of one instrument's row as a dict, or None if not published."""
+        fields = fields or TICK_DTYPE.names
+        encoded = key.encode()
+        for _ in range(2):
+            row = self.row(key)
+            if row is None:
+                return None
+            values = seqlock_read(self._columns, row, fields)
+            if values is None:
+                return None
+            # Rows are reused: make sure the row still belonged to this key when it was read
+            if self.key_table[row] == encoded:
+                return {field: value.item() for field, value in zip(fields, values)}
+        return None
+
+    def snapshot(self) -> np.ndarray:
+        """Zero-copy view of all published rows (see ``keys()`` for row order)."""
+        return self.data[:int(self.header['rows'])]
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one field across all published rows."""
+        return self._columns[name][:int(self.header['rows'])]
+
+    def close(self) -> None:
+        """Detach from the segment; views taken from this reader keep it mapped until dropped."""
+        self.header = self.data = self.key_table = self._columns = None
+        _release(self.shm)
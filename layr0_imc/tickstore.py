@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+layr0_imc Columnar Tick Store
+    https://docs.layr0.org
+
+Latest market data for every subscribed instrument kept in one preallocated
+NumPy structured array, one row per instrument. Ticks update their row in
+place, so the feed does not build a dict per tick, and snapshots are
+zero-copy views that can go straight into ``ta`` functions or pandas.
+
+Rows are also indexed per exchange, and every row carries a seqlock
+``version`` (odd while a tick is being written), so readers such as
+``get_ltp()`` resolve a filtered lookup in O(1) and never take the lock the
+tick writer holds.
+
+Example:
+    ltp = client.ltp_data.column('ltp')          # view, one value per row
+    row = client.ltp_data['NSE:SBIN']            # structured row view
+    print(row['ltp'], row['timestamp'], row['seq'])
+"""
+
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TICK_DTYPE = np.dtype([
+    ('ltp', 'f8'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'i8'),
+    ('oi', 'i8'),
+    ('last_trade_quantity', 'i8'),
+    ('avg_trade_price', 'f8'),
+    ('change', 'f8'),
+    ('change_percent', 'f8'),
+    ('timestamp', 'i8'),
+    ('seq', 'u8'),
+    ('version', 'u8'),
+])
+
+# Attempts a lock-free read makes before returning its last (possibly torn) values
+SEQLOCK_RETRIES = 100
+
+# Scalar type per field, used to validate tick values before a row is written
+_FIELD_TYPES = {name: TICK_DTYPE[name].type for name in TICK_DTYPE.names}
+
+# Fields copied from a quote (mode 2) market_data payload
+QUOTE_FIELDS = ('ltp', 'open', 'high', 'low', 'close', 'volume', 'oi', 'last_trade_quantity',
+                'avg_trade_price', 'change', 'change_percent')
+
+
+def seqlock_read(columns: Dict[str, np.ndarray], row: int, fields: Sequence[str]) -> Optional[List[Any]]:
+    """
+    Read ``fields`` of ``row`` from TICK_DTYPE columns, retrying while the row's
+    seqlock ``version`` shows a write in progress or changed during the read.
+    """
+    values = None
+    version = columns['version']
+    for _ in range(SEQLOCK_RETRIES):
+        before = version[row]
+        if before & 1:
+            time.sleep(0)  # let the writer finish
+            continue
+        values = [columns[name][row] for name in fields]
+        if version[row] == before:
+            break
+    return values
+
+
+class TickStore:
+    """
+    Preallocated structured array holding the latest tick per instrument.
+
+    Rows are addressed by 'EXCHANGE:SYMBOL' keys through a dict index and by
+    ``by_exchange[exchange][symbol]``. A row's ``seq`` counts the ticks applied
+    to it (0 means no tick yet); ``version`` is the row's seqlock counter. Rows
+    freed by ``pop`` are reused by the next new instrument.
+
+    The array doubles when full; views taken before that keep pointing at the
+    old buffer, so re-read ``snapshot()``/``column()`` after subscribing more
+    instruments. Callers are expected to hold the feed lock while updating.
+    """
+
+    def __init__(self, capacity: int = 1024, data: Optional[np.ndarray] = None):
+        """
+        Args:
+            capacity (int): Rows preallocated up front. Defaults to 1024.
+            data (np.ndarray, optional): Existing zeroed TICK_DTYPE array to use as
+                storage (e.g. over shared memory); ``capacity`` is ignored.
+        """
+        self.data = data if data is not None else np.zeros(max(1, int(capacity)), dtype=TICK_DTYPE)
+        self.index: Dict[str, int] = {}
+        self.by_exchange: Dict[str, Dict[str, int]] = {}
+        self.keys_by_row: List[Optional[Tuple[str, str]]] = []
+        self._free: List[int] = []
+        self._bind_columns()
+
+    def _bind_columns(self) -> None:
+        # Cached column views avoid building a field view on every tick
+        self._columns = {name: self.data[name] for name in TICK_DTYPE.names}
+
+    def _grow(self) -> None:
+        data = np.zeros(len(self.data) * 2, dtype=TICK_DTYPE)
+        data[:len(self.data)] = self.data
+        self.data = data
+        self._bind_columns()
+
+    def row_for(self, key: str) -> int:
+        """Return the row for ``key``, allocating one if the instrument is new."""
+        row = self.index.get(key)
+        if row is not None:
+            return row
+        exchange, _, symbol = key.partition(':')
+        if self._free:
+            row = self._free.pop()
+            self.keys_by_row[row] = (exchange, symbol)
+        else:
+            row = len(self.keys_by_row)
+            if row >= len(self.data):
+                self._grow()
+            self.keys_by_row.append((exchange, symbol))
+        self.index[key] = row
+        symbols = self.by_exchange.get(exchange)
+        if symbols is None:
+            symbols = self.by_exchange[exchange] = {}
+        symbols[symbol] = row
+        return row
+
+    def update_ltp(self, key: str, ltp: float, timestamp: int) -> int:
+        """
+        Apply an LTP tick in place and return its row.
+
+        Values are converted before the row's seqlock is opened, so a malformed
+        tick raises ValueError/TypeError without touching the row.
+        """
+        ltp = _FIELD_TYPES['ltp'](ltp)
+        timestamp = _FIELD_TYPES['timestamp'](timestamp)
+        row = self.row_for(key)
+        columns = self._columns
+        version = columns['version']
+        version[row] += 1  # odd: write in progress
+        columns['ltp'][row] = ltp
+        columns['timestamp'][row] = timestamp
+        columns['seq'][row] += 1
+        version[row] += 1
+        return row
+
+    def update_quote(self, key: str, market_data: Dict[str, Any], timestamp: int) -> int:
+        """
+        Apply a quote tick in place and return its row. Missing fields are left unchanged.
+
+        As with update_ltp(), every value is converted before the seqlock is opened.
+        """
+        values = [(name, _FIELD_TYPES[name](value)) for name in QUOTE_FIELDS
+                  for value in (market_data.get(name),) if value is not None]
+        timestamp = _FIELD_TYPES['timestamp'](timestamp)
+        row = self.row_for(key)
+        columns = self._columns
+        version = columns['version']
+        version[row] += 1  # odd: write in progress
+        for name, value in values:
+            columns[name][row] = value
+        columns['timestamp'][row] = timestamp
+        columns['seq'][row] += 1
+        version[row] += 1
+        return row
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Remove an instrument and free its row. Returns its row number, or ``default``."""
+        row = self.index.pop(key, None)
+        if row is None:
+            return default
+        exchange, symbol = self.keys_by_row[row]
+        symbols = self.by_exchange.get(exchange)
+        if symbols is not None:
+            symbols.pop(symbol, None)
+            if not symbols:
+                del self.by_exchange[exchange]
+        # Keep the seqlock counter moving so in-flight readers notice the reset
+        version = self.data['version'][row]
+        self.data[row] = 0
+        self.data['version'][row] = version + 2
+        self.keys_by_row[row] = None
+        self._free.append(row)
+        return row
+
+    def select(self, exchange: Optional[str] = None,
+               symbol: Optional[str] = None) -> Iterator[Tuple[str, str, int]]:
+        """
+        Yield ``(exchange, symbol, row)`` for the instruments matching the filters.
+
+        An exchange plus symbol is a single dict lookup and an exchange alone only
+        visits that exchange's instruments. Safe to call without the writer's lock.
+        """
+        by_exchange = self.by_exchange
+        for ex in ([exchange] if exchange else list(by_exchange)):
+            symbols = by_exchange.get(ex)
+            if not symbols:
+                continue
+            if symbol:
+                row = symbols.get(symbol)
+                if row is not None:
+                    yield ex, symbol, row
+            else:
+                # list() copies atomically, so a concurrent insert cannot break iteration
+                for sym, row in list(symbols.items()):
+                    yield ex, sym, row
+
+    def read(self, row: int, fields: Sequence[str],
+             key: Optional[Tuple[str, str]] = None) -> Optional[List[Any]]:
+        """
+        Read ``fields`` of a row without taking a lock (seqlock read).
+
+        Retries while a tick is being written to the row. Returns None when the
+        row was freed or reassigned to an instrument other than ``key``.
+        """
+        values = seqlock_read(self._columns, row, fields)
+        if key is not None and self.keys_by_row[row] != key:
+            return None
+        return values
+
+    def __getitem__(self, key: str) -> np.void:
+        """Structured row view for ``key`` (raises KeyError for unknown instruments)."""
+        return self.data[self.index[key]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self.index.get(key)
+        return default if row is None else self.data[row]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def items(self) -> Iterator[Tuple[Tuple[str, str], np.void]]:
+        """Iterate ``((exchange, symbol), row_view)`` for every stored instrument."""
+        data = self.data
+        for row, key in enumerate(self.keys_by_row):
+            if key is not None:
+                yield key, data[row]
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Zero-copy view of all allocated rows. Rows whose ``seq`` is 0 are free
+        or not ticked yet; ``keys_by_row[i]`` gives (exchange, symbol) for row i.
+        """
+        return self.data[:len(self.keys_by_row)]
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one field across all allocated rows, e.g. ``column('ltp')``."""
+        return self._columns[name][:len(self.keys_by_row)]
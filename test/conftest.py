@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures: REST clients wired to an in-process httpx.MockTransport.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from layr0_imc import api
+
+
+@pytest.fixture
+def make_client():
+    """
+    Factory for ``api`` clients served by ``handler(request) -> httpx.Response``.
+
+    Extra keyword arguments go to ``api()``. Clients are closed at teardown.
+    """
+    clients = []
+
+    def factory(handler, **kwargs):
+        client = api(api_key="test-key", host="http://testserver", **kwargs)
+        client.client = httpx.Client(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    yield factory
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def make_async_client():
+    """Factory for ``AsyncAPI`` clients served by ``handler``; use them with ``async with``."""
+    from layr0_imc.aio import AsyncAPI
+
+    clients = []
+
+    def factory(handler, **kwargs):
+        client = AsyncAPI(api_key="test-key", host="http://testserver", **kwargs)
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients.append(client)
+        return client
+
+    yield factory
+    for client in clients:
+        if not client.client.is_closed:
+            asyncio.run(client.close())
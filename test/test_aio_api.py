@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio REST client (layr0_imc.aio.AsyncAPI).
+"""
+
+import asyncio
+import json
+
+import httpx
+import pandas as pd
+import pytest
+from layr0_imc.aio import AsyncAPI
+
+
+def test_methods_are_coroutines_returning_dicts(make_async_client):
+    def handler(request):
+        return httpx.Response(200, json={"status": "success", "path": request.url.path})
+
+    async def run():
+        async with make_async_client(handler) as client:
+            return await asyncio.gather(
+                client.placeorder(symbol="RELIANCE", action="BUY", exchange="NSE"),
+                client.quotes(symbol="TCS", exchange="NSE"),
+                client.funds(),
+            )
+
+    results = asyncio.run(run())
+    assert [r["path"] for r in results] == ["/api/v1/placeorder", "/api/v1/quotes", "/api/v1/funds"]
+
+
+def test_history_returns_dataframe(make_async_client):
+    rows = [
+        {"timestamp": 1700000060, "open": 2, "high": 2, "low": 2, "close": 2, "volume": 20},
+        {"timestamp": 1700000000, "open": 1, "high": 1, "low": 1, "close": 1, "volume": 10},
+    ]
+
+    def handler(request):
+        return httpx.Response(200, json={"status": "success", "data": rows})
+
+    async def run():
+        async with make_async_client(handler) as client:
+            return await client.history(symbol="SBIN", exchange="NSE", interval="1m",
+                                        start_date="2024-01-01", end_date="2024-01-02")
+
+    df = asyncio.run(run())
+    assert isinstance(df, pd.DataFrame)
+    assert list(df["close"]) == [1, 2]
+    assert str(df.index.tz) == "Asia/Kolkata"
+
+
+def test_instruments_all_exchanges_combined(make_async_client):
+    def handler(request):
+        exchange = request.url.params["exchange"]
+        if exchange == "MCX":
+            return httpx.Response(500, text="down")
+        return httpx.Response(200, json={"status": "success", "data": [{"symbol": "X", "exchange": exchange}]})
+
+    async def run():
+        async with make_async_client(handler) as client:
+            return await client.instruments()
+
+    df = asyncio.run(run())
+    assert "MCX" not in set(df["exchange"])
+    assert len(df) == 8
+    assert set(df.attrs["errors"]) == {"MCX"}
+
+
+def test_history_uses_cache(tmp_path, make_async_client):
+    requests = []
+
+    def handler(request):
+        payload = json.loads(request.content)
+        requests.append((payload["start_date"], payload["end_date"]))
+        return httpx.Response(200, json={"status": "success", "data": [
+            {"timestamp": 1704081600, "open": 1, "high": 1, "low": 1, "close": 1, "volume": 10}]})
+
+    async def run():
+        async with make_async_client(handler) as client:
+            client.enable_history_cache(path=str(tmp_path))
+            first = await client.history(symbol="SBIN", exchange="NSE", interval="5m",
+                                         start_date="2024-01-01", end_date="2024-01-02")
+            second = await client.history(symbol="SBIN", exchange="NSE", interval="5m",
+                                          start_date="2024-01-01", end_date="2024-01-02")
+            return first, second, client.history_cache.stats()
+
+    first, second, stats = asyncio.run(run())
+    assert requests == [("2024-01-01", "2024-01-02")]
+    assert list(second["close"]) == list(first["close"]) == [1]
+    assert stats["hits"] == 1
+
+
+def test_long_history_fetched_in_chunks(make_async_client):
+    requests = []
+
+    def handler(request):
+        payload = json.loads(request.content)
+        requests.append((payload["start_date"], payload["end_date"]))
+        day = int(payload["start_date"][-2:])
+        return httpx.Response(200, json={"status": "success", "data": [
+            {"timestamp": 1704081600 + len(requests) * 86400, "open": day, "high": day, "low": day,
+             "close": day, "volume": 1}]})
+
+    async def run():
+        async with make_async_client(handler) as client:
+            return await client.history(symbol="SBIN", exchange="NSE", interval="1m", chunk_days=10,
+                                        start_date="2024-01-01", end_date="2024-01-25", max_workers=2)
+
+    df = asyncio.run(run())
+    assert sorted(requests) == [("2024-01-01", "2024-01-10"), ("2024-01-11", "2024-01-20"),
+                                ("2024-01-21", "2024-01-25")]
+    assert len(df) == 3 and df.index.is_monotonic_increasing
+
+
+def test_history_many_builds_panel(make_async_client):
+    def handler(request):
+        payload = json.loads(request.content)
+        if payload["symbol"] == "BAD":
+            return httpx.Response(200, json={"status": "error", "message": "unknown symbol"})
+        price = len(payload["symbol"])
+        return httpx.Response(200, json={"status": "success", "data": [
+            {"timestamp": 1704081600, "open": price, "high": price, "low": price, "close": price, "volume": 1}]})
+
+    progress = []
+
+    async def run():
+        async with make_async_client(handler) as client:
+            return await client.history_many(symbols=["SBIN", "INFY", "BAD"], exchange="NSE", interval="5m",
+                                             start_date="2024-01-01", end_date="2024-01-02",
+                                             on_progress=lambda done, total: progress.append((done, total)))
+
+    df = asyncio.run(run())
+    assert df.loc["SBIN"]["close"].tolist() == [4] and df.loc["INFY"]["close"].tolist() == [4]
+    assert set(df.attrs["errors"]) == {"BAD"}
+    assert progress[-1] == (3, 3)
+
+
+def test_instrument_store_and_local_search(tmp_path, make_async_client):
+    calls = []
+
+    def handler(request):
+        exchange = request.url.params["exchange"]
+        calls.append(exchange)
+        data = [{"symbol": "SBIN", "name": "STATE BANK", "exchange": "NSE", "token": "3045",
+                 "instrumenttype": "EQ"}] if exchange == "NSE" else []
+        return httpx.Response(200, json={"status": "success", "data": data})
+
+    async def run():
+        async with make_async_client(handler) as client:
+            store = await client.instrument_store(path=str(tmp_path / "master.sqlite"))
+            found = await client.search(query="sbin", local=True)
+            return store, found, store.refresh()
+
+    store, found, sync_refresh = asyncio.run(run())
+    assert store.lookup("SBIN", "NSE")["token"] == "3045"
+    assert found["status"] == "success" and found["data"][0]["symbol"] == "SBIN"
+    assert calls.count("NSE") == 1
+    assert sync_refresh["error_type"] == "validation_error"
+
+
+def test_sync_with_is_rejected():
+    client = AsyncAPI(api_key="test-key", host="http://testserver")
+    with pytest.raises(TypeError, match="async with"):
+        with client:
+            pass
+    asyncio.run(client.close())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio WebSocket feed (layr0_imc.aio.AsyncFeed).
+"""
+
+import asyncio
+import json
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+from layr0_imc.aio import AsyncFeed  # noqa: E402
+
+
+UNSUBSCRIBED = []
+
+
+async def fake_server(ws):
+    """Minimal layr0_imc WebSocket server: auth, batched (un)subscribe, two ticks per symbol."""
+    async for raw in ws:
+        msg = json.loads(raw)
+        if msg["action"] == "authenticate":
+            await ws.send(json.dumps({"type": "auth", "status": "success", "broker": "test"}))
+        elif msg["action"] == "subscribe":
+            subs = [dict(s, mode=msg["mode"], status="success") for s in msg["symbols"]]
+            await ws.send(json.dumps({"type": "subscribe", "status": "success", "subscriptions": subs}))
+            for price in (100.0, 101.0):
+                for s in msg["symbols"]:
+                    await ws.send(json.dumps({"type": "market_data", "mode": msg["mode"],
+                                              "exchange": s["exchange"], "symbol": s["symbol"],
+                                              "data": {"ltp": price, "timestamp": 1}}))
+        elif msg["action"] == "unsubscribe":
+            UNSUBSCRIBED.extend(f"{s['exchange']}:{s['symbol']}" for s in msg["symbols"])
+            subs = [dict(s, mode=msg["mode"], status="success") for s in msg["symbols"]]
+            await ws.send(json.dumps({"type": "unsubscribe", "status": "success", "subscriptions": subs}))
+
+
+def test_stream_ticks():
+    async def run():
+        async with websockets.serve(fake_server, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            async with AsyncFeed(api_key="k" * 16, ws_url=f"ws://127.0.0.1:{port}") as feed:
+                assert feed.authenticated
+                ticks = []
+                instruments = [{"exchange": "NSE", "symbol": "SBIN"}, {"exchange": "NSE", "symbol": "TCS"}]
+                async for tick in feed.stream(instruments, mode="ltp"):
+                    ticks.append(tick)
+                    if len(ticks) == 4:
+                        break
+                return ticks
+
+    ticks = asyncio.run(asyncio.wait_for(run(), 10))
+    assert [t["symbol"] for t in ticks] == ["SBIN", "TCS", "SBIN", "TCS"]
+    assert ticks[-1]["data"]["ltp"] == 101.0
+
+
+def test_subscribe_status_map():
+    async def run():
+        async with websockets.serve(fake_server, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            async with AsyncFeed(api_key="k" * 16, ws_url=f"ws://127.0.0.1:{port}") as feed:
+                return await feed.subscribe([{"exchange": "NFO", "symbol": f"S{i}"} for i in range(5)]
+                                            + [{"symbol": "X"}], mode="quote", batch_size=2)
+
+    statuses = asyncio.run(asyncio.wait_for(run(), 10))
+    assert statuses["NFO:S4"] == "success"
+    assert statuses["None:X"] == "invalid"
+
+
+def test_stream_ends_at_once_when_not_connected():
+    async def run():
+        feed = AsyncFeed(api_key="k" * 16, ws_url="ws://127.0.0.1:9")
+        return [tick async for tick in feed.stream([{"exchange": "NSE", "symbol": "SBIN"}])]
+
+    assert asyncio.run(asyncio.wait_for(run(), 5)) == []
+
+
+def test_stream_unsubscribes_its_instruments_on_exit():
+    async def run():
+        async with websockets.serve(fake_server, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            async with AsyncFeed(api_key="k" * 16, ws_url=f"ws://127.0.0.1:{port}") as feed:
+                outer = feed.stream([{"exchange": "NSE", "symbol": "SBIN"}])
+                await outer.__anext__()
+                inner = feed.stream([{"exchange": "NSE", "symbol": "SBIN"}, {"exchange": "NSE", "symbol": "TCS"}])
+                await inner.__anext__()
+                await inner.aclose()
+                # SBIN is still streamed by the outer iterator
+                assert UNSUBSCRIBED == ["NSE:TCS"]
+                await outer.aclose()
+                assert UNSUBSCRIBED == ["NSE:TCS", "NSE:SBIN"]
+
+    UNSUBSCRIBED.clear()
+    asyncio.run(asyncio.wait_for(run(), 10))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the real-time OHLCV BarAggregator.
+"""
+
+import json
+
+import pytest
+from layr0_imc import api, BarAggregator
+from layr0_imc.bars import interval_seconds
+
+
+def test_interval_parsing():
+    assert interval_seconds("1s") == 1
+    assert interval_seconds("5m") == 300
+    assert interval_seconds(90) == 90
+    with pytest.raises(ValueError):
+        interval_seconds("5x")
+
+
+def test_bars_close_on_next_interval():
+    closed = []
+    bars = BarAggregator(intervals=("1s", "1m"), capacity=3, on_bar=closed.append, rows=1)
+    for ts, price in [(0, 100), (400, 105), (900, 99), (1000, 101), (1500, 102), (2100, 103)]:
+        bars.update("NSE", "SBIN", price, ts, quantity=10)
+    bars.update("NSE", "TCS", 3500, 100, quantity=1)
+
+    assert [b["interval"] for b in closed] == ["1s", "1s"]
+    assert closed[0] == {"exchange": "NSE", "symbol": "SBIN", "interval": "1s", "timestamp": 0,
+                         "open": 100, "high": 105, "low": 99, "close": 99, "volume": 30}
+    assert bars.current("NSE:SBIN", "1m")["high"] == 105
+
+    arrays = bars.arrays("SBIN", "1s", exchange="NSE")
+    assert arrays["close"].tolist() == [99, 102]
+    df = bars.bars("NSE:SBIN", "1s")
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert df["volume"].tolist() == [30, 20]
+
+    bars.flush(now=60_000)
+    assert closed[-1]["interval"] == "1m" and bars.current("NSE:SBIN", "1m") is None
+
+
+def test_ring_keeps_latest_bars():
+    bars = BarAggregator(intervals=("1s",), capacity=3)
+    for second in range(6):
+        bars.update("NSE", "SBIN", 100 + second, second * 1000)
+    assert bars.arrays("NSE:SBIN", "1s")["open"].tolist() == [102, 103, 104]
+    assert bars.arrays("NSE:SBIN", "1s", n=1)["timestamp"].tolist() == [4000]
+
+
+def test_feed_quotes_drive_aggregator():
+    client = api(api_key="test-key")
+    bars = BarAggregator(intervals=("1m",))
+    client.add_bar_aggregator(bars)
+    for ts, volume in [(0, 1000), (30_000, 1250), (60_000, 1400)]:
+        client._process_message(json.dumps({"type": "market_data", "mode": 2, "exchange": "NSE", "symbol": "SBIN",
+                                            "data": {"ltp": 100.0, "volume": volume, "timestamp": ts}}))
+    assert bars.arrays("NSE:SBIN", "1m")["volume"].tolist() == [250]
+
+
+def test_bar_callback_errors_follow_feed_verbosity(capsys):
+    def failing(bar):
+        raise RuntimeError("boom")
+
+    for verbose, silent in ((False, True), (1, False)):
+        client = api(api_key="test-key", verbose=verbose)
+        bars = BarAggregator(intervals=("1s",), on_bar=failing)
+        client.add_bar_aggregator(bars)
+        for ts in (0, 1000):
+            client._process_message(json.dumps({"type": "market_data", "mode": 1, "exchange": "NSE",
+                                                "symbol": "SBIN", "data": {"ltp": 100.0, "timestamp": ts}}))
+        assert ("boom" not in capsys.readouterr().out) is silent
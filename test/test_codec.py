@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for the pluggable JSON codec.
+"""
+
+import pytest
+from layr0_imc import codec
+
+TICK = b'{"type":"market_data","symbol":"SBIN","exchange":"NSE","mode":3,' \
+       b'"data":{"ltp":769.6,"timestamp":1700000000000,' \
+       b'"depth":{"buy":[{"price":769.4,"quantity":886,"orders":3}],"sell":[]}}}'
+
+
+@pytest.mark.parametrize("name", codec.BACKENDS)
+def test_backends_round_trip(name):
+    try:
+        codec.set_backend(name)
+    except ImportError:
+        pytest.skip(f"{name} not installed")
+    try:
+        payload = {"apikey": "k", "symbol": "SBIN", "quantity": "1"}
+        assert codec.loads(codec.dumps(payload)) == payload
+        assert isinstance(codec.dumps(payload), str)
+        assert codec.loads(TICK)["data"]["ltp"] == 769.6
+        with pytest.raises(codec.DecodeError):
+            codec.loads("{not json")
+    finally:
+        codec.set_backend('auto')
+
+
+def test_typed_decode():
+    tick = codec.decode(TICK, codec.MarketData)
+    if codec.msgspec is None:
+        assert tick["data"]["depth"]["buy"][0]["quantity"] == 886
+    else:
+        assert tick.data.ltp == 769.6
+        assert tick.data.depth.buy[0].quantity == 886
+        assert tick.data.depth.sell == []
+
+
+def test_convert_rest_response():
+    response = {"status": "success", "data": {"ltp": 1187.75, "bid": 1187.85, "volume": 14414545}}
+    quote = codec.convert(response, codec.QuoteResponse)
+    if codec.msgspec is not None:
+        assert quote.data.bid == 1187.85
+        assert quote.data.ask == 0
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for the off-thread CallbackDispatcher.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from layr0_imc import api, CallbackDispatcher
+
+
+def tick(symbol, ltp):
+    return {"type": "market_data", "exchange": "NSE", "symbol": symbol, "mode": 1, "data": {"ltp": ltp}}
+
+
+def blocked_consumer():
+    """Callback that holds its worker until released, recording what it saw."""
+    release, started, seen = threading.Event(), threading.Event(), []
+
+    def callback(message):
+        started.set()
+        release.wait(5)
+        seen.append((message["symbol"], message["data"]["ltp"]))
+    return callback, release, started, seen
+
+
+def wait_delivered(dispatcher, count):
+    for _ in range(200):
+        if dispatcher.metrics()["delivered"] >= count:
+            return
+        threading.Event().wait(0.01)
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        CallbackDispatcher(policy="lifo")
+
+
+def test_drop_oldest_bounds_queue():
+    dispatcher = CallbackDispatcher(queue_size=2, policy="drop_oldest")
+    callback, release, started, seen = blocked_consumer()
+    dispatcher.submit(callback, tick("A", 1))
+    assert started.wait(2)
+    for ltp in (2, 3, 4, 5):
+        dispatcher.submit(callback, tick("A", ltp))
+    metrics = dispatcher.metrics()
+    assert metrics["queue_depth"] == 2 and metrics["dropped"] == 2
+    release.set()
+    wait_delivered(dispatcher, 3)
+    assert seen == [("A", 1), ("A", 4), ("A", 5)]
+    dispatcher.stop()
+
+
+def test_conflate_keeps_latest_per_symbol():
+    dispatcher = CallbackDispatcher(queue_size=10, policy="conflate")
+    callback, release, started, seen = blocked_consumer()
+    dispatcher.submit(callback, tick("A", 1))
+    assert started.wait(2)
+    for symbol, ltp in [("A", 2), ("B", 10), ("A", 3), ("B", 11)]:
+        dispatcher.submit(callback, tick(symbol, ltp))
+    assert dispatcher.metrics()["conflated"] == 2
+    release.set()
+    wait_delivered(dispatcher, 3)
+    assert seen == [("A", 1), ("A", 3), ("B", 11)]
+    dispatcher.stop()
+
+
+def test_asyncio_loop_delivery():
+    async def run():
+        received = []
+
+        async def callback(message):
+            received.append(message["data"]["ltp"])
+
+        dispatcher = CallbackDispatcher(loop=asyncio.get_running_loop())
+        producer = threading.Thread(target=lambda: [dispatcher.submit(callback, tick("A", i)) for i in range(5)])
+        producer.start()
+        producer.join()
+        for _ in range(100):
+            if len(received) == 5:
+                break
+            await asyncio.sleep(0.01)
+        dispatcher.stop()
+        return received
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+
+
+def test_feed_callbacks_run_off_socket_thread():
+    client = api(api_key="test-key")
+    dispatcher = client.set_dispatcher(CallbackDispatcher())
+    threads = []
+    client.ltp_callback = lambda message: threads.append(threading.current_thread())
+    client._process_message(json.dumps(tick("SBIN", 769.6)))
+    wait_delivered(dispatcher, 1)
+    assert threads and threads[0] is not threading.current_thread()
+    dispatcher.stop()
+
+
+def test_callback_errors_follow_feed_verbosity(capsys):
+    def failing(message):
+        raise RuntimeError("boom")
+
+    for verbose, silent in ((False, True), (1, False)):
+        client = api(api_key="test-key", verbose=verbose)
+        dispatcher = client.set_dispatcher(CallbackDispatcher())
+        client.ltp_callback = failing
+        client._process_message(json.dumps(tick("SBIN", 769.6)))
+        for _ in range(200):
+            if dispatcher.metrics()["errors"]:
+                break
+            threading.Event().wait(0.01)
+        dispatcher.stop()
+        assert dispatcher.metrics()["errors"] == 1
+        assert ("boom" not in capsys.readouterr().out) is silent
+
+    # A dispatcher with no logger only counts the error
+    dispatcher = CallbackDispatcher()
+    dispatcher.submit(failing, tick("SBIN", 769.6))
+    for _ in range(200):
+        if dispatcher.metrics()["errors"]:
+            break
+        threading.Event().wait(0.01)
+    dispatcher.stop()
+    assert dispatcher.metrics()["errors"] == 1 and capsys.readouterr().out == ""
+
+
+def test_conflator_merges_and_rate_limits():
+    from layr0_imc.dispatch import Conflator
+
+    delivered = []
+    conflator = Conflator(delivered.append, interval=0.05)
+    first = {"type": "market_data", "exchange": "NSE", "symbol": "SBIN", "mode": 2,
+             "data": {"ltp": 100.0, "volume": 10, "bid": 99.9}}
+    conflator(first)
+    conflator({"type": "market_data", "exchange": "NSE", "symbol": "SBIN", "mode": 2,
+               "data": {"ltp": 101.0, "volume": 12}})
+    conflator(tick("TCS", 3500.0))
+    for _ in range(100):
+        if len(delivered) == 2:
+            break
+        threading.Event().wait(0.01)
+    conflator.stop()
+
+    assert delivered[0]["data"] == {"ltp": 101.0, "volume": 12, "bid": 99.9}
+    assert delivered[1]["symbol"] == "TCS"
+    assert first["data"]["ltp"] == 100.0
+    assert conflator.metrics() == {"received": 3, "delivered": 2, "pending": 0}
+
+
+def test_conflator_errors_are_not_printed(capsys):
+    from layr0_imc.dispatch import Conflator
+
+    def failing(message):
+        raise RuntimeError("boom")
+
+    logged = []
+    for logger in (None, lambda level, category, message: logged.append(message)):
+        conflator = Conflator(failing, interval=0.05, logger=logger)
+        conflator(tick("SBIN", 769.6))
+        conflator.flush()
+        conflator.stop()
+    assert capsys.readouterr().out == ""
+    assert logged == ["Conflated callback error: boom"]
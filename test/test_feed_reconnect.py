@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for FeedAPI automatic reconnect and subscription replay.
+"""
+
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("websockets")
+from websockets.sync.server import serve  # noqa: E402
+
+from layr0_imc import api  # noqa: E402
+
+
+class DroppingServer:
+    """Acks auth/subscribe and drops the first connection right after subscribing."""
+
+    def __init__(self):
+        self.connections = 0
+        self.subscribed = []
+
+    def handler(self, ws):
+        self.connections += 1
+        connection = self.connections
+        for raw in ws:
+            msg = json.loads(raw)
+            if msg["action"] == "authenticate":
+                ws.send(json.dumps({"type": "auth", "status": "success", "broker": "test"}))
+            elif msg["action"] == "subscribe":
+                self.subscribed.append((connection, msg["mode"], msg["symbols"]))
+                subs = [dict(s, mode=msg["mode"], status="success") for s in msg["symbols"]]
+                ws.send(json.dumps({"type": "subscribe", "status": "success", "subscriptions": subs}))
+                if connection == 1:
+                    return
+
+
+def test_reconnect_replays_subscriptions_and_reports_gap():
+    server = DroppingServer()
+    with serve(server.handler, "127.0.0.1", 0, close_timeout=0.5) as ws_server:
+        threading.Thread(target=ws_server.serve_forever, daemon=True).start()
+        port = ws_server.socket.getsockname()[1]
+
+        client = api(api_key="test-key", ws_url=f"ws://127.0.0.1:{port}")
+        client.reconnect_delay = 0.05
+        gaps = []
+        recovered = threading.Event()
+        assert client.connect(on_gap=lambda gap: (gaps.append(gap), recovered.set()))
+        client.subscribe_quote([{"exchange": "NSE", "symbol": "SBIN"}, {"exchange": "NSE", "symbol": "TCS"}])
+
+        assert recovered.wait(5)
+        client.disconnect()
+        ws_server.shutdown()
+
+    assert server.connections == 2
+    connection, mode, symbols = server.subscribed[-1]
+    assert (connection, mode) == (2, 2)
+    assert {s["symbol"] for s in symbols} == {"SBIN", "TCS"}
+
+    gap = gaps[0]
+    assert gap["type"] == "gap"
+    assert gap["reconnected_at"] >= gap["disconnected_at"]
+    assert len(gap["subscriptions"][2]) == 2
+    assert client.last_gap is gap
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for batched WebSocket subscriptions in FeedAPI.
+"""
+
+import json
+import time
+
+from layr0_imc import api
+
+
+class FakeWebSocket:
+    """Records sent frames and acknowledges subscriptions like the server."""
+
+    def __init__(self, feed, reject=()):
+        self.feed = feed
+        self.reject = set(reject)
+        self.sent = []
+
+    def send(self, raw):
+        msg = json.loads(raw)
+        self.sent.append(msg)
+        symbols = msg.get("symbols") or [{"symbol": msg["symbol"], "exchange": msg["exchange"]}]
+        subs = [{"symbol": s["symbol"], "exchange": s["exchange"], "mode": msg["mode"],
+                 "status": "error" if s["symbol"] in self.reject else "success"} for s in symbols]
+        self.feed._process_message(json.dumps({"type": msg["action"], "status": "success",
+                                               "subscriptions": subs}))
+
+
+def connected_client(**kwargs):
+    client = api(api_key="test-key")
+    client.ws = FakeWebSocket(client, **kwargs)
+    client.connected = True
+    client.authenticated = True
+    return client
+
+
+def test_batched_subscribe_returns_status_map():
+    client = connected_client(reject={"BAD"})
+    instruments = [{"exchange": "NFO", "symbol": f"SYM{i}"} for i in range(250)]
+    instruments += [{"exchange": "NSE", "symbol": "BAD"}, {"exchange": "NSE"}]
+
+    statuses = client.subscribe(instruments, mode="quote", batch_size=100)
+
+    assert len(client.ws.sent) == 3
+    assert all(frame["mode"] == 2 for frame in client.ws.sent)
+    assert statuses["NFO:SYM0"] == "success"
+    assert statuses["NFO:SYM249"] == "success"
+    assert statuses["NSE:BAD"] == "error"
+    assert statuses["NSE:None"] == "invalid"
+    assert not client._pending_acks
+
+
+def test_legacy_methods_use_batches():
+    client = connected_client()
+    client.ltp_data.update_ltp("NSE:SBIN", 1.0, 1)
+    assert client.subscribe_ltp([{"exchange": "NSE", "symbol": "SBIN"}, {"exchange": "NSE", "symbol": "TCS"}])
+    assert len(client.ws.sent) == 1
+    assert client.unsubscribe_ltp([{"exchange": "NSE", "symbol": "SBIN"}])
+    assert client.ws.sent[-1]["action"] == "unsubscribe"
+    assert "NSE:SBIN" not in client.ltp_data
+
+
+def test_missing_acks_reported_pending():
+    client = connected_client()
+    client.ws.send = lambda raw: None
+    statuses = client.subscribe([{"exchange": "NSE", "symbol": "SBIN"}], timeout=0.05)
+    assert statuses == {"NSE:SBIN": "pending"}
+
+
+
+def test_legacy_methods_do_not_wait_for_acks():
+    client = connected_client()
+    client.ws.send = lambda raw: None
+    started = time.monotonic()
+    assert client.subscribe_quote([{"exchange": "NSE", "symbol": "SBIN"}])
+    assert client.unsubscribe_quote([{"exchange": "NSE", "symbol": "SBIN"}])
+    assert time.monotonic() - started < 1.0
+    assert not client._pending_acks
+
+
+def test_not_connected():
+    client = api(api_key="test-key")
+    assert client.subscribe_ltp([{"exchange": "NSE", "symbol": "SBIN"}]) is False
+
+
+def test_callbacks_are_routed_per_instrument():
+    client = connected_client()
+    received = {"a": [], "b": []}
+    client.subscribe([{"exchange": "NSE", "symbol": "SBIN"}], "ltp", received["a"].append)
+    client.subscribe([{"exchange": "NSE", "symbol": "SBIN"}, {"exchange": "NSE", "symbol": "TCS"}],
+                     "ltp", received["b"].append)
+
+    for symbol in ("SBIN", "TCS", "INFY"):
+        client._process_message(json.dumps({"type": "market_data", "mode": 1, "exchange": "NSE",
+                                            "symbol": symbol, "data": {"ltp": 1.0}}))
+    assert [m["symbol"] for m in received["a"]] == ["SBIN"]
+    assert [m["symbol"] for m in received["b"]] == ["SBIN", "TCS"]
+
+    # Detaching one listener keeps the server subscription for the other
+    statuses = client.unsubscribe([{"exchange": "NSE", "symbol": "SBIN"}], "ltp",
+                                  on_data_received=received["a"].append)
+    assert statuses == {"NSE:SBIN": "retained"}
+    assert client.ws.sent[-1]["action"] == "subscribe"
+    assert client._routes[("NSE", "SBIN", 1)] == (received["b"].append,)
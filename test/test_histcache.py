@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk history cache.
+"""
+
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+from layr0_imc.histcache import HistoryCache, missing_ranges
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def bars(start_date, end_date, close=100.0):
+    """Two 5-minute bars per weekday, timestamps in epoch seconds."""
+    day = date.fromisoformat(start_date)
+    rows = []
+    while day <= date.fromisoformat(end_date):
+        if day.weekday() < 5:
+            for minute in (0, 5):
+                ts = datetime(day.year, day.month, day.day, 9, 15 + minute, tzinfo=IST).timestamp()
+                rows.append({"timestamp": int(ts), "open": close, "high": close, "low": close,
+                             "close": close, "volume": 10})
+        day += timedelta(days=1)
+    return rows
+
+
+def history_handler(requests):
+    """Serve bars() for the requested range, recording each (start_date, end_date)."""
+    def handler(request):
+        payload = json.loads(request.content)
+        requests.append((payload["start_date"], payload["end_date"]))
+        return httpx.Response(200, json={"status": "success",
+                                         "data": bars(payload["start_date"], payload["end_date"])})
+    return handler
+
+
+def test_missing_ranges():
+    assert missing_ranges([], 1, 10) == [(1, 10)]
+    assert missing_ranges([(3, 4), (7, 8)], 1, 10) == [(1, 2), (5, 6), (9, 10)]
+    assert missing_ranges([(1, 10)], 2, 9) == []
+    assert missing_ranges([(1, 5)], 3, 8) == [(6, 8)]
+
+
+def test_history_fetches_only_missing_ranges(tmp_path, make_client):
+    requests = []
+    client = make_client(history_handler(requests))
+    client.enable_history_cache(path=str(tmp_path))
+    query = dict(symbol="SBIN", exchange="NSE", interval="5m")
+
+    first = client.history(start_date="2024-01-08", end_date="2024-01-12", **query)
+    assert len(first) == 10 and str(first.index.tz) == "Asia/Kolkata"
+    assert first.index[0].hour == 9 and first.index[0].minute == 15
+
+    again = client.history(start_date="2024-01-09", end_date="2024-01-10", **query)
+    assert len(again) == 4 and requests == [("2024-01-08", "2024-01-12")]
+
+    wider = client.history(start_date="2024-01-01", end_date="2024-01-19", **query)
+    assert len(wider) == 30
+    assert requests[1:] == [("2024-01-01", "2024-01-07"), ("2024-01-13", "2024-01-19")]
+    assert wider.index.is_monotonic_increasing and not wider.index.duplicated().any()
+
+    stats = client.history_cache.stats()
+    assert (stats["hits"], stats["partial_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["rows_fetched"] == 30 and stats["rows_served"] == 44
+
+    # Persisted: a new client reads the same files without downloading
+    fresh = make_client(history_handler([]))
+    fresh.enable_history_cache(path=str(tmp_path))
+    assert len(fresh.history(start_date="2024-01-01", end_date="2024-01-19", **query)) == 30
+    assert fresh.history_cache.stats()["hits"] == 1
+    assert client.history(cache=False, start_date="2024-01-08", end_date="2024-01-08", **query).shape[0] == 2
+
+
+def test_today_is_not_marked_cached_and_errors_pass_through(tmp_path):
+    cache = HistoryCache(str(tmp_path))
+    calls = []
+
+    def fetch(start, end):
+        calls.append((start, end))
+        return {"status": "success", "data": bars(start, end, close=100.0 + len(calls))}
+
+    today = date(2024, 1, 12)
+    result = cache.get("SBIN", "NSE", "5m", "2024-01-11", "2024-01-12", fetch, today=today)
+    assert len(result["timestamp"]) == 4
+    assert cache.coverage("SBIN", "NSE", "5m") == [("2024-01-11", "2024-01-11")]
+
+    # Today is fetched again and the newer bars replace the earlier ones
+    result = cache.get("SBIN", "NSE", "5m", "2024-01-11", "2024-01-12", fetch, today=today)
+    assert calls[-1] == ("2024-01-12", "2024-01-12")
+    assert list(result["close"]) == [101.0, 101.0, 102.0, 102.0]
+
+    error = cache.get("SBIN", "NSE", "5m", "2024-02-01", "2024-02-02",
+                      lambda s, e: {"status": "error", "message": "down", "error_type": "http_error"}, today=today)
+    assert error["error_type"] == "http_error"
+    assert cache.coverage("SBIN", "NSE", "5m") == [("2024-01-11", "2024-01-11")]
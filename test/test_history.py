@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for chunked and multi-symbol history downloads.
+"""
+
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+from layr0_imc.data import history_chunk_days
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def daily_bars(symbol, start_date, end_date):
+    """One 1-minute bar at 09:15 IST per calendar day, priced by symbol and day."""
+    day = date.fromisoformat(start_date)
+    rows = []
+    while day <= date.fromisoformat(end_date):
+        ts = int(datetime(day.year, day.month, day.day, 9, 15, tzinfo=IST).timestamp())
+        price = float(len(symbol) * 100 + day.day)
+        rows.append({"timestamp": ts, "open": price, "high": price, "low": price, "close": price, "volume": 1})
+        day += timedelta(days=1)
+    return rows
+
+
+def test_chunk_sizes_follow_interval():
+    assert history_chunk_days("D") is None
+    assert history_chunk_days("1m") == 53
+    assert history_chunk_days("1s") == 1
+    assert history_chunk_days("1h") > history_chunk_days("5m") > history_chunk_days("1m")
+
+
+def test_long_range_fetched_in_concurrent_chunks(make_client):
+    requests = []
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def handler(request):
+        payload = json.loads(request.content)
+        with lock:
+            requests.append((payload["start_date"], payload["end_date"]))
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return httpx.Response(200, json={"status": "success", "data": daily_bars(
+            payload["symbol"], payload["start_date"], payload["end_date"])})
+
+    progress = []
+    client = make_client(handler)
+    df = client.history(symbol="SBIN", exchange="NSE", interval="1m", start_date="2024-01-01",
+                        end_date="2024-03-31", chunk_days=10, max_workers=3,
+                        on_progress=lambda done, total: progress.append((done, total)))
+
+    assert len(requests) == 10 and in_flight[1] == 3
+    assert sorted(requests)[0] == ("2024-01-01", "2024-01-10") and sorted(requests)[-1] == ("2024-03-31", "2024-03-31")
+    assert progress == [(i, 10) for i in range(1, 11)]
+    assert len(df) == 91 and df.index.is_monotonic_increasing and str(df.index.tz) == "Asia/Kolkata"
+    assert df.index[0].date() == date(2024, 1, 1) and df.index[-1].date() == date(2024, 3, 31)
+
+    # Short ranges are still a single request with the original response handling
+    requests.clear()
+    short = client.history(symbol="SBIN", exchange="NSE", interval="1m",
+                           start_date="2024-01-01", end_date="2024-01-05")
+    assert requests == [("2024-01-01", "2024-01-05")] and len(short) == 5
+
+
+def test_failed_chunk_reports_its_range(make_client):
+    def handler(request):
+        payload = json.loads(request.content)
+        if payload["start_date"] == "2024-01-11":
+            return httpx.Response(500, text="down")
+        return httpx.Response(200, json={"status": "success", "data": daily_bars(
+            payload["symbol"], payload["start_date"], payload["end_date"])})
+
+    result = make_client(handler).history(symbol="SBIN", exchange="NSE", interval="1m",
+                                          start_date="2024-01-01", end_date="2024-01-30", chunk_days=10)
+    assert result["error_type"] == "http_error"
+    assert (result["start_date"], result["end_date"]) == ("2024-01-11", "2024-01-20")
+
+
+def history_many_handler(request):
+    payload = json.loads(request.content)
+    if payload["symbol"] == "BAD":
+        return httpx.Response(500, text="down")
+    rows = daily_bars(payload["symbol"], payload["start_date"], payload["end_date"])
+    if payload["symbol"] == "TCS":
+        rows = rows[1:]  # missing the first day
+    return httpx.Response(200, json={"status": "success", "data": rows[::-1]})
+
+
+def test_history_many_frame(make_client):
+    progress = []
+    client = make_client(history_many_handler)
+    df = client.history_many(symbols=["SBIN", {"symbol": "TCS", "exchange": "NSE"}, "BAD"], exchange="NSE",
+                             interval="5m", start_date="2024-01-01", end_date="2024-01-03",
+                             on_progress=lambda done, total: progress.append((done, total)))
+
+    assert df.index.names == ["symbol", "timestamp"]
+    assert list(df.loc["SBIN"]["close"]) == [401.0, 402.0, 403.0]
+    assert len(df.loc["TCS"]) == 2 and str(df.loc["TCS"].index.tz) == "Asia/Kolkata"
+    assert set(df.attrs["errors"]) == {"BAD"} and progress[-1] == (3, 3)
+
+    # The same symbol on two exchanges is labelled by exchange
+    both = client.history_many(symbols=[{"symbol": "SBIN", "exchange": "NSE"}, {"symbol": "SBIN", "exchange": "BSE"}],
+                               interval="5m", start_date="2024-01-01", end_date="2024-01-01")
+    assert list(both.index.get_level_values("symbol").unique()) == ["NSE:SBIN", "BSE:SBIN"]
+
+
+def test_history_many_arrays_are_aligned(make_client):
+    client = make_client(history_many_handler)
+    panel = client.history_many(symbols=["SBIN", "TCS"], exchange="NSE", interval="5m",
+                                start_date="2024-01-01", end_date="2024-01-03", output="arrays")
+
+    assert panel["symbols"] == ["SBIN", "TCS"] and len(panel["timestamp"]) == 3
+    close = panel["close"]
+    assert close.shape == (3, 2) and close.flags.f_contiguous
+    assert list(close[:, 0]) == [401.0, 402.0, 403.0]
+    assert close[0, 1] != close[0, 1] and list(close[1:, 1]) == [302.0, 303.0]
+
+    failed = client.history_many(symbols=["BAD"], exchange="NSE", interval="5m",
+                                 start_date="2024-01-01", end_date="2024-01-03")
+    assert failed["status"] == "error" and set(failed["errors"]) == {"BAD"}
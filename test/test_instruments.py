@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the local instrument master store.
+"""
+
+import time
+from datetime import datetime
+
+import httpx
+from layr0_imc import instruments
+from layr0_imc.instruments import IST, InstrumentStore, expiry_key, trading_date
+
+MASTER = {
+    "NSE": [
+        {"symbol": "SBIN", "brsymbol": "SBIN-EQ", "name": "SBIN", "exchange": "NSE", "token": "3045",
+         "expiry": "", "strike": -1.0, "lotsize": 1, "instrumenttype": "EQ", "tick_size": 0.05},
+    ],
+    "NFO": [
+        {"symbol": f"NIFTY{expiry.replace('-', '')}{strike}{kind}", "brsymbol": f"NIFTY {strike} {kind}",
+         "name": "NIFTY", "exchange": "NFO", "token": f"{i}{strike}{kind}", "expiry": expiry,
+         "strike": float(strike), "lotsize": 75, "instrumenttype": kind, "tick_size": 0.05}
+        for i, expiry in enumerate(["02-JAN-25", "26-DEC-24"])
+        for strike in (24000, 23500, 24500)
+        for kind in ("CE", "PE")
+    ],
+}
+
+
+def master_handler(calls, failing=()):
+    """Serve MASTER per exchange, recording each requested exchange; ``failing`` ones return 500."""
+    def handler(request):
+        exchange = request.url.params["exchange"]
+        calls.append(exchange)
+        if exchange in failing:
+            return httpx.Response(500, text="down")
+        return httpx.Response(200, json={"status": "success", "data": MASTER.get(exchange, [])})
+    return handler
+
+
+def test_lookups_and_contract_enumeration(tmp_path, make_client):
+    calls = []
+    store = make_client(master_handler(calls)).instrument_store(path=str(tmp_path / "master.sqlite"))
+
+    assert store.lookup("SBIN", "NSE")["token"] == "3045"
+    assert store.by_brsymbol("SBIN-EQ", "NSE")["symbol"] == "SBIN"
+    assert store.by_token(3045, "NSE")["brsymbol"] == "SBIN-EQ"
+    assert store.lookup("SBIN", "BSE") is None
+
+    calls_ = store.contracts("NIFTY", expiry="26DEC24", instrumenttype="CE", strike_min=23500, strike_max=24000)
+    assert [c["strike"] for c in calls_] == [23500.0, 24000.0]
+    assert store.expiries("NIFTY") == ["26-DEC-24", "02-JAN-25"]
+    assert store.strikes("NIFTY", "02-JAN-25", "PE") == [23500.0, 24000.0, 24500.0]
+    assert len(store.contracts("NIFTY")) == 12
+
+    # Lookups after the first download never hit the server
+    downloads = len(calls)
+    store.lookup("SBIN", "NSE")
+    assert len(calls) == downloads
+
+
+def test_persisted_master_reused_and_failed_exchanges_keep_rows(tmp_path, make_client):
+    path = str(tmp_path / "master.sqlite")
+    calls = []
+    InstrumentStore(make_client(master_handler(calls)), path=path).refresh()
+
+    offline = InstrumentStore(path=path)
+    assert len(offline) == 13 and not offline.stale()
+
+    result = InstrumentStore(make_client(master_handler([], failing=("NFO",))), path=path).refresh()
+    assert result["errors"]["NFO"]["error_type"] == "http_error"
+    reloaded = InstrumentStore(path=path)
+    assert len(reloaded.contracts("NIFTY")) == 12
+
+
+
+def test_failed_exchange_keeps_store_stale_until_retried(tmp_path, make_client):
+    path = str(tmp_path / "master.sqlite")
+    calls = []
+    store = InstrumentStore(make_client(master_handler(calls, failing=("NFO",))), path=path, auto_refresh=False)
+    assert store.refresh()["errors"]["NFO"]["error_type"] == "http_error"
+    assert store.trading_date is None and store.stale()
+    assert store.lookup("SBIN", "NSE")["token"] == "3045"
+
+    store.client = make_client(master_handler(calls))
+    store.refresh(force=False)
+    assert calls.count("NFO") == 2 and not store.stale()
+    assert len(store.contracts("NIFTY")) == 12
+
+
+
+def test_lookups_back_off_after_failed_refresh(tmp_path, monkeypatch, make_client):
+    calls = []
+    store = InstrumentStore(make_client(master_handler(calls, failing=("NFO",))), path=str(tmp_path / "master.sqlite"))
+    assert store.lookup("SBIN", "NSE")["token"] == "3045"
+    assert calls.count("NFO") == 1
+
+    clock = [time.monotonic()]
+    monkeypatch.setattr(instruments.time, "monotonic", lambda: clock[0])
+    for step in (61, 61, 70):  # lookups check staleness every minute; the retry waits 60s, then 120s
+        clock[0] += step
+        store.lookup("SBIN", "NSE")
+    assert calls.count("NFO") == 3
+
+    store.client = make_client(master_handler(calls))
+    clock[0] += 250
+    assert store.lookup("SBIN", "NSE") and calls.count("NFO") == 4 and not store.stale()
+
+
+def test_trading_date_and_expiry_parsing():
+    early = datetime(2024, 12, 26, 7, 30, tzinfo=IST)
+    late = datetime(2024, 12, 26, 9, 0, tzinfo=IST)
+    assert trading_date(early) == "2024-12-25"
+    assert trading_date(late) == "2024-12-26"
+    assert expiry_key("26-DEC-24") == expiry_key("26DEC24") == expiry_key("2024-12-26") == 20241226
+    assert expiry_key(None) == expiry_key("garbage") == 0
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the feed latency and throughput metrics.
+"""
+
+import json
+import time
+
+from layr0_imc import api
+from layr0_imc.metrics import FeedMetrics, LatencyHistogram
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram()
+    for value in range(1, 10001):
+        histogram.record(value)
+    snap = histogram.snapshot()
+    assert snap['count'] == 10000
+    assert snap['min'] == 1 and snap['max'] == 10000
+    assert abs(snap['mean'] - 5000.5) < 1e-9
+    for percentile, expected in ((50, 5000), (90, 9000), (99, 9900)):
+        assert abs(histogram.percentile(percentile) - expected) <= expected / 32
+    histogram.record(-5)  # clock skew clamps to zero
+    assert histogram.min == 0
+    histogram.reset()
+    assert histogram.snapshot()['count'] == 0 and histogram.percentile(99) == 0
+
+
+def test_bucket_relative_error_bound():
+    # Exact below 64, then 32 buckets per power of two: lower bound within 1/32
+    assert all(LatencyHistogram._value(LatencyHistogram._index(v)) == v for v in range(64))
+    values = list(range(64, 70000)) + [(1 << bits) + offset for bits in range(17, 41)
+                                        for offset in (-1, 0, 1, 12345)]
+    for value in values:
+        low = LatencyHistogram._value(LatencyHistogram._index(value))
+        assert low <= value and (value - low) / value <= 1 / 32
+    assert LatencyHistogram._index(1 << 20) - LatencyHistogram._index(1 << 19) == 32
+
+
+def test_feed_records_rates_latency_and_callbacks():
+    client = api(api_key="test_key", host="http://127.0.0.1:5000", verbose=False)
+    metrics = client.enable_metrics(symbol_histograms=True)
+    client.ltp_callback = lambda data: time.sleep(0.002)
+    now_ms = int(time.time() * 1000)
+    for i in range(3):
+        client._process_message(json.dumps({
+            "type": "market_data", "mode": 1, "exchange": "NSE", "symbol": "SBIN",
+            "data": {"ltp": 100.0 + i, "timestamp": now_ms - 50},
+        }))
+    client._process_message(json.dumps({
+        "type": "market_data", "mode": 2, "exchange": "NSE", "symbol": "INFY",
+        "data": {"ltp": 1500.0},
+    }))
+
+    snap = client.metrics_snapshot()
+    ltp = snap['modes']['LTP']
+    assert ltp['messages'] == 3 and ltp['rate'] > 0
+    assert ltp['latency_us']['count'] == 3 and ltp['latency_us']['min'] >= 50_000
+    assert ltp['callback_us']['count'] == 3 and ltp['callback_us']['min'] >= 1_500
+    assert ltp['decode_us']['count'] == 3
+    assert snap['symbols']['NSE:SBIN']['LTP']['messages'] == 3
+    # No exchange timestamp, no latency sample
+    assert snap['symbols']['NSE:INFY']['Quote']['latency_us']['count'] == 0
+
+    assert client.metrics_snapshot(reset=True)['modes']['LTP']['messages'] == 3
+    assert metrics.snapshot()['modes'] == {}
+    client.disable_metrics()
+    assert client.metrics_snapshot() is None
+
+
+def test_per_symbol_histograms_are_opt_in():
+    metrics = FeedMetrics()
+    metrics.record_message(1, "NSE", "SBIN", 2_000, 1_000.0, 990)
+    snap = metrics.snapshot()
+    assert 'latency_us' not in snap['symbols']['NSE:SBIN']['LTP']
+    assert abs(snap['modes']['LTP']['latency_us']['p50'] - 10_000) <= 10_000 / 32
+    assert snap['modes']['LTP']['decode_us']['max'] == 2
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the array-backed OrderBook behind depth subscriptions.
+"""
+
+import json
+import math
+
+import pytest
+from layr0_imc import api
+from layr0_imc.orderbook import OrderBook
+
+DEPTH = {
+    "buy": [{"price": 100.0, "quantity": 300, "orders": 3}, {"price": 99.5, "quantity": 200, "orders": 2}],
+    "sell": [{"price": 100.5, "quantity": 100, "orders": 1}, {"price": 101.0, "quantity": 400, "orders": 4}],
+}
+
+
+def test_derived_fields():
+    book = OrderBook(levels=5)
+    book.update(DEPTH, ltp=100.2, timestamp=1000)
+
+    assert book.spread == 0.5
+    assert book.mid == 100.25
+    assert book.microprice == pytest.approx((100.0 * 100 + 100.5 * 300) / 400)
+    assert book.imbalance_at(1) == 0.5
+    assert book.imbalance == 0.0
+    assert book.cumulative_depth("sell").tolist() == [100, 500, 500, 500, 500]
+    assert book.bid_levels == 2 and book.version == 2
+
+    book.update({"buy": [], "sell": DEPTH["sell"]}, timestamp=2000)
+    assert math.isnan(book.spread)
+    assert book.bid_qty.sum() == 0 and book.ltp == 100.2
+
+
+def test_depth_view_cached_per_update():
+    book = OrderBook(levels=5)
+    book.update(DEPTH, ltp=100.2, timestamp=1000)
+    view = book.as_depth()
+    assert view["buyBook"]["2"] == {"price": 99.5, "qty": 200, "orders": 2}
+    assert view["sellBook"]["5"] == {"price": 0.0, "qty": 0, "orders": 0}
+    assert book.as_depth() is view
+    book.update(DEPTH, ltp=100.3, timestamp=1001)
+    assert book.as_depth() is not view and book.as_depth()["ltp"] == 100.3
+
+
+def test_malformed_depth_leaves_book_readable():
+    book = OrderBook(levels=5)
+    book.update(DEPTH, ltp=100.2, timestamp=1000)
+    with pytest.raises((TypeError, ValueError)):
+        book.update({"buy": [{"price": "N/A", "quantity": 1}], "sell": []}, timestamp=2000)
+    assert book.version == 2 and book.as_depth()["buyBook"]["1"]["qty"] == 300
+    book.update(DEPTH, ltp=100.3, timestamp=3000)
+    assert book.version == 4 and book.as_depth()["ltp"] == 100.3
+
+
+
+def test_full_depth_kept_unless_limited():
+    deep = {"buy": [{"price": 100.0 - i, "quantity": 10, "orders": 1} for i in range(20)],
+            "sell": [{"price": 101.0 + i, "quantity": 10, "orders": 1} for i in range(3)]}
+    book = OrderBook()
+    book.update(deep, ltp=100.5, timestamp=1000)
+    view = book.as_depth()
+    assert len(view["buyBook"]) == 20 and view["buyBook"]["20"]["price"] == 81.0
+    assert len(view["sellBook"]) == 5 and view["sellBook"]["5"]["qty"] == 0
+    assert book.cumulative_depth("buy")[-1] == 200
+
+    book.update(DEPTH, timestamp=2000)
+    assert len(book.as_depth()["buyBook"]) == 5
+
+    limited = OrderBook(levels=10)
+    limited.update(deep, timestamp=1000)
+    assert len(limited.as_depth()["buyBook"]) == 10
+
+
+def test_feed_updates_books_in_place():
+    client = api(api_key="test-key")
+    received = []
+    client.depth_callback = received.append
+    for ltp in (100.2, 100.4):
+        client._process_message(json.dumps({"type": "market_data", "mode": 3, "exchange": "NSE", "symbol": "SBIN",
+                                            "data": {"ltp": ltp, "timestamp": 1, "depth": DEPTH}}))
+    book = client.order_book("SBIN", exchange="NSE")
+    assert book is client.depth_data["NSE:SBIN"] and book.seq == 2
+    assert client.get_depth("NSE", "SBIN")["depth"]["NSE"]["SBIN"]["ltp"] == 100.4
+    assert received[-1]["data"]["depth"]["buy"][0]["quantity"] == 300
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the client-side per-endpoint-group rate limiter.
+"""
+
+import time
+
+import httpx
+from layr0_imc import RateLimiter
+from layr0_imc.ratelimit import TokenBucket
+
+
+def test_token_bucket_burst_then_refill():
+    bucket = TokenBucket(rate=100, capacity=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    time.sleep(0.02)
+    assert bucket.try_acquire()
+
+
+def test_endpoint_groups():
+    limiter = RateLimiter(endpoint_groups={'history': 'history'}, limits={'history': 5})
+    assert limiter.group_for('placeorder') == 'order'
+    assert limiter.group_for('placesmartorder') == 'smart_order'
+    assert limiter.group_for('quotes') == 'api'
+    assert limiter.group_for('history') == 'history'
+
+
+def test_fail_mode_returns_error_dict(make_client):
+    def handler(request):
+        return httpx.Response(200, json={"status": "success"})
+
+    client = make_client(handler, rate_limiter=RateLimiter(limits={'order': (1, 1)}, mode='fail'))
+
+    assert client.placeorder(symbol="SBIN", action="BUY", exchange="NSE")["status"] == "success"
+    result = client.placeorder(symbol="SBIN", action="BUY", exchange="NSE")
+    assert result["error_type"] == "rate_limit_error"
+    # Other groups are unaffected
+    assert client.quotes(symbol="SBIN", exchange="NSE")["status"] == "success"
+
+
+def test_block_mode_smooths_bursts():
+    limiter = RateLimiter(limits={'order': (50, 1)}, mode='block')
+    start = time.monotonic()
+    for _ in range(6):
+        assert limiter.acquire('placeorder')
+    # 1 immediate token, then 5 more at 50/s
+    assert time.monotonic() - start >= 0.09
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the tick recorder and replayer.
+"""
+
+import json
+
+import pytest
+from layr0_imc import api
+from layr0_imc.recorder import TickRecorder, TickReplayer
+
+
+def tick(symbol, ltp):
+    return json.dumps({"type": "market_data", "mode": 1, "exchange": "NSE", "symbol": symbol,
+                       "data": {"ltp": ltp, "timestamp": 1}})
+
+
+def test_round_trip_and_truncated_tail(tmp_path):
+    path = str(tmp_path / "session.ticks")
+    with TickRecorder(path) as recorder:
+        recorder.record(tick("SBIN", 1.0), received_ns=1_000_000_000)
+        recorder.record(tick("SBIN", 2.0).encode(), received_ns=1_050_000_000)
+    with open(path, "ab") as f:
+        f.write(b"\x00\x01")
+
+    records = list(TickReplayer(path))
+    assert [ns for ns, _ in records] == [1_000_000_000, 1_050_000_000]
+    assert json.loads(records[1][1])["data"]["ltp"] == 2.0
+
+    with open(path, "wb") as f:
+        f.write(b"not a log")
+    with pytest.raises(ValueError):
+        list(TickReplayer(path))
+
+
+def test_replay_drives_feed_callbacks(tmp_path):
+    path = str(tmp_path / "session.ticks")
+    with TickRecorder(path) as recorder:
+        for i in range(5):
+            recorder.record(tick("SBIN", 100.0 + i), received_ns=i * 10_000_000)
+
+    client = api(api_key="test-key")
+    seen = []
+    client.add_listener([{"exchange": "NSE", "symbol": "SBIN"}], "ltp", seen.append)
+
+    stats = client.replay(path, speed=None)
+    assert stats["messages"] == 5 and stats["recorded"] == pytest.approx(0.04)
+    assert [m["data"]["ltp"] for m in seen] == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert client.get_ltp("NSE", "SBIN")["ltp"]["NSE"]["SBIN"]["ltp"] == 104.0
+
+    paced = TickReplayer(path).replay(lambda message: None, speed=1.0)
+    assert paced["elapsed"] >= 0.035
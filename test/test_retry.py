@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the REST retry policy and circuit breaker.
+"""
+
+import time
+
+import httpx
+from layr0_imc import RetryPolicy, CircuitBreaker, RateLimiter
+
+
+def flaky(failures, status=503):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) <= failures:
+            return httpx.Response(status, text="unavailable")
+        return httpx.Response(200, json={"status": "success"})
+    return handler, calls
+
+
+def test_reads_are_retried(make_client):
+    handler, calls = flaky(2)
+    client = make_client(handler, retry_policy=RetryPolicy(max_attempts=3, backoff_base=0.001))
+    assert client.quotes(symbol="SBIN", exchange="NSE")["status"] == "success"
+    assert len(calls) == 3
+
+
+def test_orders_need_idempotency_key(make_client):
+    handler, calls = flaky(1)
+    client = make_client(handler, retry_policy=RetryPolicy(max_attempts=3, backoff_base=0.001))
+    result = client.placeorder(symbol="SBIN", action="BUY", exchange="NSE")
+    assert result["code"] == 503
+    assert len(calls) == 1
+
+    handler, calls = flaky(1)
+    client = make_client(handler, retry_policy=RetryPolicy(max_attempts=3, backoff_base=0.001))
+    result = client.placeorder(symbol="SBIN", action="BUY", exchange="NSE", idempotency_key="abc-1")
+    assert result["status"] == "success"
+    assert len(calls) == 2
+
+
+def test_connection_errors_retried_then_reported(make_client):
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    client = make_client(handler, retry_policy=RetryPolicy(max_attempts=2, backoff_base=0.001))
+    assert client.funds()["error_type"] == "connection_error"
+
+
+def test_circuit_breaker_fails_fast_and_recovers(make_client):
+    calls = []
+    healthy = {"up": False}
+
+    def handler(request):
+        calls.append(1)
+        if not healthy["up"]:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"status": "success"})
+
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+    client = make_client(handler, circuit_breaker=breaker)
+
+    client.funds()
+    client.funds()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert client.funds()["error_type"] == "circuit_open_error"
+    assert len(calls) == 2
+
+    time.sleep(0.06)
+    healthy["up"] = True
+    assert client.funds()["status"] == "success"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limited_probe_does_not_wedge_half_open_breaker(make_client):
+    healthy = {"up": False}
+
+    def handler(request):
+        if not healthy["up"]:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"status": "success"})
+
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+    limiter = RateLimiter(limits={'api': (20, 1)}, mode='fail')
+    client = make_client(handler, circuit_breaker=breaker, rate_limiter=limiter)
+
+    client.funds()
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.06)
+    healthy["up"] = True
+    assert limiter.acquire("funds")  # use up the burst so the next request is rejected
+    assert client.funds()["error_type"] == "rate_limit_error"
+
+    time.sleep(0.06)
+    assert client.funds()["status"] == "success"
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for per-instrument tick ring buffers and FeedAPI.window().
+"""
+
+import json
+
+import numpy as np
+from layr0_imc import api, ta
+from layr0_imc.ringbuffer import TickRingBuffer
+
+
+def test_window_is_ordered_view_across_wraparound():
+    buffer = TickRingBuffer(capacity=4)
+    for i in range(10):
+        buffer.append(float(i), i, 1000 + i)
+
+    window = buffer.window(3)
+    assert window.price.tolist() == [7.0, 8.0, 9.0]
+    assert window.timestamp.tolist() == [1007, 1008, 1009]
+    assert np.shares_memory(window.price, buffer.price)
+    assert buffer.window().price.tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert buffer.window(100).price.size == 4
+
+    copied = buffer.window(2, copy=True)
+    buffer.append(10.0, 10, 1010)
+    assert copied.price.tolist() == [8.0, 9.0]
+
+
+def test_feed_window_records_ticks():
+    client = api(api_key="test-key")
+    assert client.window("NSE:SBIN") is None
+
+    client.enable_tick_buffers(capacity=50)
+    for i in range(30):
+        client._process_message(json.dumps({"type": "market_data", "mode": 1, "exchange": "NSE",
+                                            "symbol": "SBIN", "data": {"ltp": 100.0 + i, "timestamp": i}}))
+
+    window = client.window("SBIN", 20, exchange="NSE")
+    assert window.price[0] == 110.0 and window.price[-1] == 129.0
+    assert len(ta.ema(window.price, 5)) == 20
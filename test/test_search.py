@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for offline symbol search over the instrument master.
+"""
+
+import time
+
+import httpx
+from layr0_imc.instruments import COLUMNS
+from layr0_imc.search import SymbolIndex
+
+
+def row(symbol, name, exchange, instrumenttype, expiry="", strike=-1.0):
+    values = {"symbol": symbol, "brsymbol": symbol, "name": name, "exchange": exchange, "token": symbol,
+              "expiry": expiry, "strike": strike, "lotsize": 1, "instrumenttype": instrumenttype}
+    return tuple(values.get(column) for column in COLUMNS)
+
+
+ROWS = [
+    row("RELIANCE", "RELIANCE INDUSTRIES", "NSE", "EQ"),
+    row("RELIANCE", "RELIANCE INDUSTRIES", "BSE", "EQ"),
+    row("RELIANCE26DEC24FUT", "RELIANCE", "NFO", "FUT", "26-DEC-24"),
+    row("RELIANCE30JAN25FUT", "RELIANCE", "NFO", "FUT", "30-JAN-25"),
+    row("RELINFRA", "RELIANCE INFRASTRUCTURE", "NSE", "EQ"),
+    row("NIFTY", "NIFTY", "NSE_INDEX", "INDEX"),
+    row("NIFTY26DEC2424000CE", "NIFTY", "NFO", "CE", "26-DEC-24", 24000.0),
+    row("NIFTY26DEC2424000PE", "NIFTY", "NFO", "PE", "26-DEC-24", 24000.0),
+    row("SBIN", "STATE BANK OF INDIA", "NSE", "EQ"),
+]
+
+
+def test_tiers_rank_exact_then_prefix_then_name_then_fuzzy():
+    index = SymbolIndex(ROWS)
+    symbols = [r["symbol"] for r in index.search_dicts("reliance", limit=10)]
+    assert symbols[:2] == ["RELIANCE", "RELIANCE"]
+    # Futures by nearest expiry, then the name-prefix match
+    assert symbols[2:] == ["RELIANCE26DEC24FUT", "RELIANCE30JAN25FUT", "RELINFRA"]
+
+    assert [r["symbol"] for r in index.search_dicts("state bank")] == ["SBIN"]
+    # Substring matches first; fuzzy matches only fill the remaining slots
+    assert [r["symbol"] for r in index.search_dicts("26DEC2424000")][:2] == ["NIFTY26DEC2424000CE",
+                                                                              "NIFTY26DEC2424000PE"]
+    assert index.search_dicts("RELAINCE", exchange="NSE", limit=1)[0]["symbol"] == "RELIANCE"
+    assert index.search_dicts("") == [] and index.search_dicts("ZZZZ") == []
+
+
+def test_filters_and_limit():
+    index = SymbolIndex(ROWS)
+    assert [r["exchange"] for r in index.search_dicts("RELIANCE", exchange="BSE")] == ["BSE"]
+    assert [r["instrumenttype"] for r in index.search_dicts("NIFTY", instrumenttype=("CE", "PE"))] == ["CE", "PE"]
+    assert len(index.search_dicts("R", limit=2)) == 2
+
+
+def test_local_search_through_client_is_fast(tmp_path, make_client):
+    data = [{"symbol": f"SYM{i:05d}{kind}", "name": f"UNDERLYING{i % 500}", "exchange": "NFO",
+             "token": str(i), "instrumenttype": kind, "expiry": "26-DEC-24"}
+            for i in range(20000) for kind in ("CE", "PE")]
+    data.append({"symbol": "SBIN", "name": "STATE BANK OF INDIA", "exchange": "NSE", "token": "3045",
+                 "instrumenttype": "EQ"})
+
+    def handler(request):
+        exchange = request.url.params["exchange"]
+        return httpx.Response(200, json={"status": "success", "data": [d for d in data if d["exchange"] == exchange]})
+
+    client = make_client(handler)
+    client.instrument_store(path=str(tmp_path / "master.sqlite"))
+
+    result = client.search(query="sbin", local=True)
+    assert result["status"] == "success" and result["data"][0]["token"] == "3045"
+
+    start = time.perf_counter()
+    for query in ("SBI", "SYM1234", "UNDERLYING42", "SYM0999PE", "STATE"):
+        for _ in range(20):
+            assert client.search(query=query, local=True, limit=10)["data"]
+    assert (time.perf_counter() - start) / 100 < 0.005
+
+
+def test_filters_and_ranking_cover_broad_prefixes():
+    expiries = ["02-JAN-25", "09-JAN-25", "16-JAN-25", "26-DEC-24", "30-JAN-25", "27-FEB-25"]
+    rows = [row("NIFTY", "NIFTY", "NSE_INDEX", "INDEX")]
+    rows += [row(f"NIFTY{expiry.replace('-', '')}{strike}{kind}", "NIFTY", "NFO", kind, expiry, float(strike))
+             for expiry in expiries for strike in range(20000, 30000, 20) for kind in ("CE", "PE")]
+    rows.append(row("NIFTY30JAN25FUT", "NIFTY", "NFO", "FUT", "30-JAN-25"))
+    index = SymbolIndex(rows)
+    assert len(rows) > 6000
+
+    assert [r["symbol"] for r in index.search_dicts("NIFTY", instrumenttype="FUT")] == ["NIFTY30JAN25FUT"]
+    top = index.search_dicts("NIFTY", exchange="NFO", limit=5)
+    assert top[0]["symbol"] == "NIFTY30JAN25FUT"
+    assert {r["expiry"] for r in top[1:]} == {"26-DEC-24"}
+    assert index.search_dicts("NIFTY", limit=2)[0]["symbol"] == "NIFTY"
+    assert len(index.search_dicts("NIFTY2", instrumenttype=("CE",), exchange="NFO", limit=50)) == 50
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared-memory market data bus.
+"""
+
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+from layr0_imc import api, SharedTickReader
+
+
+def bus_name():
+    return f"layr0_test_{os.getpid()}"
+
+
+def read_in_child(name, queue):
+    reader = SharedTickReader(name, mode="quote")
+    queue.put((reader.get("NSE:SBIN")["ltp"], reader.seq))
+    reader.close()
+
+
+def tick(mode, symbol, ltp):
+    return json.dumps({"type": "market_data", "mode": mode, "exchange": "NSE", "symbol": symbol,
+                       "data": {"ltp": ltp, "volume": 10, "timestamp": 1}})
+
+
+def test_publish_and_read_zero_copy():
+    client = api(api_key="test-key")
+    client._process_message(tick(1, "TCS", 3500.0))
+    segments = client.publish_shared_memory(bus_name(), capacity=8)
+    try:
+        assert segments == {"ltp": f"{bus_name()}_ltp", "quote": f"{bus_name()}_quote"}
+        client._process_message(tick(2, "SBIN", 769.6))
+
+        ltp_reader = SharedTickReader(bus_name(), mode="ltp")
+        assert ltp_reader.get("NSE:TCS")["ltp"] == 3500.0
+        column = ltp_reader.column("ltp")
+        client._process_message(tick(1, "TCS", 3501.0))
+        assert column[ltp_reader.row("NSE:TCS")] == 3501.0
+        assert np.shares_memory(column, ltp_reader.data)
+        ltp_reader.close()
+
+        queue = multiprocessing.get_context("spawn").Queue()
+        child = multiprocessing.get_context("spawn").Process(target=read_in_child, args=(bus_name(), queue))
+        child.start()
+        ltp, seq = queue.get(timeout=30)
+        child.join(30)
+        assert ltp == 769.6 and seq == 1
+        assert client.get_quotes("NSE", "SBIN")["quote"]["NSE"]["SBIN"]["ltp"] == 769.6
+    finally:
+        client.stop_shared_memory()
+    with pytest.raises(FileNotFoundError):
+        SharedTickReader(bus_name(), mode="ltp")
+    assert client.get_ltp()["ltp"]["NSE"]["TCS"]["ltp"] == 3501.0
+
+
+def test_capacity_is_fixed():
+    client = api(api_key="test-key")
+    client.publish_shared_memory(bus_name() + "_cap", capacity=1)
+    try:
+        client._process_message(tick(1, "A", 1.0))
+        client._process_message(tick(1, "B", 2.0))
+        assert "NSE:B" not in client.ltp_data
+    finally:
+        client.stop_shared_memory()
+
+
+def test_republish_same_name_and_cleanup_on_overflow():
+    name = bus_name() + "_again"
+    client = api(api_key="test-key")
+    client._process_message(tick(1, "A", 1.0))
+    client._process_message(tick(1, "B", 2.0))
+    client.publish_shared_memory(name, capacity=8)
+    try:
+        client.publish_shared_memory(name, capacity=8)
+        assert client.get_ltp()["ltp"]["NSE"]["B"]["ltp"] == 2.0
+
+        with pytest.raises(MemoryError):
+            client.publish_shared_memory(name, capacity=1)
+        with pytest.raises(FileNotFoundError):
+            SharedTickReader(name, mode="ltp")
+        assert client.get_ltp()["ltp"]["NSE"]["A"]["ltp"] == 1.0
+        client._process_message(tick(1, "A", 1.5))
+        assert client.get_ltp()["ltp"]["NSE"]["A"]["ltp"] == 1.5
+    finally:
+        client.stop_shared_memory()
+
+
+def test_stop_and_republish_while_views_exist():
+    name = bus_name() + "_views"
+    client = api(api_key="test-key")
+    client.publish_shared_memory(name, capacity=8)
+    client._process_message(tick(1, "A", 1.0))
+    column = client.ltp_data.column("ltp")
+    row = client.ltp_data["NSE:A"]
+    client.publish_shared_memory(name, capacity=8)
+    client.stop_shared_memory()
+
+    assert column[:1].tolist() == [1.0] and row["ltp"] == 1.0
+    with pytest.raises(FileNotFoundError):
+        SharedTickReader(name, mode="ltp")
+    assert client.get_ltp()["ltp"]["NSE"]["A"]["ltp"] == 1.0
+
+
+def test_reader_rejects_reused_rows():
+    name = bus_name() + "_reuse"
+    client = api(api_key="test-key")
+    client.publish_shared_memory(name, capacity=8)
+    try:
+        client._process_message(tick(1, "A", 1.0))
+        reader = SharedTickReader(name, mode="ltp")
+        assert reader.get("NSE:A")["ltp"] == 1.0
+        reader._refresh = lambda: None  # keep the stale index, as a reader racing the publisher would
+        client.ltp_data.pop("NSE:A")
+        client._process_message(tick(1, "B", 2.0))
+        assert reader.get("NSE:A") is None
+        reader.close()
+    finally:
+        client.stop_shared_memory()
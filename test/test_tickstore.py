@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar tick store behind FeedAPI.ltp_data / quotes_data.
+"""
+
+import json
+
+import numpy as np
+from layr0_imc import api
+from layr0_imc.tickstore import TickStore
+
+
+def tick(mode, symbol, **data):
+    return json.dumps({"type": "market_data", "mode": mode, "exchange": "NSE", "symbol": symbol, "data": data})
+
+
+def test_updates_in_place_and_views_are_zero_copy():
+    store = TickStore(capacity=2)
+    row = store.update_ltp("NSE:SBIN", 100.0, 1)
+    view = store.column("ltp")
+    assert store.update_ltp("NSE:SBIN", 101.5, 2) == row
+    assert view[row] == 101.5
+    assert np.shares_memory(view, store.data)
+    assert store["NSE:SBIN"]["seq"] == 2
+
+
+def test_grow_and_reuse_rows():
+    store = TickStore(capacity=2)
+    for i in range(5):
+        store.update_ltp(f"NSE:S{i}", float(i), i)
+    assert len(store.data) >= 5 and len(store) == 5
+    freed = store.pop("NSE:S1")
+    assert "NSE:S1" not in store
+    assert store.row_for("NSE:NEW") == freed
+    assert store["NSE:NEW"]["seq"] == 0
+    assert [key for key, _ in store.items()][1] == ("NSE", "NEW")
+
+
+def test_feed_ticks_fill_store():
+    client = api(api_key="test-key")
+    client._process_message(tick(1, "SBIN", ltp=769.6, timestamp=1000))
+    client._process_message(tick(2, "TCS", ltp=3500.0, open=3490, high=3510, low=3480,
+                                 close=3495, volume=12000, timestamp=2000))
+    client._process_message(tick(2, "TCS", ltp=3501.0, timestamp=3000))
+
+    assert client.get_ltp()["ltp"]["NSE"]["SBIN"] == {"timestamp": 1000, "ltp": 769.6}
+    quote = client.get_quotes("NSE", "TCS")["quote"]["NSE"]["TCS"]
+    assert quote["ltp"] == 3501.0 and quote["high"] == 3510 and quote["volume"] == 12000
+    assert client.quotes_data["NSE:TCS"]["seq"] == 2
+
+
+def test_malformed_tick_leaves_row_readable():
+    client = api(api_key="test-key")
+    client._process_message(tick(1, "SBIN", ltp=769.6, timestamp=1000))
+    client._process_message(tick(1, "SBIN", ltp="N/A", timestamp=2000))
+    client._process_message(tick(2, "TCS", ltp=3500.0, volume="abc", timestamp=2000))
+    client._process_message(json.dumps({"type": "market_data", "mode": 1, "exchange": "NSE", "symbol": "INFY",
+                                        "data": {"ltp": 1500.0, "timestamp": None}}))
+    assert client.ltp_data["NSE:SBIN"]["version"] % 2 == 0
+    assert client.get_ltp()["ltp"]["NSE"]["SBIN"] == {"timestamp": 1000, "ltp": 769.6}
+    assert client.get_ltp()["ltp"]["NSE"]["INFY"]["ltp"] == 1500.0
+
+    client._process_message(tick(1, "SBIN", ltp=770.0, timestamp=3000))
+    client._process_message(tick(2, "TCS", ltp=3501.0, volume=10, timestamp=3000))
+    assert client.get_ltp("NSE", "SBIN")["ltp"]["NSE"]["SBIN"] == {"timestamp": 3000, "ltp": 770.0}
+    assert client.get_quotes("NSE", "TCS")["quote"]["NSE"]["TCS"]["volume"] == 10
+
+    store = TickStore()
+    store.update_ltp("NSE:SBIN", 1.0, 1)
+    for bad in ((None, 2), (2.0, None)):
+        try:
+            store.update_ltp("NSE:SBIN", *bad)
+        except (TypeError, ValueError):
+            pass
+    assert store["NSE:SBIN"]["version"] % 2 == 0
+
+
+def test_exchange_index_and_seqlock_reads():
+    store = TickStore()
+    for key in ("NSE:SBIN", "NSE:TCS", "NFO:NIFTY"):
+        store.update_ltp(key, 1.0, 1)
+    assert sorted(sym for _, sym, _ in store.select("NSE")) == ["SBIN", "TCS"]
+    assert [(ex, sym) for ex, sym, _ in store.select("NFO", "NIFTY")] == [("NFO", "NIFTY")]
+
+    row = store.index["NSE:TCS"]
+    store.pop("NSE:TCS")
+    assert list(store.select("NSE", "TCS")) == []
+    assert store.read(row, ("ltp",), ("NSE", "TCS")) is None
+    assert store["NSE:SBIN"]["version"] % 2 == 0
+
+
+def test_lock_free_reads_are_never_torn():
+    import threading
+
+    client = api(api_key="test-key")
+    client.ltp_data.update_ltp("NSE:SBIN", 0.0, 0)
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            with client.lock:
+                client.ltp_data.update_ltp("NSE:SBIN", float(i), i)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(2000):
+            snap = client.get_ltp("NSE", "SBIN")["ltp"]["NSE"]["SBIN"]
+            assert snap["ltp"] == snap["timestamp"]
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_get_depth_filters_by_index():
+    client = api(api_key="test-key")
+    for exchange, symbol in (("NSE", "SBIN"), ("BSE", "SBIN")):
+        client._process_message(json.dumps({"type": "market_data", "mode": 3, "exchange": exchange, "symbol": symbol,
+                                            "data": {"ltp": 1.0, "depth": {"buy": [{"price": 1, "quantity": 2}],
+                                                                            "sell": []}}}))
+    assert list(client.get_depth("BSE")["depth"]) == ["BSE"]
+    assert client.get_depth("NSE", "SBIN")["depth"]["NSE"]["SBIN"]["buyBook"]["1"]["qty"] == 2
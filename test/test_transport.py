@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared pooled HTTP transport used by all REST mixins.
+"""
+
+import threading
+import time
+
+import httpx
+from layr0_imc import api
+from layr0_imc.data import INSTRUMENT_EXCHANGES
+
+
+def test_all_mixins_share_one_client(make_client):
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"status": "success", "data": {}})
+
+    client = make_client(handler)
+    pooled = client.client
+
+    client.placeorder(symbol="RELIANCE", action="BUY", exchange="NSE")
+    client.quotes(symbol="RELIANCE", exchange="NSE")
+    client.funds()
+    client.optionchain(underlying="NIFTY", exchange="NSE_INDEX")
+
+    assert client.client is pooled
+    assert seen == ["/api/v1/placeorder", "/api/v1/quotes", "/api/v1/funds", "/api/v1/optionchain"]
+
+
+def test_error_responses_are_normalised(make_client):
+    def handler(request):
+        if request.url.path.endswith("quotes"):
+            return httpx.Response(500, text="boom")
+        raise httpx.ConnectError("refused", request=request)
+
+    client = make_client(handler)
+
+    result = client.quotes(symbol="RELIANCE", exchange="NSE")
+    assert result["error_type"] == "http_error"
+    assert result["code"] == 500
+
+    result = client.funds()
+    assert result["error_type"] == "connection_error"
+
+
+def test_close_releases_pool():
+    with api(api_key="test-key") as client:
+        pooled = client.client
+    assert pooled.is_closed
+
+
+def test_instruments_downloads_exchanges_concurrently_and_reports_failures(make_client):
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def handler(request):
+        exchange = request.url.params["exchange"]
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        if exchange == "MCX":
+            return httpx.Response(500, text="down")
+        return httpx.Response(200, json={"status": "success", "data": [{"symbol": "X", "exchange": exchange}]})
+
+    client = make_client(handler)
+    df = client.instruments(max_workers=3)
+
+    assert in_flight[1] == 3
+    assert list(df["exchange"]) == [e for e in INSTRUMENT_EXCHANGES if e != "MCX"]
+    assert set(df.attrs["errors"]) == {"MCX"}
+    assert df.attrs["errors"]["MCX"]["error_type"] == "http_error"
+
+    failed = make_client(lambda request: httpx.Response(500, text="down")).instruments()
+    assert failed["status"] == "error" and set(failed["errors"]) == set(INSTRUMENT_EXCHANGES)